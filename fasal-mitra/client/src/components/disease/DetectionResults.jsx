@@ -25,6 +25,7 @@ const DetectionResults = ({ result }) => {
     const recommendations = result.recommendations;
     const nextSteps = result.next_steps;
     const llmAdvice = result.llm_advice; // New: AI-generated personalized advice
+    const advicePending = result.advice_status === 'pending'; // Advice still being generated
     const simpleExplanation = result.simple_explanation; // Farmer-friendly explanation
     const howToSpot = result.how_to_spot; // Visual identification guide
     const preventionTips = result.prevention_tips; // Prevention measures
@@ -167,6 +168,15 @@ const DetectionResults = ({ result }) => {
                 </div>
             )}
 
+            {advicePending && !llmAdvice && !isHealthy && (
+                <div className="info-section bg-gradient-to-r from-purple-50 to-blue-50 border-2 border-purple-300">
+                    <h3 className="info-title text-purple-800 flex items-center gap-2">
+                        <Sparkles className="info-icon text-purple-600 animate-pulse" />
+                        Preparing AI-Powered Personalized Treatment Advice...
+                    </h3>
+                </div>
+            )}
+
             {/* Symptoms */}
             {diseaseData.symptoms && diseaseData.symptoms.length > 0 && (
                 <div className="info-section">
@@ -29,6 +29,28 @@ const DiseaseDetection = () => {
         setError(null);
     };
 
+    // LLM advice is generated after detection; pick it up when ready
+    const fetchAdvice = async (baseUrl, result) => {
+        try {
+            const params = new URLSearchParams({
+                disease_label: result.disease_label,
+                severity: result.severity
+            });
+            if (result.location) {
+                params.append('location', result.location);
+            }
+            const response = await fetch(`${baseUrl}/api/v1/disease/advice?${params}`);
+            const data = await response.json();
+            setDetectionResult((current) =>
+                current && current.detection_id === result.detection_id
+                    ? { ...current, llm_advice: data.data?.llm_advice, advice_status: data.data?.advice_status }
+                    : current
+            );
+        } catch (err) {
+            console.error('Advice fetch error:', err);
+        }
+    };
+
     const handleDetect = async () => {
         if (!selectedImage) {
             setError(t('pages:diseaseDetection.pleaseSelectImage'));
@@ -63,6 +85,9 @@ const DiseaseDetection = () => {
 
             if (data.success) {
                 setDetectionResult(data.data);
+                if (data.data.advice_status === 'pending') {
+                    fetchAdvice(baseUrl, data.data);
+                }
             } else {
                 setError(data.message || 'Detection failed');
             }
@@ -16,9 +16,12 @@ from app.models.disease import (
     DiseaseInfo,
     TreatmentPlan,
     SeverityLevel,
-    DiseaseHistoryItem
+    DiseaseHistoryItem,
+    AdviceMode
 )
 from app.models.common import ResponseModel
+from app.config import settings
+from app.core.uploads import read_image_upload
 from app.services.ml_disease_service import MLDiseaseDetectionService, get_ml_disease_service
 # Keep old service as fallback
 from app.services.disease_service import DiseaseDetectionService, get_disease_service
@@ -27,11 +30,25 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+def _parse_advice_mode(advice_mode: Optional[str]) -> Optional[AdviceMode]:
+    """Form value -> AdviceMode (None for the configured default); 400 if unknown"""
+    if advice_mode is None:
+        return None
+    try:
+        return AdviceMode(advice_mode)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid advice_mode '{advice_mode}'; use one of: {', '.join(m.value for m in AdviceMode)}"
+        )
+
+
 @router.post("/detect", response_model=ResponseModel)
 async def detect_disease(
     file: UploadFile = File(..., description="Image of affected crop"),
     crop_type: str = Form(..., description="Type of crop"),
     location: Optional[str] = Form(None, description="Location/State"),
+    advice_mode: Optional[str] = Form(None, description="deferred (default) or inline LLM advice"),
     ml_service: MLDiseaseDetectionService = Depends(get_ml_disease_service)
 ):
     """
@@ -40,6 +57,9 @@ async def detect_disease(
     - **file**: Image file (JPG, PNG, WEBP)
     - **crop_type**: Type of crop (e.g., Rice, Wheat, Tomato, Potato, etc.)
     - **location**: Optional location for better recommendations
+    - **advice_mode**: `deferred` returns as soon as the model is done; if LLM
+      advice isn't cached yet the result has `advice_status: "pending"` and the
+      advice is fetched from `GET /disease/advice`. `inline` waits for it.
     
     Returns detected disease with treatment plan using TensorFlow/Keras CNN model
     
@@ -47,52 +67,138 @@ async def detect_disease(
     Pepper (Bell), Potato, Raspberry, Soybean, Squash, Strawberry, Tomato
     """
     try:
-        # Validate file type
-        if not file.content_type.startswith("image/"):
-            raise HTTPException(status_code=400, detail="File must be an image (JPG, PNG, WEBP)")
+        advice_mode = _parse_advice_mode(advice_mode)
+        
+        # Stream the upload with header checks and the size limit
+        upload = await read_image_upload(file)
         
-        # Validate file size (max 10MB)
-        MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-        file_size = 0
+        logger.info(f"Processing disease detection: crop={crop_type}, {upload.format} {upload.width}x{upload.height}, size={upload.size_bytes/1024:.1f}KB, location={location}")
+        
+        # Detect disease using ML model
+        result = await ml_service.detect_disease(
+            image_data=upload.data,
+            crop_type=crop_type,
+            location=location,
+            advice_mode=advice_mode
+        )
+        
+        return ResponseModel(
+            success=True,
+            message="Disease detection completed using ML model",
+            data=result
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in disease detection: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Disease detection failed: {str(e)}"
+        )
+
+
+@router.post("/detect/batch", response_model=ResponseModel)
+async def detect_disease_batch(
+    files: List[UploadFile] = File(..., description="Several images of the same affected plant"),
+    crop_type: str = Form(..., description="Type of crop"),
+    location: Optional[str] = Form(None, description="Location/State"),
+    advice_mode: Optional[str] = Form(None, description="deferred (default) or inline LLM advice"),
+    ml_service: MLDiseaseDetectionService = Depends(get_ml_disease_service)
+):
+    """
+    Detect crop disease from multiple photos of the same plant in one request
+    
+    - **files**: Image files (JPG, PNG, WEBP), up to 10 per request
+    - **crop_type**: Type of crop (e.g., Rice, Wheat, Tomato, Potato, etc.)
+    - **location**: Optional location for better recommendations
+    - **advice_mode**: `deferred` or `inline`, as for `/detect`
+    
+    All photos are classified in a single batched model pass. Returns
+    per-photo results plus an aggregated diagnosis across the photos.
+    """
+    try:
+        advice_mode = _parse_advice_mode(advice_mode)
         
-        # Read image
-        image_data = await file.read()
-        file_size = len(image_data)
+        if not files:
+            raise HTTPException(status_code=400, detail="No images uploaded")
         
-        if file_size > MAX_FILE_SIZE:
+        if len(files) > settings.DISEASE_BATCH_MAX_IMAGES:
             raise HTTPException(
                 status_code=400,
-                detail=f"File size ({file_size/1024/1024:.1f}MB) exceeds maximum allowed size (10MB)"
+                detail=f"Too many images ({len(files)}); maximum is {settings.DISEASE_BATCH_MAX_IMAGES} per request"
             )
         
-        if file_size == 0:
-            raise HTTPException(status_code=400, detail="Empty file uploaded")
+        images = []
+        for file in files:
+            upload = await read_image_upload(file)
+            images.append(upload.data)
         
-        logger.info(f"Processing disease detection: crop={crop_type}, size={file_size/1024:.1f}KB, location={location}")
+        logger.info(f"Processing batch disease detection: crop={crop_type}, photos={len(images)}, location={location}")
         
-        # Detect disease using ML model
-        result = await ml_service.detect_disease(
-            image_data=image_data,
+        result = await ml_service.detect_disease_batch(
+            images=images,
             crop_type=crop_type,
-            location=location
+            location=location,
+            advice_mode=advice_mode
         )
         
         return ResponseModel(
             success=True,
-            message="Disease detection completed using ML model",
+            message=f"Disease detection completed for {len(images)} photos using ML model",
             data=result
         )
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error in disease detection: {str(e)}", exc_info=True)
+        logger.error(f"Error in batch disease detection: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=500,
-            detail=f"Disease detection failed: {str(e)}"
+            detail=f"Batch disease detection failed: {str(e)}"
         )
 
 
+@router.get("/advice", response_model=ResponseModel)
+async def get_treatment_advice(
+    disease_label: str,
+    severity: str,
+    location: Optional[str] = None,
+    ml_service: MLDiseaseDetectionService = Depends(get_ml_disease_service)
+):
+    """
+    Get LLM treatment advice for a detection returned with `advice_status: "pending"`
+    
+    - **disease_label**: `disease_label` from the detection result
+    - **severity**: `severity` from the detection result
+    - **location**: Same location sent with the detection
+    
+    Waits for the advice if it is still being generated.
+    """
+    if disease_label not in ml_service.class_labels:
+        raise HTTPException(status_code=400, detail=f"Unknown disease label: {disease_label}")
+    if severity not in ("mild", "moderate", "severe"):
+        raise HTTPException(status_code=400, detail="Severity must be mild, moderate or severe")
+    
+    advice = await ml_service.get_llm_treatment_advice(
+        disease_name=ml_service._format_disease_name(disease_label),
+        crop=ml_service._get_crop_from_label(disease_label),
+        location=location or "Unknown",
+        severity=severity
+    )
+    
+    return ResponseModel(
+        success=True,
+        message="Treatment advice ready" if advice else "Treatment advice unavailable",
+        data={
+            "disease_label": disease_label,
+            "severity": severity,
+            "llm_advice": advice,
+            "advice_status": "ready" if advice else "unavailable"
+        }
+    )
+
+
 @router.get("/diseases", response_model=ResponseModel)
 async def list_diseases(
     crop_type: Optional[str] = None,
@@ -7,23 +7,37 @@ from app.models.common import HealthResponse, ResponseModel
 from app.config import settings
 from app.core.data_loader import get_data_loader, DataLoader
 from datetime import datetime
+from typing import Dict
 import sys
 
 router = APIRouter()
 
 
+def _cache_metrics() -> Dict:
+    """Cache hit rates for services that are already running (never starts one)"""
+    from app.services import ml_disease_service, weather_service
+    
+    metrics = {}
+    if ml_disease_service._ml_disease_service is not None:
+        metrics["disease_detection"] = ml_disease_service._ml_disease_service.cache_stats()
+    if weather_service.get_weather_service.cache_info().currsize:
+        metrics["weather"] = weather_service.get_weather_service().cache_stats()
+    return metrics
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """
     Health check endpoint
     
-    Returns the current status of the API
+    Returns the current status of the API and cache hit rates
     """
     return HealthResponse(
         status="healthy",
         environment=settings.ENVIRONMENT,
         version=settings.APP_VERSION,
-        timestamp=datetime.now()
+        timestamp=datetime.now(),
+        caches=_cache_metrics()
     )
 
 
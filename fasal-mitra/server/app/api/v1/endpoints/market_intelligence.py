@@ -68,16 +68,22 @@ async def forecast_prices(
     - **commodity**: Commodity name (e.g., Cotton, Wheat, Potato)
     - **days**: Number of days to forecast (1-30, default: 7)
     - **district**: Optional district filter
+    - **market**: Optional market (APMC) filter, takes precedence over district
+    - **variety**: Optional variety filter
     
     Returns:
-    - Price forecasts with confidence intervals
+    - Price forecasts with 80% prediction intervals from backtest residuals
+    - The selected model and each model's backtest MAE/MAPE
     - Trend analysis (rising/falling/stable)
     - Moving averages
     """
     try:
-        result = service.simple_forecast(
+        result = service.forecast_prices(
             commodity=request.commodity,
-            days=request.days
+            days=request.days,
+            district=request.district,
+            market=request.market,
+            variety=request.variety
         )
         
         if 'error' in result:
@@ -245,6 +251,8 @@ async def health_check(
             message="Market Intelligence service is healthy",
             data={
                 'available_commodities': len(commodities),
+                'store': service.store.stats(),
+                'snapshots': service.snapshots.stats(),
                 'status': 'operational'
             }
         )
@@ -7,6 +7,7 @@ from typing import Optional
 import logging
 
 from app.models.common import ResponseModel
+from app.core.uploads import read_image_upload
 from app.services.soil_service import SoilAnalysisService, get_soil_service
 from app.services.image_analysis_service import ImageAnalysisService, get_image_service
 
@@ -160,22 +161,13 @@ async def analyze_soil_image(
     Returns comprehensive analysis combining visual soil assessment with lab data
     """
     try:
-        # Validate image file
-        if not image.content_type.startswith('image/'):
-            raise HTTPException(status_code=400, detail="File must be an image")
-        
-        # Check file size (max 10MB)
-        contents = await image.read()
-        if len(contents) > 10 * 1024 * 1024:
-            raise HTTPException(status_code=400, detail="Image size must be under 10MB")
-        
-        # Reset file pointer for image analysis
-        await image.seek(0)
+        # Stream the upload with header checks and the size limit
+        upload = await read_image_upload(image)
         
         logger.info(f"Starting image analysis for soil sample from {state}")
         
-        # Analyze image using OpenAI Vision
-        image_analysis = await image_service.analyze_soil_image(image)
+        # Analyze image using OpenAI Vision (reuses the buffer read above)
+        image_analysis = await image_service.analyze_soil_image(upload)
         
         # Get traditional soil analysis
         enhanced_params = {
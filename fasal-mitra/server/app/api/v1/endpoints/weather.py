@@ -97,7 +97,7 @@ async def get_location_name(
     Returns location name, state, country
     """
     try:
-        result = service.get_location_name(latitude=lat, longitude=lon)
+        result = await service.get_location_name(latitude=lat, longitude=lon)
         
         return ResponseModel(
             success=True,
@@ -108,3 +108,17 @@ async def get_location_name(
     except Exception as e:
         logger.error(f"Error getting location name: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/cache/stats", response_model=ResponseModel)
+async def get_weather_cache_stats(
+    service: WeatherServiceAPI = Depends(get_weather_service)
+):
+    """
+    Get hit/miss statistics for the weather and geocoding tile caches
+    """
+    return ResponseModel(
+        success=True,
+        message="Weather cache statistics retrieved",
+        data=service.cache_stats()
+    )
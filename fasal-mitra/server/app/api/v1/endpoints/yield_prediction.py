@@ -9,6 +9,7 @@ import logging
 from app.models.yield_models import (
     YieldPredictionRequest,
     YieldPredictionResponse,
+    YieldBatchPredictionRequest,
     YieldGapRequest,
     YieldGapResponse,
     BenchmarkRequest,
@@ -52,6 +53,34 @@ async def predict_yield(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/predict/batch", response_model=ResponseModel)
+async def predict_yield_batch(
+    request: YieldBatchPredictionRequest,
+    service: YieldPredictionService = Depends(get_yield_service)
+):
+    """
+    Predict crop yield for many farms in one request
+    
+    - **items**: List of prediction requests (same fields as `/predict`), up to 5000
+    
+    Returns per-farm predicted yield with 10th/90th percentile intervals.
+    Farms with an unknown crop, state or season get an `error` instead of
+    failing the whole batch.
+    """
+    try:
+        result = await service.predict_yield_batch(request.items)
+        
+        return ResponseModel(
+            success=True,
+            message=f"Predicted yield for {result['succeeded']} of {result['total']} farms",
+            data=result
+        )
+    
+    except Exception as e:
+        logger.error(f"Error in batch yield prediction: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/gap-analysis", response_model=ResponseModel)
 async def analyze_yield_gap(
     request: YieldGapRequest,
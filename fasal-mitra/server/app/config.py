@@ -4,10 +4,12 @@ Configuration management for FasalMitra API
 
 from pydantic_settings import BaseSettings
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 import os
 from dotenv import load_dotenv
 
+from app.models.disease import AdviceMode
+
 # Load .env file explicitly
 env_path = Path(__file__).parent.parent / ".env"
 if env_path.exists():
@@ -40,12 +42,40 @@ class Settings(BaseSettings):
     
     # File Upload
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
+    MAX_IMAGE_PIXELS: int = 50_000_000  # Checked from the image header, before decoding
     ALLOWED_EXTENSIONS: str = "jpg,jpeg,png,webp"
     UPLOAD_DIR: Path = Path("uploads")
     
     # ML Models
     MODEL_CACHE_SIZE: int = 100
     PREDICTION_TIMEOUT: int = 30
+    MODEL_ARTIFACT_DIR: Path = Path(__file__).parent.parent / "model_artifacts"  # Trained model cache
+    DISEASE_MODEL_BACKEND: str = "auto"  # auto | tflite | keras (auto prefers an exported .tflite model)
+    DISEASE_MODEL_THREADS: Optional[int] = None  # TFLite interpreter threads (None = runtime default)
+    DISEASE_BATCH_MAX_SIZE: int = 16  # Max images per disease CNN forward pass
+    DISEASE_BATCH_MAX_LATENCY_MS: float = 10.0  # Max wait for a batch to fill
+    DISEASE_BATCH_MAX_IMAGES: int = 10  # Photos accepted by /disease/detect/batch
+    IMAGE_PREPROCESS_WORKERS: int = 4  # Threads decoding/resizing uploaded images
+    DISEASE_CACHE_MAX_ENTRIES: int = 2048  # Per cache (CNN predictions, LLM advice)
+    DISEASE_CACHE_TTL: int = 24 * 3600  # Seconds
+    DISEASE_ADVICE_MODE: AdviceMode = AdviceMode.DEFERRED  # deferred: return detection now, advice via GET /disease/advice | inline
+    LLM_ADVICE_TTL: int = 30 * 24 * 3600  # Advice per (disease, crop, severity, region) is reused for 30 days
+    LLM_ADVICE_TIMEOUT: float = 30.0  # Seconds per Gemini call
+    LLM_ADVICE_CACHE_PATH: Path = Path(__file__).parent.parent / "cache" / "llm_advice.sqlite3"
+    
+    # Market Intelligence
+    MARKET_CATALOG_PATH: Path = Path(__file__).parent.parent / "cache" / "market_catalog.json"  # Per-report record counts/date ranges
+    MARKET_ARCHIVE_DIR: Path = Path(__file__).parent.parent / "cache" / "market_archive"  # Ingested, deduplicated report rows
+    
+    # Weather API (Open-Meteo) HTTP client
+    WEATHER_CONNECT_TIMEOUT: float = 5.0
+    WEATHER_READ_TIMEOUT: float = 10.0
+    WEATHER_MAX_CONNECTIONS: int = 20
+    WEATHER_MAX_KEEPALIVE: int = 10
+    WEATHER_TILE_SIZE_DEG: float = 0.05  # Cache grid cell (~5 km)
+    WEATHER_CURRENT_TTL: int = 600  # 10 minutes
+    WEATHER_FORECAST_TTL: int = 3 * 3600  # 3 hours
+    GEOCODE_TTL: int = 30 * 24 * 3600  # 30 days
     
     # Logging
     LOG_LEVEL: str = "INFO"
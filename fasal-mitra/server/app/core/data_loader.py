@@ -7,10 +7,12 @@ Handles loading and preprocessing of agricultural datasets.
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 import logging
 from functools import lru_cache
 
+from app.core.dataset_cache import load_csv_cached
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,6 +21,9 @@ class DataLoader:
     
     _instance = None  # Singleton instance
     
+    # Crop data columns indexed for filter_data (in sort order)
+    KEY_COLUMNS = ('crop', 'state', 'season')
+    
     def __new__(cls, data_dir: Optional[Path] = None):
         """Implement singleton pattern"""
         if cls._instance is None:
@@ -37,6 +42,13 @@ class DataLoader:
         self.weather_data: Optional[pd.DataFrame] = None
         self.price_data: Optional[pd.DataFrame] = None
         self.merged_data: Optional[pd.DataFrame] = None
+        
+        # filter_data index: crop data sorted by key, lowercased name -> code, key prefix -> row range
+        self._keyed_crop_data: Optional[pd.DataFrame] = None
+        self._key_codes: Dict[str, Dict[str, int]] = {}
+        self._sorted_codes: Dict[str, np.ndarray] = {}
+        self._group_slices: Dict[Tuple[int, ...], Tuple[int, int]] = {}
+        self._indexed_crop_data: Optional[pd.DataFrame] = None
         self._initialized = True
         
         logger.info(f"DataLoader initialized with data_dir: {self.data_dir}")
@@ -55,12 +67,13 @@ class DataLoader:
             # Load crop yield data
             crop_file = self.data_dir / "raw/crop_yield.csv"
             if crop_file.exists():
-                self.crop_data = pd.read_csv(crop_file)
-                # Clean column names and string columns
-                self.crop_data.columns = self.crop_data.columns.str.strip()
-                for col in ['crop', 'season', 'state']:
-                    if col in self.crop_data.columns:
-                        self.crop_data[col] = self.crop_data[col].str.strip()
+                # Cleaned (stripped, categorical) frame from the binary cache when fresh
+                self.crop_data = load_csv_cached(
+                    crop_file,
+                    strip_columns=['crop', 'season', 'state'],
+                    categorical_columns=['crop', 'season', 'state']
+                )
+                self._build_key_index()
                 logger.info(f"✅ Loaded crop data: {len(self.crop_data):,} records")
                 status['crop_data'] = True
             else:
@@ -74,9 +87,7 @@ class DataLoader:
             # Load soil data
             soil_file = self.data_dir / "raw/state_soil_data.csv"
             if soil_file.exists():
-                self.soil_data = pd.read_csv(soil_file)
-                self.soil_data.columns = self.soil_data.columns.str.strip()
-                self.soil_data['state'] = self.soil_data['state'].str.strip()
+                self.soil_data = load_csv_cached(soil_file, strip_columns=['state'])
                 logger.info(f"✅ Loaded soil data: {len(self.soil_data):,} records")
                 status['soil_data'] = True
             else:
@@ -90,9 +101,11 @@ class DataLoader:
             # Load weather data
             weather_file = self.data_dir / "raw/state_weather_data_1997_2020.csv"
             if weather_file.exists():
-                self.weather_data = pd.read_csv(weather_file)
-                self.weather_data.columns = self.weather_data.columns.str.strip()
-                self.weather_data['state'] = self.weather_data['state'].str.strip()
+                self.weather_data = load_csv_cached(
+                    weather_file,
+                    strip_columns=['state'],
+                    categorical_columns=['state']
+                )
                 logger.info(f"✅ Loaded weather data: {len(self.weather_data):,} records")
                 status['weather_data'] = True
             else:
@@ -106,12 +119,11 @@ class DataLoader:
             # Load price data
             price_file = self.data_dir / "raw/Price_Agriculture_commodities_Week.csv"
             if price_file.exists():
-                self.price_data = pd.read_csv(price_file)
-                self.price_data.columns = self.price_data.columns.str.strip()
-                if 'State' in self.price_data.columns:
-                    self.price_data['State'] = self.price_data['State'].str.strip()
-                if 'Commodity' in self.price_data.columns:
-                    self.price_data['Commodity'] = self.price_data['Commodity'].str.strip()
+                self.price_data = load_csv_cached(
+                    price_file,
+                    strip_columns=['State', 'Commodity'],
+                    categorical_columns=['State', 'District', 'Market', 'Commodity', 'Variety', 'Grade']
+                )
                 logger.info(f"✅ Loaded price data: {len(self.price_data):,} records")
                 status['price_data'] = True
             else:
@@ -154,6 +166,46 @@ class DataLoader:
         
         return merged
     
+    def _build_key_index(self):
+        """
+        Index crop data by case-normalized (crop, state, season).
+        
+        Each key column is mapped to integer codes (names differing only in
+        case share a code) and a copy of the crop data is stably sorted by
+        those codes, so every (crop), (crop, state) and (crop, state, season)
+        group is one contiguous row range.
+        """
+        df = self.crop_data
+        codes = {}
+        self._key_codes = {}
+        
+        for col in self.KEY_COLUMNS:
+            values = df[col].astype('category')
+            lowered_codes, lowered_names = pd.factorize(values.cat.categories.str.lower())
+            raw_codes = values.cat.codes.to_numpy()
+            codes[col] = np.where(raw_codes >= 0, lowered_codes[raw_codes], -1)
+            self._key_codes[col] = {name: i for i, name in enumerate(lowered_names)}
+        
+        # lexsort is stable, so rows keep their original order within a group
+        order = np.lexsort(tuple(codes[col] for col in reversed(self.KEY_COLUMNS)))
+        self._keyed_crop_data = df.iloc[order]
+        self._sorted_codes = {col: codes[col][order] for col in self.KEY_COLUMNS}
+        
+        self._group_slices = {}
+        n_rows = len(order)
+        changed = np.zeros(max(n_rows - 1, 0), dtype=bool)
+        for depth, col in enumerate(self.KEY_COLUMNS, start=1):
+            column_codes = self._sorted_codes[col]
+            changed |= column_codes[1:] != column_codes[:-1]
+            starts = np.concatenate(([0], np.flatnonzero(changed) + 1)) if n_rows else np.array([], dtype=int)
+            stops = np.append(starts[1:], n_rows)
+            for start, stop in zip(starts.tolist(), stops.tolist()):
+                key = tuple(int(self._sorted_codes[c][start]) for c in self.KEY_COLUMNS[:depth])
+                self._group_slices[key] = (start, stop)
+        
+        self._indexed_crop_data = df
+        logger.info(f"Indexed crop data: {len(self._group_slices):,} crop/state/season groups")
+    
     def filter_data(
         self,
         crop: Optional[str] = None,
@@ -164,6 +216,11 @@ class DataLoader:
         """
         Filter crop data by various parameters.
         
+        Crop, state and season are matched case-insensitively through the
+        key index; (crop), (crop, state) and (crop, state, season) filters
+        return a slice of the indexed frame without copying or scanning it.
+        The result is a read-only view - copy it before modifying.
+        
         Args:
             crop: Crop name
             state: State name
@@ -176,16 +233,41 @@ class DataLoader:
         if self.crop_data is None:
             raise ValueError("Crop data not loaded")
         
-        data = self.crop_data.copy()
+        # Rebuild if crop_data was replaced after loading
+        if self._indexed_crop_data is not self.crop_data:
+            self._build_key_index()
+        
+        data = self._keyed_crop_data
         
-        if crop:
-            data = data[data['crop'].str.lower() == crop.lower()]
-        if state:
-            data = data[data['state'].str.lower() == state.lower()]
-        if season:
-            data = data[data['season'].str.lower() == season.lower()]
+        # Unknown names have no code (-1) and match nothing
+        key = []
+        for col, value in zip(self.KEY_COLUMNS, (crop, state, season)):
+            key.append(self._key_codes[col].get(value.lower(), -1) if value else None)
+        
+        # Leading filters map directly to a contiguous row range
+        prefix = []
+        for code in key:
+            if code is None:
+                break
+            prefix.append(code)
+        
+        start, stop = 0, len(data)
+        if prefix:
+            start, stop = self._group_slices.get(tuple(prefix), (0, 0))
+        data = data.iloc[start:stop]
+        
+        # Remaining filters (e.g. state without crop) use the integer codes
+        mask = None
+        for col, code in zip(self.KEY_COLUMNS[len(prefix):], key[len(prefix):]):
+            if code is not None:
+                col_mask = self._sorted_codes[col][start:stop] == code
+                mask = col_mask if mask is None else mask & col_mask
         if year:
-            data = data[data['year'] == year]
+            year_mask = data['year'].to_numpy() == year
+            mask = year_mask if mask is None else mask & year_mask
+        
+        if mask is not None:
+            data = data[mask]
         
         return data
     
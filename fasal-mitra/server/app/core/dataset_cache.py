@@ -0,0 +1,117 @@
+"""
+Dataset Cache
+
+Columnar binary cache for the raw CSV datasets. The first load parses the
+CSV, strips padded strings (e.g. ``"Kharif     "``), converts key columns to
+categoricals and writes the cleaned frame to ``data/cache/``. Later loads read
+that file directly and only fall back to the CSV when its content hash
+changes.
+
+Parquet (via pyarrow) is used when installed; otherwise the cleaned frame is
+stored as a pandas pickle, which also keeps the categorical dtypes.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Bump when the cleaning steps change so old cache files are rebuilt
+CACHE_VERSION = 1
+
+
+def file_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def clean_frame(
+    df: pd.DataFrame,
+    strip_columns: Iterable[str] = (),
+    categorical_columns: Iterable[str] = ()
+) -> pd.DataFrame:
+    """Strip column names and string values, and type key columns as categoricals"""
+    df.columns = df.columns.str.strip()
+    for col in strip_columns:
+        if col in df.columns:
+            df[col] = df[col].str.strip()
+    for col in categorical_columns:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def load_csv_cached(
+    csv_path: Path,
+    cache_dir: Optional[Path] = None,
+    strip_columns: Iterable[str] = (),
+    categorical_columns: Iterable[str] = ()
+) -> pd.DataFrame:
+    """
+    Load a cleaned CSV, using the binary cache when it matches the source file.
+
+    Args:
+        csv_path: Source CSV
+        cache_dir: Cache directory (defaults to <csv dir>/../cache)
+        strip_columns: String columns to strip of surrounding whitespace
+        categorical_columns: Columns to store as categoricals
+
+    Returns:
+        Cleaned DataFrame (identical whether read from cache or CSV)
+    """
+    csv_path = Path(csv_path)
+    cache_dir = Path(cache_dir) if cache_dir else csv_path.parent.parent / "cache"
+    strip_columns = list(strip_columns)
+    categorical_columns = list(categorical_columns)
+
+    # Cache key: source content + cleaning spec + format
+    spec = json.dumps([CACHE_VERSION, strip_columns, categorical_columns])
+    key = hashlib.sha256((file_hash(csv_path) + spec).encode()).hexdigest()[:16]
+    ext = "parquet" if PARQUET_AVAILABLE else "pkl"
+    cache_file = cache_dir / f"{csv_path.stem}.{key}.{ext}"
+
+    if cache_file.exists():
+        try:
+            if PARQUET_AVAILABLE:
+                return pd.read_parquet(cache_file)
+            return pd.read_pickle(cache_file)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache file {cache_file.name}: {e}")
+
+    df = clean_frame(pd.read_csv(csv_path), strip_columns, categorical_columns)
+
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        if PARQUET_AVAILABLE:
+            df.to_parquet(tmp_file, index=False)
+        else:
+            df.to_pickle(tmp_file)
+        os.replace(tmp_file, cache_file)
+
+        # Drop cache files built from older versions of this CSV
+        for old in cache_dir.glob(f"{csv_path.stem}.*"):
+            if old != cache_file and not old.name.endswith(".tmp"):
+                old.unlink(missing_ok=True)
+
+        logger.info(f"Cached {csv_path.name} -> {cache_file.name}")
+    except OSError as e:
+        logger.warning(f"Could not write dataset cache for {csv_path.name}: {e}")
+
+    return df
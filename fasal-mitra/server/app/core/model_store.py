@@ -0,0 +1,196 @@
+"""
+Model Artifact Store
+
+Versioned on-disk store for trained ML models so worker processes load a
+fitted model in milliseconds instead of retraining it on every start.
+
+Each artifact lives under ``<root>/<name>/<fingerprint prefix>/`` and holds:
+- ``model.joblib``: the payload (fitted estimator, label encoders, feature columns, ...)
+- ``meta.json``: fingerprint, store version, library versions and training metrics
+
+The fingerprint covers the training data content and the training
+parameters, so a changed dataset or hyperparameter produces a new artifact
+and triggers exactly one retrain.
+"""
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+logger = logging.getLogger(__name__)
+
+# Bump when the payload layout changes so old artifacts are ignored
+ARTIFACT_VERSION = 1
+
+# How long a worker waits for another worker that is training the same artifact
+LOCK_TIMEOUT_SECONDS = 600
+
+
+def fingerprint_training_data(data: pd.DataFrame, params: Dict[str, Any]) -> str:
+    """
+    Hash the training frame content together with the training parameters.
+
+    Args:
+        data: Exact frame the model is fitted on (features + target)
+        params: Hyperparameters and feature lists that affect the fitted model
+
+    Returns:
+        Hex digest identifying this training run
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(list(data.columns)).encode())
+    row_hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    digest.update(np.ascontiguousarray(row_hashes).tobytes())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    digest.update(f"v{ARTIFACT_VERSION}-sklearn{sklearn.__version__}".encode())
+    return digest.hexdigest()
+
+
+class ModelArtifactStore:
+    """Load-or-train cache for fitted models, shared by all worker processes"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _artifact_dir(self, name: str, fingerprint: str) -> Path:
+        return self.root / name / fingerprint[:16]
+
+    def load(self, name: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Load an artifact if one exists for this fingerprint"""
+        artifact_dir = self._artifact_dir(name, fingerprint)
+        meta_file = artifact_dir / "meta.json"
+        model_file = artifact_dir / "model.joblib"
+
+        if not meta_file.exists() or not model_file.exists():
+            return None
+
+        try:
+            meta = json.loads(meta_file.read_text())
+            if meta.get("fingerprint") != fingerprint or meta.get("version") != ARTIFACT_VERSION:
+                return None
+
+            start = time.perf_counter()
+            # Memory-map the large numpy arrays rather than copying them into each worker
+            payload = joblib.load(model_file, mmap_mode='r')
+            logger.info(f"✅ Loaded {name} artifact {fingerprint[:12]} in {(time.perf_counter() - start) * 1000:.0f} ms")
+            return payload
+        except Exception as e:
+            logger.warning(f"Could not load {name} artifact {fingerprint[:12]}: {e}")
+            return None
+
+    def save(self, name: str, fingerprint: str, payload: Dict[str, Any], metrics: Optional[Dict] = None) -> Path:
+        """Write an artifact atomically (temp file + rename)"""
+        artifact_dir = self._artifact_dir(name, fingerprint)
+        artifact_dir.mkdir(parents=True, exist_ok=True)
+
+        tmp_model = artifact_dir / f"model.joblib.{os.getpid()}.tmp"
+        joblib.dump(payload, tmp_model)
+        os.replace(tmp_model, artifact_dir / "model.joblib")
+
+        meta = {
+            "name": name,
+            "fingerprint": fingerprint,
+            "version": ARTIFACT_VERSION,
+            "sklearn_version": sklearn.__version__,
+            "created_at": datetime.now().isoformat(),
+            "metrics": metrics or {}
+        }
+        tmp_meta = artifact_dir / f"meta.json.{os.getpid()}.tmp"
+        tmp_meta.write_text(json.dumps(meta, indent=2))
+        os.replace(tmp_meta, artifact_dir / "meta.json")
+
+        logger.info(f"💾 Saved {name} artifact {fingerprint[:12]} to {artifact_dir}")
+        return artifact_dir
+
+    def load_or_train(
+        self,
+        name: str,
+        fingerprint: str,
+        train_fn: Callable[[], Tuple[Dict[str, Any], Dict]]
+    ) -> Dict[str, Any]:
+        """
+        Return the stored artifact for this fingerprint, training it if missing.
+
+        Only one process trains a given artifact; the others wait on a lock
+        file and then load what it wrote.
+
+        Args:
+            name: Artifact name (e.g. "yield_model")
+            fingerprint: Output of fingerprint_training_data()
+            train_fn: Callable returning (payload, metrics)
+        """
+        payload = self.load(name, fingerprint)
+        if payload is not None:
+            return payload
+
+        lock_file = self._artifact_dir(name, fingerprint).with_suffix(".lock")
+        lock_file.parent.mkdir(parents=True, exist_ok=True)
+
+        if not self._acquire_lock(lock_file):
+            logger.warning(f"Lock wait for {name} timed out - training locally")
+            payload, _ = train_fn()
+            return payload
+
+        try:
+            # Re-check: another worker may have written it just before we got the lock
+            payload = self.load(name, fingerprint)
+            if payload is not None:
+                return payload
+
+            payload, metrics = train_fn()
+            try:
+                self.save(name, fingerprint, payload, metrics)
+                self.prune(name, keep=fingerprint)
+            except OSError as e:
+                logger.warning(f"Could not persist {name} artifact: {e}")
+            return payload
+        finally:
+            lock_file.unlink(missing_ok=True)
+
+    def _acquire_lock(self, lock_file: Path) -> bool:
+        """Create the lock file, waiting while another process holds it (False on timeout)"""
+        deadline = time.monotonic() + LOCK_TIMEOUT_SECONDS
+        while True:
+            try:
+                fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return True
+            except FileExistsError:
+                # Treat locks older than the timeout as left behind by a crashed worker
+                try:
+                    if time.time() - lock_file.stat().st_mtime > LOCK_TIMEOUT_SECONDS:
+                        lock_file.unlink(missing_ok=True)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    return False
+                time.sleep(0.5)
+
+    def prune(self, name: str, keep: str):
+        """Remove artifacts for other fingerprints of this model"""
+        keep_dir = self._artifact_dir(name, keep)
+        model_root = self.root / name
+        if not model_root.exists():
+            return
+
+        for artifact_dir in model_root.iterdir():
+            if artifact_dir.is_dir() and artifact_dir != keep_dir:
+                try:
+                    for f in artifact_dir.iterdir():
+                        f.unlink(missing_ok=True)
+                    artifact_dir.rmdir()
+                    logger.info(f"🗑️ Removed stale {name} artifact {artifact_dir.name}")
+                except OSError as e:
+                    logger.warning(f"Could not remove stale artifact {artifact_dir}: {e}")
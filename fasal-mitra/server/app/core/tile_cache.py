@@ -0,0 +1,106 @@
+"""
+Spatial Tile Cache
+
+TTL cache for location-based upstream calls (weather, reverse geocoding).
+Coordinates are snapped to a coarse lat/lon grid, so farms a few hundred
+metres apart share one cached upstream response.
+
+Concurrent misses for the same tile are coalesced: the first caller starts
+the fetch as a task, and every caller awaits that task instead of calling
+upstream again. A caller that is cancelled (e.g. its client disconnected)
+does not cancel the fetch for the others. Failed fetches are not cached.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def tile_for(latitude: float, longitude: float, tile_size: float) -> Tuple[int, int]:
+    """Grid cell containing a coordinate"""
+    return math.floor(latitude / tile_size), math.floor(longitude / tile_size)
+
+
+def tile_center(tile: Tuple[int, int], tile_size: float) -> Tuple[float, float]:
+    """Centre coordinate of a grid cell (rounded for stable upstream URLs)"""
+    lat_idx, lon_idx = tile
+    return round((lat_idx + 0.5) * tile_size, 4), round((lon_idx + 0.5) * tile_size, 4)
+
+
+class TileCache:
+    """Async TTL + LRU cache with single-flight fetching per key"""
+
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int = 10000):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for key, calling fetch() on a miss.
+
+        Args:
+            key: Cache key (usually a tile plus request options)
+            fetch: Coroutine factory performing the upstream call
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.get_running_loop().create_task(self._fetch(key, fetch))
+            self._in_flight[key] = task
+            # Mark a failure retrieved so one nobody is left awaiting doesn't log a warning
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        # Shield so one caller disconnecting doesn't cancel the shared fetch
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+            self._store(key, value)
+            return value
+        finally:
+            self._in_flight.pop(key, None)
+
+    def _store(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached entries (counters are kept)"""
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0
+        }
@@ -0,0 +1,189 @@
+"""
+Image Uploads
+
+Bounded reading of uploaded images. The header is sniffed from the first
+chunk to check the real format and pixel dimensions before the body is
+read, and the body read stops at MAX_UPLOAD_SIZE, so an upload never costs
+more than the limit in memory. The returned bytes are the one buffer that
+hashing, decoding and base64 encoding all share.
+"""
+
+import logging
+import struct
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+HEADER_CHUNK_SIZE = 64 * 1024
+# JPEG dimensions follow EXIF/ICC segments; give up looking past this
+MAX_HEADER_BYTES = 256 * 1024
+
+_EXTENSIONS = {"jpeg": ("jpg", "jpeg"), "png": ("png",), "webp": ("webp",)}
+
+
+@dataclass
+class ImageUpload:
+    """An uploaded image read into memory after its header checked out"""
+    data: bytes
+    format: str  # jpeg, png or webp
+    width: int
+    height: int
+    filename: Optional[str] = None
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.data)
+
+    @property
+    def media_type(self) -> str:
+        return f"image/{self.format}"
+
+
+def sniff_image_format(head: bytes) -> Optional[str]:
+    """Image format from the file signature, or None if unrecognised"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def sniff_image_size(head: bytes, image_format: str) -> Optional[Tuple[int, int]]:
+    """
+    (width, height) read from the image header without decoding it
+
+    Returns None if more bytes are needed; raises ValueError for a
+    malformed header.
+    """
+    if image_format == "png":
+        if len(head) < 24:
+            return None
+        if head[12:16] != b"IHDR":
+            raise ValueError("PNG is missing its IHDR chunk")
+        return struct.unpack(">II", head[16:24])
+
+    if image_format == "webp":
+        if len(head) < 30:
+            return None
+        chunk = head[12:16]
+        if chunk == b"VP8X":
+            return (1 + int.from_bytes(head[24:27], "little"),
+                    1 + int.from_bytes(head[27:30], "little"))
+        if chunk == b"VP8L":
+            bits = int.from_bytes(head[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", head[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        raise ValueError(f"Unknown WEBP chunk {chunk!r}")
+
+    if image_format == "jpeg":
+        # Walk the marker segments up to the start-of-frame
+        pos = 2
+        while pos + 4 <= len(head):
+            if head[pos] != 0xFF:
+                raise ValueError("Corrupt JPEG marker")
+            marker = head[pos + 1]
+            if marker == 0xFF:  # fill byte
+                pos += 1
+                continue
+            if marker == 0x01 or 0xD0 <= marker <= 0xD7:  # markers without a length
+                pos += 2
+                continue
+            if marker == 0xDA:
+                raise ValueError("JPEG has no frame header before the image data")
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                if pos + 9 > len(head):
+                    return None
+                height, width = struct.unpack(">HH", head[pos + 5:pos + 9])
+                return width, height
+            pos += 2 + struct.unpack(">H", head[pos + 2:pos + 4])[0]
+        return None
+
+    raise ValueError(f"Unsupported image format: {image_format}")
+
+
+def _size_error(max_size: int, label: str) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"{label} exceeds maximum allowed size ({max_size // (1024 * 1024)}MB)"
+    )
+
+
+async def read_image_upload(
+    file: UploadFile,
+    max_size: Optional[int] = None,
+    max_pixels: Optional[int] = None
+) -> ImageUpload:
+    """
+    Validate and read an uploaded image with bounded memory
+
+    Rejects, before reading the body, files whose declared size is over the
+    limit, whose signature is not an allowed image format, or whose header
+    dimensions are empty or above MAX_IMAGE_PIXELS. The body read itself
+    stops one byte past the limit.
+
+    Raises:
+        HTTPException: 400 (empty/corrupt), 413 (too large), 415 (not an allowed image)
+    """
+    max_size = max_size or settings.MAX_UPLOAD_SIZE
+    max_pixels = max_pixels or settings.MAX_IMAGE_PIXELS
+    label = f"File '{file.filename}'" if file.filename else "File"
+
+    # Multipart parsing already knows the size; reject without reading
+    if file.size is not None and file.size > max_size:
+        raise _size_error(max_size, f"{label} ({file.size/1024/1024:.1f}MB)")
+
+    head = b""
+    image_format = None
+    dimensions = None
+    try:
+        while dimensions is None and len(head) < MAX_HEADER_BYTES:
+            chunk = await file.read(HEADER_CHUNK_SIZE)
+            if not chunk:
+                break
+            head += chunk
+            if image_format is None:
+                image_format = sniff_image_format(head)
+                if image_format is None and len(head) >= 12:
+                    break
+            if image_format is not None:
+                dimensions = sniff_image_size(head, image_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{label} is not a valid image: {e}")
+
+    if not head:
+        raise HTTPException(status_code=400, detail=f"Empty file uploaded: {label}")
+
+    allowed = settings.allowed_extensions_list
+    if image_format is None or not any(ext in allowed for ext in _EXTENSIONS[image_format]):
+        raise HTTPException(
+            status_code=415,
+            detail=f"{label} must be an image ({', '.join(ext.upper() for ext in allowed)})"
+        )
+
+    if dimensions is None:
+        raise HTTPException(status_code=400, detail=f"{label} is not a valid image: could not read its dimensions")
+
+    width, height = dimensions
+    if width == 0 or height == 0 or width * height > max_pixels:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{label} has unsupported dimensions {width}x{height} (max {max_pixels // 1_000_000} megapixels)"
+        )
+
+    # One bounded read of the whole body into the buffer everything downstream shares
+    await file.seek(0)
+    data = await file.read(max_size + 1)
+    if len(data) > max_size:
+        raise _size_error(max_size, label)
+
+    logger.debug(f"Upload accepted: {file.filename} {image_format} {width}x{height}, {len(data)/1024:.1f}KB")
+    return ImageUpload(data=data, format=image_format, width=width, height=height, filename=file.filename)
@@ -17,6 +17,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 from app.config import settings
 from app.api.v1.api import api_router
 from app.middleware.error_handler import setup_exception_handlers
+from app.middleware.upload_limit import UploadSizeLimitMiddleware
 
 # Configure logging
 logging.basicConfig(
@@ -57,6 +58,14 @@ app = FastAPI(
     openapi_url="/openapi.json"
 )
 
+# Refuse oversized uploads from Content-Length, before the body is read
+# (added before CORS so the rejection still carries CORS headers)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_upload_size=settings.MAX_UPLOAD_SIZE,
+    max_files=settings.DISEASE_BATCH_MAX_IMAGES,
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -119,7 +128,32 @@ async def startup_event():
             logger.warning("[STARTUP] ML model not loaded - will use fallback detection")
     except Exception as e:
         logger.error(f"[STARTUP] Failed to pre-load ML service: {e}")
-    
+
+    # Warm the crop planning engine so the first /crop-planning request doesn't parse CSVs
+    logger.info("[STARTUP] Pre-loading Crop Planning Service...")
+    try:
+        from app.services.crop_planning_service import get_crop_planning_service
+        planning_service = get_crop_planning_service()
+        logger.info(f"[STARTUP] Crop planning data loaded ({len(planning_service.crop_requirements)} crops)")
+    except Exception as e:
+        logger.error(f"[STARTUP] Failed to pre-load crop planning service: {e}")
+
+    # Parse the market reports once so market endpoints are served from memory
+    logger.info("[STARTUP] Pre-loading market price reports...")
+    try:
+        from app.services.market_intelligence_service import get_market_intelligence_service
+        market_service = get_market_intelligence_service()
+        market_store = market_service.store
+        market_store.refresh(force=True)
+        # Fit and backtest the forecast models and build the per-market snapshots,
+        # so forecast, comparison and insights requests never aggregate history
+        for commodity in market_store.commodities():
+            market_service.forecaster.get_fit(commodity, market_store.get(commodity))
+            market_service.snapshots.get(commodity, market_store.get(commodity))
+        logger.info(f"[STARTUP] Market data loaded ({market_store.stats()['commodities']} commodities, forecasts fitted, snapshots built)")
+    except Exception as e:
+        logger.error(f"[STARTUP] Failed to pre-load market data: {e}")
+
     logger.info("[STARTUP] FasalMitra API is ready to accept requests!")
 
 # Shutdown event
@@ -127,6 +161,21 @@ async def startup_event():
 async def shutdown_event():
     """Actions to perform on application shutdown"""
     logger.info("Shutting down FasalMitra API")
+    
+    # Release pooled weather API connections
+    try:
+        from app.services.weather_service import get_weather_service
+        await get_weather_service().close()
+    except Exception as e:
+        logger.error(f"Failed to close weather client: {e}")
+    
+    # Stop the disease model's batching worker
+    try:
+        from app.services import ml_disease_service
+        if ml_disease_service._ml_disease_service is not None:
+            ml_disease_service._ml_disease_service.shutdown()
+    except Exception as e:
+        logger.error(f"Failed to stop disease inference worker: {e}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+"""Upload size limit middleware"""
+
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Room for form fields and multipart boundaries on top of the file bytes
+FORM_OVERHEAD = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject multipart uploads over the size limit
+
+    A Content-Length over the limit is refused before the body is received,
+    so the upload is never spooled. Uploads without one (chunked transfer
+    encoding) are counted as they arrive and refused as soon as they pass
+    the limit. Paths ending in /batch allow max_files files. Per-file limits
+    are still enforced when each file is read.
+    """
+
+    def __init__(self, app, max_upload_size: int, max_files: int = 1):
+        self.app = app
+        self.max_upload_size = max_upload_size
+        self.max_files = max_files
+
+    def limit_for(self, path: str) -> int:
+        files = self.max_files if path.rstrip("/").endswith("/batch") else 1
+        return self.max_upload_size * files + FORM_OVERHEAD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        limit = self.limit_for(path)
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            logger.warning(f"Rejected upload to {path}: {int(content_length)} bytes > {limit}")
+            await self._reject(send, limit)
+            return
+
+        received = 0
+        rejected = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    logger.warning(f"Rejected upload to {path}: body passed {limit} bytes")
+                    rejected = True
+                    if not response_started:
+                        await self._reject(send, limit)
+                    # The app sees a disconnect and stops reading
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if rejected:
+                return  # The 413 has been sent; drop whatever the app answers
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except Exception:
+            # Errors from the app reacting to the cut-off body
+            if not rejected:
+                raise
+
+    async def _reject(self, send, limit: int):
+        body = json.dumps({
+            "error": True,
+            "message": f"Upload exceeds maximum allowed size ({limit // (1024 * 1024)}MB)",
+            "status_code": 413
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -27,6 +27,7 @@ class HealthResponse(BaseModel):
     environment: str
     version: str
     timestamp: datetime = Field(default_factory=datetime.now)
+    caches: Optional[Dict[str, Any]] = None
 
 
 class PaginationParams(BaseModel):
@@ -15,6 +15,12 @@ class SeverityLevel(str, Enum):
     SEVERE = "severe"
 
 
+class AdviceMode(str, Enum):
+    """When LLM treatment advice is added to a detection result"""
+    DEFERRED = "deferred"  # Return now; advice via GET /disease/advice
+    INLINE = "inline"  # Wait for the advice
+
+
 class DiseaseDetectionRequest(BaseModel):
     """Request model for disease detection"""
     crop_type: str = Field(..., description="Type of crop", example="Rice")
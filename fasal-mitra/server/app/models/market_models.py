@@ -14,6 +14,8 @@ class ForecastRequest(BaseModel):
     commodity: str = Field(..., description="Commodity name (e.g., Cotton, Wheat, Potato)")
     days: int = Field(default=7, ge=1, le=30, description="Number of days to forecast")
     district: Optional[str] = Field(None, description="Filter by specific district")
+    market: Optional[str] = Field(None, description="Forecast a specific market (APMC)")
+    variety: Optional[str] = Field(None, description="Filter by variety")
 
 
 class PriceForecast(BaseModel):
@@ -41,6 +43,9 @@ class ForecastResponse(BaseModel):
     trend: TrendInfo
     model: str
     last_updated: str
+    scope: Optional[Dict[str, Optional[str]]] = None
+    interval_level: Optional[float] = None
+    backtest: Optional[Dict[str, Dict[str, Optional[float]]]] = None
 
 
 class MarketComparisonRequest(BaseModel):
@@ -62,6 +67,10 @@ class MarketData(BaseModel):
     arrival_quantity: float
     date: str
     price_unit: str
+    avg_7d: Optional[float] = None
+    avg_14d: Optional[float] = None
+    avg_30d: Optional[float] = None
+    volatility_30d: Optional[float] = Field(None, description="30-day coefficient of variation of the modal price (%)")
     score: Optional[float] = None
     reasoning: Optional[List[str]] = None
 
@@ -45,6 +45,16 @@ class YieldPredictionResponse(BaseModel):
     model_confidence: float = Field(..., ge=0.0, le=1.0)
 
 
+class YieldBatchPredictionRequest(BaseModel):
+    """Request model for bulk yield prediction"""
+    items: List[YieldPredictionRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=5000,
+        description="Farms to predict, one entry per farm"
+    )
+
+
 class YieldGapRequest(BaseModel):
     """Request for yield gap analysis - supports both actual and predicted scenarios"""
     crop: str = Field(..., description="Crop name")
@@ -0,0 +1,221 @@
+"""
+Commodity Catalog
+
+Persisted manifest of the market report files: commodity name, record count
+and arrival date range per file. A file is re-scanned only when its size or
+mtime changes, and a scan is one byte-level pass that counts rows and
+tracks the min/max arrival date without building a DataFrame. The catalog
+is kept in memory and the directory is re-checked at most every
+CHECK_INTERVAL seconds, so /market/commodities is a dict lookup.
+
+With a market archive, overlapping reports of a commodity are merged into
+one deduplicated set of rows, so the record count and date range of an
+archived commodity come from the archive's totals instead of the files.
+"""
+
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.services.commodity_store import REPORT_MARKER, CHECK_INTERVAL, commodity_name
+from app.services.market_archive import MarketArchive
+
+logger = logging.getLogger(__name__)
+
+# Bump when the scanned fields change so old manifests are rebuilt
+MANIFEST_VERSION = 1
+
+
+def _date_key(value: bytes) -> Optional[int]:
+    """b'31-12-2025' -> 20251231 (sortable), None if malformed"""
+    parts = value.strip().strip(b'"').split(b'-')
+    if len(parts) != 3 or not all(p.isdigit() for p in parts):
+        return None
+    day, month, year = (int(p) for p in parts)
+    return year * 10000 + month * 100 + day
+
+
+def _iso(key: int) -> str:
+    return f"{key // 10000:04d}-{key // 100 % 100:02d}-{key % 100:02d}"
+
+
+def scan_report(path: Path) -> Dict:
+    """Record count and arrival date range of a report, without parsing it into a frame"""
+    records = 0
+    first = last = None
+    with open(path, 'rb') as f:
+        f.readline()  # report title
+        header = next(csv.reader([f.readline().decode('utf-8-sig')]))
+        date_index = header.index('Arrival Date')
+        date_is_last = date_index == len(header) - 1
+
+        for line in f:
+            if not line.strip():
+                continue
+            records += 1
+            if date_is_last:
+                value = line.rstrip(b'\r\n').rsplit(b',', 1)[-1]
+            else:
+                value = next(csv.reader([line.decode('utf-8')]))[date_index].encode()
+            key = _date_key(value)
+            if key is not None:
+                first = key if first is None or key < first else first
+                last = key if last is None or key > last else last
+
+    date_range = None
+    if first is not None:
+        start, end = _iso(first), _iso(last)
+        date_range = {
+            'start': start,
+            'end': end,
+            'days': (date.fromisoformat(end) - date.fromisoformat(start)).days
+        }
+    return {'record_count': records, 'date_range': date_range}
+
+
+class CommodityCatalog:
+    """File name -> scanned metadata, persisted to a JSON manifest"""
+
+    def __init__(
+        self,
+        data_path: Path,
+        manifest_path: Path,
+        categorize: Callable[[str], str],
+        check_interval: float = CHECK_INTERVAL,
+        archive: Optional[MarketArchive] = None
+    ):
+        self.data_path = Path(data_path)
+        self.manifest_path = Path(manifest_path)
+        self.categorize = categorize
+        self.check_interval = check_interval
+        self.archive = archive
+        self._archived: Dict[str, Dict] = {}  # commodity -> archive summary in the list
+        self._entries: Dict[str, Dict] = self._read_manifest()
+        self._commodities: Optional[List[Dict]] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.scans = 0
+
+    def _read_manifest(self) -> Dict[str, Dict]:
+        try:
+            manifest = json.loads(self.manifest_path.read_text())
+            if manifest.get('version') == MANIFEST_VERSION:
+                return manifest['files']
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable commodity manifest {self.manifest_path}: {e}")
+        return {}
+
+    def _write_manifest(self):
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.manifest_path.with_name(f"{self.manifest_path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps({'version': MANIFEST_VERSION, 'files': self._entries}, indent=1))
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            logger.warning(f"Could not write commodity manifest: {e}")
+
+    def refresh(self, force: bool = False):
+        """Re-scan new or changed report files and drop removed ones"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._commodities is not None and now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+
+            try:
+                reports = {
+                    entry.name: entry for entry in os.scandir(self.data_path)
+                    if entry.name.endswith('.csv') and REPORT_MARKER in entry.name
+                }
+            except FileNotFoundError:
+                logger.warning(f"Market data directory not found: {self.data_path}")
+                reports = {}
+
+            changed = False
+            for name in list(self._entries):
+                if name not in reports:
+                    del self._entries[name]
+                    changed = True
+
+            for name, entry in reports.items():
+                stat = entry.stat()
+                cached = self._entries.get(name)
+                if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+                    continue
+                try:
+                    scanned = scan_report(Path(entry.path))
+                except Exception as e:
+                    logger.error(f"Error processing {name}: {str(e)}")
+                    self._entries.pop(name, None)
+                    continue
+                self._entries[name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, **scanned}
+                self.scans += 1
+                changed = True
+
+            if changed or self._commodities is None:
+                self._commodities = self._build_list()
+            if changed:
+                self._write_manifest()
+                logger.info(f"Commodity catalog updated ({len(self._entries)} reports, {self.scans} scanned)")
+
+    def _archive_summaries(self) -> Dict[str, Dict]:
+        if self.archive is None:
+            return {}
+        return {name: self.archive.summary(name) for name in self.archive.commodities()}
+
+    def _build_list(self) -> List[Dict]:
+        self._archived = self._archive_summaries()
+
+        # Without an archive, overlapping downloads of a commodity: list the newest report
+        newest: Dict[str, Dict] = {}
+        for file_name, entry in sorted(self._entries.items()):
+            name = commodity_name(Path(file_name))
+            current = newest.get(name)
+            if current is None or self._end_date(entry) >= self._end_date(current):
+                newest[name] = entry
+
+        commodities = []
+        for name in sorted(set(newest) | set(self._archived)):
+            summary = self._archived.get(name)
+            if summary is not None:
+                record_count, date_range = summary['records'], self._with_days(summary['date_range'])
+            else:
+                record_count, date_range = newest[name]['record_count'], newest[name]['date_range']
+            commodities.append({
+                'name': name,
+                'category': self.categorize(name),
+                'record_count': record_count,
+                'date_range': date_range
+            })
+        # Sort by category and name
+        commodities.sort(key=lambda x: (x['category'], x['name']))
+        return commodities
+
+    @staticmethod
+    def _end_date(entry: Dict) -> str:
+        return entry['date_range']['end'] if entry['date_range'] else ''
+
+    @staticmethod
+    def _with_days(date_range: Optional[Dict]) -> Optional[Dict]:
+        """Archive {'start', 'end'} -> the catalog's {'start', 'end', 'days'}"""
+        if not date_range:
+            return None
+        days = (date.fromisoformat(date_range['end']) - date.fromisoformat(date_range['start'])).days
+        return {'start': date_range['start'], 'end': date_range['end'], 'days': days}
+
+    def commodities(self) -> List[Dict]:
+        """Catalog entries sorted by category and name (shared; treat as read-only)"""
+        self.refresh()
+        # Rows ingested since the list was built (a cheap manifest lookup per commodity)
+        if self.archive is not None and self._archive_summaries() != self._archived:
+            with self._lock:
+                self._commodities = self._build_list()
+        return self._commodities
@@ -0,0 +1,206 @@
+"""
+Commodity Store
+
+In-memory store of the Agmarknet daily price/arrival reports used by market
+intelligence. Every report in the directory is parsed once into a typed,
+date-sorted frame. A report is re-parsed only when its size or mtime
+changes, and the directory is checked at most every CHECK_INTERVAL
+seconds, so repeated market calls are served from memory.
+
+With a MarketIngestion the store serves archived rows instead: new or
+changed reports are ingested into the archive, and only the appended
+segments are read and added to the in-memory frames. Listeners are told
+about appended rows so derived aggregates can be updated incrementally.
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+REPORT_MARKER = " Daily Price Arrival Report"
+PRICE_COLUMNS = ['Min Price', 'Max Price', 'Modal Price']
+NUMERIC_COLUMNS = PRICE_COLUMNS + ['Arrival Quantity']
+
+# Seconds between directory checks for new or modified reports
+CHECK_INTERVAL = 10.0
+
+
+def commodity_name(path: Path) -> str:
+    """'Cotton Daily Price Arrival Report-...csv' -> 'Cotton'"""
+    return path.name.split(REPORT_MARKER)[0]
+
+
+def parse_report(path: Path) -> pd.DataFrame:
+    """Parse one report CSV into a typed frame sorted by arrival date"""
+    # First row is the report title; prices use thousands separators ("7,300.00")
+    df = pd.read_csv(path, skiprows=1, thousands=',')
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    df['Arrival Date'] = pd.to_datetime(df['Arrival Date'], format='%d-%m-%Y')
+    return df.sort_values('Arrival Date', kind='stable').reset_index(drop=True)
+
+
+# Called as listener(commodity, old_frame, new_frame, new_rows) after rows are appended
+AppendListener = Callable[[str, pd.DataFrame, pd.DataFrame, pd.DataFrame], None]
+
+
+class CommodityStore:
+    """Commodity name -> parsed report frame, invalidated by file size/mtime"""
+
+    def __init__(self, data_path: Path, check_interval: float = CHECK_INTERVAL, ingestion=None):
+        self.data_path = Path(data_path)
+        self.check_interval = check_interval
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._sources: Dict[str, Tuple[str, int, int]] = {}  # name -> (file, size, mtime_ns)
+        self._segments: Dict[str, List[str]] = {}  # name -> archive segments in the frame
+        self._listeners: List[AppendListener] = []
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.appends = 0
+        # MarketIngestion: serve its archive and feed it new reports
+        self.ingestion = ingestion
+        self.archive = ingestion.archive if ingestion is not None else None
+
+    def add_listener(self, listener: AppendListener):
+        """Register a callback for rows appended to a loaded frame"""
+        self._listeners.append(listener)
+
+    def _scan(self) -> Dict[str, os.DirEntry]:
+        """Newest report file per commodity"""
+        reports: Dict[str, os.DirEntry] = {}
+        try:
+            entries = sorted(os.scandir(self.data_path), key=lambda e: e.name)
+        except FileNotFoundError:
+            logger.warning(f"Market data directory not found: {self.data_path}")
+            return reports
+
+        for entry in entries:
+            if not (entry.name.endswith('.csv') and REPORT_MARKER in entry.name):
+                continue
+            name = commodity_name(Path(entry.name))
+            current = reports.get(name)
+            if current is not None:
+                logger.warning(f"Several reports for {name}; using the most recently modified")
+                if current.stat().st_mtime_ns >= entry.stat().st_mtime_ns:
+                    continue
+            reports[name] = entry
+        return reports
+
+    def refresh(self, force: bool = False):
+        """Load new or changed reports and drop removed ones"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._frames and now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+
+            if self.archive is not None:
+                self._refresh_archive()
+                return
+
+            reports = self._scan()
+            for name in list(self._frames):
+                if name not in reports:
+                    del self._frames[name]
+                    del self._sources[name]
+
+            for name, entry in reports.items():
+                stat = entry.stat()
+                source = (entry.name, stat.st_size, stat.st_mtime_ns)
+                if self._sources.get(name) == source:
+                    continue
+                try:
+                    self._frames[name] = parse_report(Path(entry.path))
+                    self._sources[name] = source
+                    self.loads += 1
+                    logger.info(f"Loaded {len(self._frames[name])} records for {name}")
+                except Exception as e:
+                    logger.error(f"Error loading data for {name}: {str(e)}")
+
+    def _refresh_archive(self):
+        """Ingest pending reports, then add any new archive segments to the frames"""
+        # Segments written by the ingest command in another process
+        self.archive.reload()
+        self._sync_archive()
+        try:
+            self.ingestion.ingest(self._frames)
+        except Exception as e:
+            logger.error(f"Error ingesting market reports: {str(e)}")
+        self._sync_archive()
+
+    def _sync_archive(self):
+        for name in self.archive.commodities():
+            segments = self.archive.segments(name)
+            loaded = self._segments.get(name, [])
+            if segments == loaded:
+                continue
+            try:
+                if name in self._frames and segments[:len(loaded)] == loaded:
+                    rows = pd.concat([self.archive.read_segment(s) for s in segments[len(loaded):]], ignore_index=True)
+                    self._append(name, rows)
+                else:
+                    # First load, or the segments were compacted
+                    self._frames[name] = self.archive.load(name)
+                    self.loads += 1
+                    logger.info(f"Loaded {len(self._frames[name])} records for {name}")
+                self._segments[name] = segments
+            except Exception as e:
+                logger.error(f"Error loading archived data for {name}: {str(e)}")
+
+    def _append(self, name: str, rows: pd.DataFrame):
+        old = self._frames[name]
+        # Stable sort keeps earlier rows first on equal dates, as a full load would
+        new = pd.concat([old, rows], ignore_index=True).sort_values('Arrival Date', kind='stable')
+        new = new.reset_index(drop=True)
+        self._frames[name] = new
+        self.appends += 1
+        logger.info(f"Appended {len(rows)} records to {name}")
+        for listener in self._listeners:
+            try:
+                listener(name, old, new, rows)
+            except Exception as e:
+                logger.error(f"Append listener failed for {name}: {str(e)}")
+
+    def commodities(self) -> List[str]:
+        self.refresh()
+        return sorted(self._frames)
+
+    def resolve(self, commodity: str) -> Optional[str]:
+        """Stored name for a requested commodity (exact, then case-insensitive, then prefix)"""
+        names = self.commodities()
+        if commodity in self._frames:
+            return commodity
+        lowered = commodity.lower()
+        for name in names:
+            if name.lower() == lowered:
+                return name
+        for name in names:
+            if name.startswith(commodity):
+                return name
+        return None
+
+    def get(self, commodity: str) -> Optional[pd.DataFrame]:
+        """
+        Parsed frame for a commodity, or None if there is no report
+
+        The frame is shared between callers; treat it as read-only.
+        """
+        name = self.resolve(commodity)
+        return self._frames.get(name) if name else None
+
+    def stats(self) -> Dict:
+        return {
+            'commodities': len(self._frames),
+            'records': int(sum(len(df) for df in self._frames.values())),
+            'loads': self.loads,
+            'appends': self.appends,
+        }
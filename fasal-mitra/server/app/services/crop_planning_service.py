@@ -10,15 +10,20 @@ Decision-support system for crop selection based on:
 - Risk assessment from historical data
 """
 
+import asyncio
 import json
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import logging
+import threading
 from pathlib import Path
 
 from app.services.weather_service import WeatherServiceAPI
+from app.services.crop_scoring_engine import CropScoringEngine
+from app.services.market_price_index import MarketPriceIndex
+from app.core.result_cache import ResultCache
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +43,19 @@ class CropPlanningService:
         # Calculate crop requirements from historical data (NOT static)
         self.crop_requirements = self._calculate_crop_requirements()
         
+        # Lookup tables so per-request work is lookup + scoring only
+        self._build_indexes()
+        self.scoring_engine = CropScoringEngine(self.dataset, self._soil_by_state)
+        # Calendar lookups by (crop, state); bounded since the state comes from the request
+        self._calendar_cache = ResultCache("crop_calendar", max_entries=1024, ttl_seconds=24 * 3600)
+        
+        # Commodity -> price stats for all states and for each state with rows
+        self.price_index = MarketPriceIndex(self.market_prices)
+        if not self.dataset.empty:
+            self.price_index.warm(
+                [self._map_crop_to_commodity(crop) for crop in self.dataset['crop'].unique()]
+            )
+        
         logger.info(f"✅ Loaded {len(self.dataset)} crop performance records")
         logger.info(f"✅ Loaded {len(self.market_prices)} market price records")
         logger.info(f"✅ Calculated requirements for {len(self.crop_requirements)} crops")
@@ -170,6 +188,38 @@ class CropPlanningService:
             logger.error(f"Error calculating crop requirements: {e}")
             return {}
     
+    def _build_indexes(self):
+        """
+        Precompute lookup tables used on every planning request:
+        - season -> crops grown in that season (first-seen order)
+        - (season, state) -> crops grown in that state and season
+        - state -> soil NPK/pH row
+        """
+        self._season_crops: Dict[str, List[str]] = {}
+        self._season_state_crops: Dict[Tuple[str, str], List[str]] = {}
+        self._soil_by_state: Dict[str, Dict] = {}
+        
+        try:
+            if not self.dataset.empty:
+                for season, group in self.dataset.groupby('season', sort=False):
+                    self._season_crops[season] = group['crop'].unique().tolist()
+                
+                pairs = self.dataset.groupby(['season', 'state'], sort=False)
+                for (season, state), group in pairs:
+                    self._season_state_crops[(season, state)] = group['crop'].unique().tolist()
+            
+            if not self.soil_data.empty:
+                # Keep the first row per state, matching the previous iloc[0] lookups
+                for row in self.soil_data.drop_duplicates('state').to_dict('records'):
+                    self._soil_by_state[row['state']] = row
+            
+            logger.info(
+                f"Built planning indexes: {len(self._season_state_crops)} season/state pairs, "
+                f"{len(self._soil_by_state)} soil profiles"
+            )
+        except Exception as e:
+            logger.error(f"Error building planning indexes: {e}")
+    
     def get_current_season(self, month: int) -> str:
         """Determine season from month (India agricultural calendar)"""
         if month in [6, 7, 8, 9, 10]:  # June-October
@@ -189,20 +239,20 @@ class CropPlanningService:
         season = self.get_current_season(month)
         
         # Get crops from historical data for this season
-        season_data = self.dataset[self.dataset['season'] == season]
+        season_crops = self._season_crops.get(season, [])
         
         # If state specified, prioritize crops grown in that state
-        if state and not season_data.empty:
-            state_crops = season_data[season_data['state'] == state]['crop'].unique()
+        if state and season_crops:
+            state_crops = self._season_state_crops.get((season, state), [])
             if len(state_crops) > 0:
                 logger.info(f"Found {len(state_crops)} crops for {season} season in {state}")
                 return list(state_crops)
         
         # Fall back to all crops for this season
-        crops = season_data['crop'].unique().tolist()
+        crops = list(season_crops)
         
         # Add whole year crops
-        whole_year = self.dataset[self.dataset['season'] == "Whole Year"]['crop'].unique()
+        whole_year = self._season_crops.get("Whole Year", [])
         crops = list(set(crops).union(set(whole_year)))
         
         logger.info(f"Season: {season}, Candidate crops: {len(crops)}")
@@ -246,33 +296,22 @@ class CropPlanningService:
             
             commodity = self._map_crop_to_commodity(crop)
             
-            # Filter prices for this commodity
-            crop_prices = self.market_prices[
-                self.market_prices['Commodity'].str.contains(commodity, case=False, na=False)
-            ]
+            # Prices for this commodity, state-specific when available (all states as fallback)
+            price_stats = self.price_index.get(commodity, state)
             
-            if crop_prices.empty:
+            if price_stats is None:
                 logger.warning(f"No market data for {crop} ({commodity})")
                 return 50.0, "no data", 0.0
             
-            # Try to get state-specific prices first
-            state_prices = crop_prices[crop_prices['State'].str.contains(state, case=False, na=False)]
-            if state_prices.empty:
-                # Use all states as fallback
-                state_prices = crop_prices
-            
-            # Sort by date to get recent trend
-            state_prices = state_prices.sort_values('Arrival_Date', ascending=False)
-            
             # Calculate average and recent trend
-            avg_price = state_prices['Modal Price'].mean()
+            avg_price = price_stats['avg_price']
             
-            # Analyze price trend (recent 30 days vs previous 30 days)
-            recent = state_prices.head(min(10, len(state_prices)))['Modal Price'].mean()
-            older = state_prices.tail(min(10, len(state_prices)))['Modal Price'].mean()
+            # Analyze price trend (recent 10 records vs oldest 10 records)
+            recent = price_stats['recent_avg']
+            older = price_stats['older_avg']
             
             # Determine trend
-            if len(state_prices) > 1:
+            if price_stats['count'] > 1:
                 price_change = ((recent - older) / older * 100) if older > 0 else 0
                 
                 if price_change > 5:
@@ -295,7 +334,7 @@ class CropPlanningService:
                 base_score += 5
             
             # Adjust for price volatility (high volatility = risky)
-            price_std = state_prices['Modal Price'].std()
+            price_std = price_stats['std_price']
             if avg_price > 0:
                 cv = (price_std / avg_price) * 100  # Coefficient of variation
                 volatility_penalty = min(cv / 2, 15)  # Max 15 point penalty
@@ -400,46 +439,17 @@ class CropPlanningService:
         Returns: (score, suitability_text)
         """
         try:
-            # Get state soil data
-            state_soil = self.soil_data[self.soil_data['state'] == state]
-            if state_soil.empty:
+            if state not in self._soil_by_state:
                 logger.warning(f"No soil data for {state}")
                 return 50.0, "unknown"
             
-            state_soil = state_soil.iloc[0]
-            state_N = state_soil['N']
-            state_P = state_soil['P']
-            state_K = state_soil['K']
-            state_pH = state_soil['pH']
-            
-            # Get historical crop performance in this state
-            crop_in_state = self.dataset[
-                (self.dataset['crop'] == crop) & 
-                (self.dataset['state'] == state)
-            ]
-            
-            if crop_in_state.empty:
+            # Compare historical yield in this state with the crop's all-state median
+            soil_score, suitability = self.scoring_engine.soil_score(crop, state)
+            if suitability == "untested":
                 # No history in this state, use general requirements
-                return 50.0, "untested"
-            
-            # Analyze correlation between soil and yield
-            avg_yield = crop_in_state['yield'].mean()
-            median_yield_all = self.dataset[self.dataset['crop'] == crop]['yield'].median()
-            
-            # Score based on historical performance
-            if avg_yield >= median_yield_all * 1.2:
-                soil_score = 90  # Excellent performance history
-                suitability = "excellent"
-            elif avg_yield >= median_yield_all:
-                soil_score = 75  # Good performance
-                suitability = "good"
-            elif avg_yield >= median_yield_all * 0.7:
-                soil_score = 55  # Moderate
-                suitability = "moderate"
-            else:
-                soil_score = 35  # Poor historical performance
-                suitability = "poor"
+                return soil_score, suitability
             
+            avg_yield = self.scoring_engine.crop_state_stats[(crop, state)]['mean']
             logger.info(f"{crop} in {state}: soil_score={soil_score} (historical avg yield={avg_yield:.2f})")
             return soil_score, suitability
             
@@ -454,36 +464,9 @@ class CropPlanningService:
         try:
             current_season = self.get_current_season(month)
             
-            # Check historical data for this crop in this season
-            crop_season = self.dataset[
-                (self.dataset['crop'] == crop) & 
-                (self.dataset['season'] == current_season)
-            ]
-            
-            if not crop_season.empty:
-                # Crop has been grown in this season
-                
-                # Check state-specific history
-                crop_season_state = crop_season[crop_season['state'] == state]
-                
-                if not crop_season_state.empty:
-                    # Strong evidence - grown in this state in this season
-                    return 100.0
-                else:
-                    # Grown in this season but not this state
-                    return 80.0
-            
-            # Check if it's a whole year crop
-            whole_year = self.dataset[
-                (self.dataset['crop'] == crop) & 
-                (self.dataset['season'] == "Whole Year")
-            ]
-            
-            if not whole_year.empty:
-                return 70.0  # Can grow anytime
-            
-            # Crop not typically grown in this season
-            return 30.0
+            # 100 = grown in this state and season, 80 = this season elsewhere,
+            # 70 = whole-year crop, 30 = not typically grown in this season
+            return self.scoring_engine.season_score(crop, current_season, state)
             
         except Exception as e:
             logger.error(f"Error calculating season score: {e}")
@@ -635,6 +618,17 @@ class CropPlanningService:
     
     def _get_crop_calendar_info(self, crop: str, state: str) -> Dict:
         """Get sowing/harvesting periods and calculate growing days from crop calendar"""
+        # The lookup is case-insensitive, so case variants share an entry
+        key = (crop.lower(), state.lower())
+        info = self._calendar_cache.get(key)
+        if info is None:
+            info = self._lookup_crop_calendar_info(crop, state)
+            self._calendar_cache.put(key, info)
+        # Copy so callers can't mutate the cached entry
+        return dict(info)
+    
+    def _lookup_crop_calendar_info(self, crop: str, state: str) -> Dict:
+        """Search the crop calendar for a crop/state entry (cached by _get_crop_calendar_info)"""
         try:
             if self.crop_calendar.empty:
                 return {}
@@ -678,14 +672,10 @@ class CropPlanningService:
     def _get_state_soil_info(self, state: str) -> Dict:
         """Get soil NPK and pH data for specific state"""
         try:
-            if self.soil_data.empty:
+            soil_row = self._soil_by_state.get(state)
+            if soil_row is None:
                 return {}
             
-            state_soil = self.soil_data[self.soil_data['state'] == state]
-            if state_soil.empty:
-                return {}
-            
-            soil_row = state_soil.iloc[0]
             return {
                 "nitrogen_n": float(soil_row['N']),
                 "phosphorus_p": float(soil_row['P']),
@@ -702,27 +692,20 @@ class CropPlanningService:
         Returns: recommended area, expected yield range
         """
         try:
-            # Get historical yield data for this crop in this state
-            crop_state_data = self.dataset[
-                (self.dataset['crop'] == crop) & 
-                (self.dataset['state'] == state)
-            ]
+            # Historical yield stats for this crop in this state (falls back to all states)
+            yield_stats = self.scoring_engine.quantity_stats(crop, state)
             
-            if crop_state_data.empty:
-                # Fall back to all states for this crop
-                crop_state_data = self.dataset[self.dataset['crop'] == crop]
-            
-            if crop_state_data.empty:
+            if yield_stats is None:
                 return {}
             
             # Calculate average yield from historical data
-            avg_yield = crop_state_data['yield'].mean()
-            median_yield = crop_state_data['yield'].median()
-            p25_yield = crop_state_data['yield'].quantile(0.25)
-            p75_yield = crop_state_data['yield'].quantile(0.75)
+            avg_yield = yield_stats['mean']
+            median_yield = yield_stats['median']
+            p25_yield = yield_stats['p25']
+            p75_yield = yield_stats['p75']
             
             # Recommended area (30-70% of available land depending on crop performance)
-            yield_reliability = crop_state_data['yield'].std() / avg_yield if avg_yield > 0 else 1
+            yield_reliability = yield_stats['std'] / avg_yield if avg_yield > 0 else 1
             
             if yield_reliability < 0.3:  # Low variance = reliable
                 area_percentage = 0.7
@@ -739,7 +722,7 @@ class CropPlanningService:
             expected_max = round(recommended_area * p75_yield, 2)
             
             # Get growing period from actual data
-            records_count = len(crop_state_data)
+            records_count = yield_stats['count']
             
             # Calculate min/max area for frontend compatibility
             min_area = round(recommended_area * 0.6, 2)  # Conservative
@@ -767,7 +750,7 @@ class CropPlanningService:
                 },
                 "based_on_records": records_count,
                 "reliability": "high" if yield_reliability < 0.3 else "medium" if yield_reliability < 0.5 else "low",
-                "note": f"Based on {records_count} historical records from {crop_state_data['year'].min()}-{crop_state_data['year'].max()}"
+                "note": f"Based on {records_count} historical records from {yield_stats['year_min']}-{yield_stats['year_max']}"
             }
             
         except Exception as e:
@@ -844,10 +827,11 @@ class CropPlanningService:
             forecast = None
             if self.weather_service and latitude and longitude:
                 try:
-                    # Get current weather
-                    current_weather = await self.weather_service.get_current_weather(latitude, longitude)
-                    # Get forecast for next 7 days
-                    forecast_data = await self.weather_service.get_forecast(latitude, longitude)
+                    # Current weather and 7-day forecast, fetched concurrently
+                    current_weather, forecast_data = await asyncio.gather(
+                        self.weather_service.get_current_weather(latitude, longitude),
+                        self.weather_service.get_forecast(latitude, longitude)
+                    )
                     
                     if current_weather and forecast_data:
                         # Extract weather data
@@ -867,6 +851,15 @@ class CropPlanningService:
             else:
                 logger.info("No weather service or coordinates - using historical averages only")
             
+            # Season and soil scores for all candidates in one pass over the precomputed tables
+            season = self.get_current_season(month)
+            batch_scores = self.scoring_engine.score_candidates(candidates, state, season)
+            if state not in self._soil_by_state:
+                logger.warning(f"No soil data for {state}")
+            
+            # Same for every candidate in this state
+            state_soil_info = self._get_state_soil_info(state)
+            
             # Score each candidate crop
             crop_scores = []
             
@@ -875,8 +868,9 @@ class CropPlanningService:
                     # Calculate individual scores (all data-driven)
                     market_score, market_trend, avg_price = self.calculate_market_score(crop, state)
                     weather_score, weather_suitability = self.calculate_weather_score(crop, state, forecast)
-                    season_score = self.calculate_season_score(crop, month, state)
-                    soil_score, soil_suitability = self.calculate_soil_score(crop, state)
+                    season_score = batch_scores[crop]['season_score']
+                    soil_score = batch_scores[crop]['soil_score']
+                    soil_suitability = batch_scores[crop]['soil_suitability']
                     risk_score, risk_level = self.calculate_risk_score(crop, forecast)
                     
                     # Calculate weighted final score
@@ -896,9 +890,6 @@ class CropPlanningService:
                     if quantity_info and calendar_info.get('growing_period_days'):
                         quantity_info['growing_period_days'] = calendar_info.get('growing_period_days', 90)
                     
-                    # Get state soil info
-                    state_soil_info = self._get_state_soil_info(state)
-                    
                     # Enhanced crop details
                     requirements = self.crop_requirements.get(crop, {})
                     enhanced_crop_details = {
@@ -935,7 +926,7 @@ class CropPlanningService:
                         "risk_level": risk_level,
                         "quantity_recommendation": quantity_info,
                         "calendar_info": calendar_info,
-                        "soil_info": state_soil_info,
+                        "soil_info": dict(state_soil_info),
                         "data_source": "historical_records",
                         "crop_details": enhanced_crop_details
                     }
@@ -984,22 +975,22 @@ class CropPlanningService:
             "Kharif": {
                 "months": [6, 7, 8, 9, 10],
                 "description": "Monsoon season (June-October)",
-                "total_crops": len(self.dataset[self.dataset['season'] == "Kharif"]['crop'].unique())
+                "total_crops": len(self._season_crops.get("Kharif", []))
             },
             "Rabi": {
                 "months": [11, 12, 1, 2, 3],
                 "description": "Winter season (November-March)",
-                "total_crops": len(self.dataset[self.dataset['season'] == "Rabi"]['crop'].unique())
+                "total_crops": len(self._season_crops.get("Rabi", []))
             },
             "Zaid": {
                 "months": [4, 5],
                 "description": "Summer season (April-May)",
-                "total_crops": len(self.dataset[self.dataset['season'] == "Zaid"]['crop'].unique())
+                "total_crops": len(self._season_crops.get("Zaid", []))
             },
             "Whole Year": {
                 "months": list(range(1, 13)),
                 "description": "Year-round cultivation",
-                "total_crops": len(self.dataset[self.dataset['season'] == "Whole Year"]['crop'].unique())
+                "total_crops": len(self._season_crops.get("Whole Year", []))
             }
         }
     
@@ -1035,48 +1026,27 @@ class CropPlanningService:
         try:
             commodity = self._map_crop_to_commodity(crop_name)
             
-            crop_prices = self.market_prices[
-                self.market_prices['Commodity'].str.contains(commodity, case=False, na=False)
-            ]
+            # Filter by state if provided (falls back to all states when no match)
+            price_stats = self.price_index.get(commodity, state)
             
-            if crop_prices.empty:
+            if price_stats is None:
                 return {
                     "crop": crop_name,
                     "message": "No market price data available",
                     "prices": []
                 }
             
-            # Filter by state if provided
-            if state:
-                state_prices = crop_prices[crop_prices['State'].str.contains(state, case=False, na=False)]
-                if not state_prices.empty:
-                    crop_prices = state_prices
-            
-            # Get recent prices (last 20 records)
-            recent_prices = crop_prices.sort_values('Arrival_Date', ascending=False).head(20)
-            
-            prices_list = []
-            for _, row in recent_prices.iterrows():
-                prices_list.append({
-                    "state": row['State'],
-                    "district": row['District'],
-                    "market": row['Market'],
-                    "date": row['Arrival_Date'].strftime('%Y-%m-%d'),
-                    "min_price": row['Min Price'],
-                    "max_price": row['Max Price'],
-                    "modal_price": row['Modal Price']
-                })
-            
             return {
                 "crop": crop_name,
                 "commodity": commodity,
-                "total_records": len(crop_prices),
-                "average_modal_price": round(crop_prices['Modal Price'].mean(), 2),
+                "total_records": price_stats['count'],
+                "average_modal_price": round(price_stats['avg_price'], 2),
                 "price_range": {
-                    "min": crop_prices['Min Price'].min(),
-                    "max": crop_prices['Max Price'].max()
+                    "min": price_stats['min_price'],
+                    "max": price_stats['max_price']
                 },
-                "recent_prices": prices_list
+                # Most recent 20 records
+                "recent_prices": list(price_stats['recent_prices'])
             }
             
         except Exception as e:
@@ -1084,8 +1054,37 @@ class CropPlanningService:
             return {"error": str(e)}
 
 
-def get_crop_planning_service():
-    """Dependency injection for crop planning service"""
+_crop_planning_service: Optional[CropPlanningService] = None
+_crop_planning_lock = threading.Lock()
+
+
+def _create_crop_planning_service() -> CropPlanningService:
     from app.services.weather_service import get_weather_service
     weather_service = get_weather_service()
     return CropPlanningService(weather_service=weather_service)
+
+
+def get_crop_planning_service() -> CropPlanningService:
+    """Get singleton instance of crop planning service (datasets loaded once per process)"""
+    global _crop_planning_service
+    if _crop_planning_service is None:
+        with _crop_planning_lock:
+            if _crop_planning_service is None:
+                logger.info("🔧 Creating Crop Planning Service instance...")
+                _crop_planning_service = _create_crop_planning_service()
+    return _crop_planning_service
+
+
+def reload_crop_planning_service() -> CropPlanningService:
+    """
+    Rebuild the crop planning service from the data files on disk.
+    
+    The new instance is fully built before it replaces the old one, so
+    in-flight requests keep using the previous datasets until they finish.
+    """
+    global _crop_planning_service
+    service = _create_crop_planning_service()
+    with _crop_planning_lock:
+        _crop_planning_service = service
+    logger.info("♻️ Crop Planning Service reloaded")
+    return service
@@ -0,0 +1,153 @@
+"""
+Disease Model Runtime
+
+Inference backends for the plant disease CNN:
+
+- ``TFLiteBackend``: runs the exported ``.tflite`` flatbuffer with a slim
+  interpreter (``tflite-runtime`` or ``ai-edge-litert``). No TensorFlow
+  import, so workers start in about a second and use a fraction of the memory.
+- ``KerasBackend``: loads the original ``.keras`` model with full TensorFlow.
+
+Both expose ``predict(batch) -> probabilities`` on float32 (N, 160, 160, 3)
+input in the 0-255 range. Create the TFLite file with
+``python export_disease_model.py``.
+"""
+
+from pathlib import Path
+from typing import Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = Path(__file__).parent.parent / "models" / "ml"
+KERAS_MODEL_PATH = MODEL_DIR / "plant_disease_recog_model_pwp.keras"
+TFLITE_MODEL_PATH = MODEL_DIR / "plant_disease_recog_model_pwp.tflite"
+
+
+def _import_interpreter(allow_tensorflow: bool = False):
+    """Slim TFLite interpreter class, or None if no runtime is installed"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    if allow_tensorflow:
+        try:
+            import tensorflow as tf
+            return tf.lite.Interpreter
+        except ImportError:
+            pass
+    return None
+
+
+class TFLiteBackend:
+    """TFLite interpreter backend (not thread-safe: call from one thread, e.g. the MicroBatcher worker)"""
+
+    name = "tflite"
+
+    def __init__(self, model_path: Path = TFLITE_MODEL_PATH, num_threads: Optional[int] = None, allow_tensorflow: bool = False):
+        interpreter_cls = _import_interpreter(allow_tensorflow)
+        if interpreter_cls is None:
+            raise ImportError(
+                "No TFLite runtime installed. Install it with: pip install tflite-runtime "
+                "(or ai-edge-litert)"
+            )
+
+        self.model_path = Path(model_path)
+        self.interpreter = interpreter_cls(model_path=str(self.model_path), num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+
+        input_details = self.interpreter.get_input_details()[0]
+        output_details = self.interpreter.get_output_details()[0]
+        self._input_index = input_details['index']
+        self._output_index = output_details['index']
+        self._input_dtype = input_details['dtype']
+        self._input_quant = input_details.get('quantization', (0.0, 0))
+        self._output_quant = output_details.get('quantization', (0.0, 0))
+        self._batch_size = int(input_details['shape'][0])
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """Class probabilities for a (N, H, W, 3) float32 batch"""
+        batch_size = len(batch)
+        if batch_size != self._batch_size:
+            self.interpreter.resize_tensor_input(self._input_index, [batch_size, *batch.shape[1:]])
+            self.interpreter.allocate_tensors()
+            self._batch_size = batch_size
+
+        # Fully int8-quantized models take quantized input
+        scale, zero_point = self._input_quant
+        if self._input_dtype != np.float32 and scale:
+            batch = np.clip(np.round(batch / scale + zero_point), np.iinfo(self._input_dtype).min, np.iinfo(self._input_dtype).max)
+        self.interpreter.set_tensor(self._input_index, batch.astype(self._input_dtype, copy=False))
+        self.interpreter.invoke()
+
+        output = self.interpreter.get_tensor(self._output_index)
+        scale, zero_point = self._output_quant
+        if output.dtype != np.float32 and scale:
+            output = (output.astype(np.float32) - zero_point) * scale
+        return np.array(output, dtype=np.float32)
+
+
+class KerasBackend:
+    """Full TensorFlow/Keras backend"""
+
+    name = "keras"
+
+    def __init__(self, model_path: Path = KERAS_MODEL_PATH):
+        import tensorflow as tf
+        logger.info(f"[LOAD] TensorFlow {tf.__version__} imported successfully")
+
+        self.model_path = Path(model_path)
+        # Load without compiling to avoid optimizer compatibility issues; inference only
+        self.model = tf.keras.models.load_model(str(self.model_path), compile=False)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return np.asarray(self.model.predict_on_batch(batch))
+
+
+def load_disease_model(backend: str = "auto", num_threads: Optional[int] = None):
+    """
+    Load the disease CNN with the requested backend.
+
+    Args:
+        backend: "tflite", "keras", or "auto" (TFLite when the exported
+            model and a slim runtime are available, else Keras)
+        num_threads: TFLite interpreter threads (None = runtime default)
+    """
+    if backend not in ("auto", "tflite", "keras"):
+        raise ValueError(f"Unknown disease model backend: {backend}")
+
+    if backend in ("auto", "tflite") and TFLITE_MODEL_PATH.exists():
+        try:
+            model = TFLiteBackend(TFLITE_MODEL_PATH, num_threads=num_threads, allow_tensorflow=(backend == "tflite"))
+            size_mb = TFLITE_MODEL_PATH.stat().st_size / (1024 * 1024)
+            logger.info(f"[LOAD] Loaded TFLite model {TFLITE_MODEL_PATH.name} ({size_mb:.2f} MB)")
+            return model
+        except ImportError as e:
+            if backend == "tflite":
+                raise
+            logger.info(f"[LOAD] {e} - falling back to Keras")
+    elif backend == "tflite":
+        raise FileNotFoundError(
+            f"TFLite model not found at {TFLITE_MODEL_PATH}. "
+            "Create it with: python export_disease_model.py"
+        )
+
+    if not KERAS_MODEL_PATH.exists():
+        raise FileNotFoundError(
+            f"Model file not found at {KERAS_MODEL_PATH}. "
+            "Please download the model from Google Drive and place it in the correct location. "
+            "See app/models/ml/README.md for instructions."
+        )
+
+    size_mb = KERAS_MODEL_PATH.stat().st_size / (1024 * 1024)
+    logger.info(f"[LOAD] Found model file: {KERAS_MODEL_PATH.name} ({size_mb:.2f} MB)")
+    logger.info("[LOAD] Loading Keras model (this takes time, please wait)...")
+    return KerasBackend(KERAS_MODEL_PATH)
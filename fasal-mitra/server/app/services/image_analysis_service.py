@@ -9,7 +9,6 @@ import logging
 from typing import Dict, Any, Optional, Union
 from functools import lru_cache
 
-from fastapi import UploadFile
 from PIL import Image
 
 try:
@@ -22,6 +21,7 @@ except ImportError:
     logger.warning("OpenAI package not properly installed. Image analysis features will be limited.")
 
 from app.config import settings
+from app.core.uploads import ImageUpload
 
 logger = logging.getLogger(__name__)
 
@@ -69,12 +69,12 @@ class ImageAnalysisService:
             logger.error(f"Failed to initialize OpenAI client: {str(e)}")
             self.client = None
     
-    async def analyze_soil_image(self, image: UploadFile) -> Dict[str, Any]:
+    async def analyze_soil_image(self, image: ImageUpload) -> Dict[str, Any]:
         """
         Analyze soil image using OpenAI Vision API
         
         Args:
-            image: Uploaded image file
+            image: Uploaded image, already validated and read by read_image_upload
             
         Returns:
             Dictionary containing image analysis results
@@ -87,15 +87,10 @@ class ImageAnalysisService:
             logger.info(f"Starting OpenAI Vision analysis for image: {image.filename}")
             logger.info(f"API Key available: {bool(settings.OPENAI_API_KEY)}")
             
-            # Read and process image
-            image_data = await image.read()
-            logger.info(f"Image data read, size: {len(image_data)} bytes")
-            
-            # Reset file pointer for potential re-use
-            await image.seek(0)
+            logger.info(f"Image size: {image.size_bytes} bytes ({image.width}x{image.height} {image.format})")
             
             # Convert to base64
-            base64_image = base64.b64encode(image_data).decode('utf-8')
+            base64_image = base64.b64encode(image.data).decode('ascii')
             logger.info("Image converted to base64 successfully")
             
             # Analyze with OpenAI Vision
@@ -113,7 +108,7 @@ class ImageAnalysisService:
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}"
+                                    "url": f"data:{image.media_type};base64,{base64_image}"
                                 }
                             }
                         ]
@@ -0,0 +1,153 @@
+"""
+Inference Micro-Batcher
+
+Dynamic batching in front of a model's forward pass. Concurrent requests
+submit single inputs; a dedicated worker thread gathers them for up to
+``max_latency_ms`` (or until ``max_batch_size`` inputs are waiting), runs one
+batched forward pass and hands each caller its own row of the output.
+
+Calling the model from a single worker thread also keeps inference off the
+event loop, and per-call framework overhead is paid once per batch instead
+of once per request.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Worker shutdown marker
+_STOP = object()
+
+
+def _resolve(future: asyncio.Future, value=None, error: Exception = None):
+    """Complete a future unless its caller already gave up (e.g. disconnected)"""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(value)
+
+
+def _deliver(loop: asyncio.AbstractEventLoop, future: asyncio.Future, value=None, error: Exception = None):
+    """Hand a result back to the caller's event loop (from the worker thread)"""
+    try:
+        loop.call_soon_threadsafe(_resolve, future, value, error)
+    except RuntimeError:
+        # Caller's loop has been closed; nobody is waiting any more
+        pass
+
+
+class MicroBatcher:
+    """Queue + worker thread that turns concurrent single predictions into batches"""
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 16,
+        max_latency_ms: float = 10.0,
+        name: str = "model"
+    ):
+        """
+        Args:
+            predict_fn: Batched forward pass, (N, ...) -> (N, n_outputs)
+            max_batch_size: Largest batch sent to predict_fn
+            max_latency_ms: Longest time the first queued input waits for others
+            name: Used in log messages and the worker thread name
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max(0.0, max_latency_ms) / 1000.0
+        self.name = name
+
+        self.batches = 0
+        self.items = 0
+        self.max_batch_seen = 0
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name=f"{name}-batcher", daemon=True)
+        self._worker.start()
+
+    async def predict(self, item: np.ndarray) -> np.ndarray:
+        """
+        Queue one input (without batch dimension) and await its output row.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((item, future, loop))
+        return await future
+
+    async def predict_many(self, items: List[np.ndarray]) -> List[np.ndarray]:
+        """
+        Queue several inputs back to back and await all output rows.
+
+        The inputs land in the queue together, so up to ``max_batch_size`` of
+        them run in the same forward pass.
+        """
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in items]
+        for item, future in zip(items, futures):
+            self._queue.put((item, future, loop))
+        return list(await asyncio.gather(*futures))
+
+    def _collect(self, first) -> List[Tuple]:
+        """Gather queued requests until the batch is full or the latency budget is spent"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is _STOP:
+                # Finish this batch, then stop
+                self._queue.put(_STOP)
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            batch = self._collect(first)
+            try:
+                inputs = np.stack([item for item, _, _ in batch])
+                outputs = np.asarray(self.predict_fn(inputs))
+                for (_, future, loop), row in zip(batch, outputs):
+                    _deliver(loop, future, row)
+            except Exception as e:
+                logger.error(f"Batched {self.name} inference failed ({len(batch)} items): {e}")
+                for _, future, loop in batch:
+                    _deliver(loop, future, error=e)
+
+            self.batches += 1
+            self.items += len(batch)
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+
+    def stop(self, timeout: float = 5.0):
+        """Let queued requests finish, then stop the worker thread"""
+        self._queue.put(_STOP)
+        self._worker.join(timeout)
+
+    def stats(self) -> Dict:
+        """Batching counters for monitoring"""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size_seen": self.max_batch_seen,
+            "queued": self._queue.qsize(),
+            "max_batch_size": self.max_batch_size,
+            "max_latency_ms": self.max_latency * 1000
+        }
@@ -0,0 +1,246 @@
+"""
+Market Archive
+
+Columnar store of ingested market report rows. Each commodity is a list of
+append-only segment files, and a JSON manifest records the segments, the
+report files already ingested (by size/mtime) and per-commodity totals.
+Ingesting a day's reports writes one small segment per commodity; once a
+commodity has COMPACT_SEGMENTS segments they are rewritten as one.
+
+The server and the ingest command may write the same archive. Writers
+take a lock file, re-read the manifest under it, and name segments with
+their pid and a random suffix, so concurrent appends never overwrite each
+other's segments or manifest entries.
+
+Segments are Parquet (via pyarrow) when installed, otherwise pandas
+pickles. String columns are stored as categoricals and read back as plain
+strings, so loaded frames match parse_report().
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Bump when the segment layout changes so old archives are rebuilt
+MANIFEST_VERSION = 1
+
+# Rewrite a commodity as a single segment once it has this many
+COMPACT_SEGMENTS = 32
+
+# A writer holding the archive lock longer than this is assumed to have crashed
+LOCK_TIMEOUT_SECONDS = 120
+
+
+def _slug(name: str) -> str:
+    """'Kabuli Chana(Chickpeas-white)' -> 'kabuli_chana_chickpeas_white'"""
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+
+class MarketArchive:
+    """Commodity -> deduplicated report rows, as append-only columnar segments"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.manifest_path = self.root / "manifest.json"
+        self.lock_path = self.root / "manifest.lock"
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._manifest_mtime = None
+        self._manifest = self._read_manifest()
+
+    def _empty_manifest(self) -> Dict:
+        return {'version': MANIFEST_VERSION, 'sources': {}, 'commodities': {}}
+
+    def _read_manifest(self) -> Dict:
+        try:
+            mtime = self.manifest_path.stat().st_mtime_ns
+            manifest = json.loads(self.manifest_path.read_text())
+            self._manifest_mtime = mtime
+            if manifest.get('version') == MANIFEST_VERSION:
+                return manifest
+            logger.info("Market archive format changed; reports will be re-ingested")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable market archive manifest {self.manifest_path}: {e}")
+        return self._empty_manifest()
+
+    def _write_manifest(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_name(f"{self.manifest_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(self._manifest, indent=1))
+        os.replace(tmp_path, self.manifest_path)
+        self._manifest_mtime = self.manifest_path.stat().st_mtime_ns
+
+    def reload(self) -> bool:
+        """Re-read the manifest if another process (e.g. the ingest command) changed it"""
+        with self._lock:
+            try:
+                mtime = self.manifest_path.stat().st_mtime_ns
+            except FileNotFoundError:
+                return False
+            if mtime == self._manifest_mtime:
+                return False
+            self._manifest = self._read_manifest()
+            return True
+
+    @contextmanager
+    def locked(self) -> Iterator[bool]:
+        """
+        Hold the archive for writing, across threads and processes
+
+        Yields whether the manifest was re-read because another process
+        changed it, i.e. whether rows loaded before entering may be stale.
+        Nested use in the same thread re-enters without waiting.
+        """
+        with self._lock:
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield False
+                finally:
+                    self._lock_depth -= 1
+                return
+
+            self._acquire_lock_file()
+            self._lock_depth = 1
+            try:
+                # Always re-read: mtimes can be too coarse to show a write by another process
+                previous = self._manifest
+                self._manifest = self._read_manifest()
+                yield self._manifest != previous
+            finally:
+                self._lock_depth = 0
+                self.lock_path.unlink(missing_ok=True)
+
+    def _acquire_lock_file(self):
+        """Create the lock file, waiting while another process holds it"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        deadline = time.monotonic() + LOCK_TIMEOUT_SECONDS
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return
+            except FileExistsError:
+                # Treat locks older than the timeout as left behind by a crashed writer
+                try:
+                    if time.time() - self.lock_path.stat().st_mtime > LOCK_TIMEOUT_SECONDS:
+                        logger.warning(f"Removing stale market archive lock {self.lock_path}")
+                        self.lock_path.unlink(missing_ok=True)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Market archive {self.root} is locked by another process")
+                time.sleep(0.05)
+
+    @property
+    def sources(self) -> Dict[str, Dict]:
+        """Ingested report file name -> {'size', 'mtime_ns', 'commodity', 'rows'}"""
+        return self._manifest['sources']
+
+    def commodities(self) -> List[str]:
+        return sorted(self._manifest['commodities'])
+
+    def segments(self, commodity: str) -> List[str]:
+        entry = self._manifest['commodities'].get(commodity)
+        return list(entry['segments']) if entry else []
+
+    def summary(self, commodity: str) -> Optional[Dict]:
+        """{'records', 'date_range'} for a commodity"""
+        entry = self._manifest['commodities'].get(commodity)
+        return {'records': entry['records'], 'date_range': entry['date_range']} if entry else None
+
+    def read_segment(self, segment: str) -> pd.DataFrame:
+        path = self.root / segment
+        df = pd.read_parquet(path) if path.suffix == '.parquet' else pd.read_pickle(path)
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype(object)
+        return df
+
+    def load(self, commodity: str) -> Optional[pd.DataFrame]:
+        """All rows of a commodity, stably sorted by arrival date"""
+        segments = self.segments(commodity)
+        if not segments:
+            return None
+        df = pd.concat([self.read_segment(s) for s in segments], ignore_index=True)
+        return df.sort_values('Arrival Date', kind='stable').reset_index(drop=True)
+
+    def _write_segment(self, commodity: str, index: int, rows: pd.DataFrame) -> str:
+        ext = "parquet" if PARQUET_AVAILABLE else "pkl"
+        # Unique per writer, so no process can replace another's segment
+        segment = f"{_slug(commodity)}.{index:05d}.{os.getpid()}-{uuid.uuid4().hex[:8]}.{ext}"
+        compact = rows.copy()
+        for col in compact.columns:
+            if compact[col].dtype == object:
+                compact[col] = compact[col].astype('category')
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.root / f"{segment}.{os.getpid()}.tmp"
+        if PARQUET_AVAILABLE:
+            compact.to_parquet(tmp_path, index=False)
+        else:
+            compact.to_pickle(tmp_path)
+        os.replace(tmp_path, self.root / segment)
+        return segment
+
+    def append(self, commodity: str, rows: pd.DataFrame, sources: Dict[str, Dict]):
+        """
+        Add new rows for a commodity and record the report files they came from
+
+        The segment is written before the manifest, so an interrupted append
+        leaves an unreferenced file rather than a half-recorded ingest. The
+        manifest is re-read under the archive lock first, so appends from
+        other processes are kept.
+        """
+        with self.locked():
+            entry = self._manifest['commodities'].get(commodity)
+            stale = []
+            if len(rows):
+                if entry is None:
+                    entry = {'segments': [], 'next_segment': 0, 'records': 0, 'date_range': None}
+                    self._manifest['commodities'][commodity] = entry
+                if len(entry['segments']) + 1 >= COMPACT_SEGMENTS:
+                    stale = entry['segments']
+                    existing = [self.read_segment(s) for s in stale]
+                    rows = pd.concat(existing + [rows], ignore_index=True)
+                    entry['segments'] = []
+                    entry['records'] = 0
+                entry['segments'].append(self._write_segment(commodity, entry['next_segment'], rows))
+                entry['next_segment'] += 1
+                entry['records'] += len(rows)
+
+                start = rows['Arrival Date'].min().strftime('%Y-%m-%d')
+                end = rows['Arrival Date'].max().strftime('%Y-%m-%d')
+                if entry['date_range']:
+                    start = min(start, entry['date_range']['start'])
+                    end = max(end, entry['date_range']['end'])
+                entry['date_range'] = {'start': start, 'end': end}
+
+            self._manifest['sources'].update(sources)
+            self._write_manifest()
+
+            for segment in stale:
+                (self.root / segment).unlink(missing_ok=True)
+            if stale:
+                logger.info(f"Compacted {len(stale)} segments of {commodity}")
@@ -0,0 +1,136 @@
+"""
+Market Report Ingestion
+
+Merges new or changed Agmarknet daily price/arrival reports into the
+market archive. Reports for the same commodity may overlap (each download
+usually covers the whole season so far), so rows are deduplicated on the
+report key and only rows the archive has not seen are appended. A report
+file is ingested once per size/mtime; re-running over an unchanged
+directory reads nothing.
+"""
+
+import logging
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from app.services.commodity_store import REPORT_MARKER, commodity_name, parse_report
+from app.services.market_archive import MarketArchive
+
+logger = logging.getLogger(__name__)
+
+# A report row is one grade of one variety at one market on one day
+DEDUP_KEY = ['Arrival Date', 'District', 'Market', 'Variety', 'Grade']
+
+
+def merge_reports(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """Union of overlapping report frames; the first report wins on duplicate keys"""
+    merged = pd.concat(frames, ignore_index=True).drop_duplicates(DEDUP_KEY, keep='first')
+    return merged.sort_values('Arrival Date', kind='stable').reset_index(drop=True)
+
+
+def unseen_rows(existing: Optional[pd.DataFrame], incoming: pd.DataFrame) -> pd.DataFrame:
+    """Rows of incoming whose key is not already in existing (a date-sorted frame)"""
+    if existing is None or len(existing) == 0 or len(incoming) == 0:
+        return incoming
+    # Only existing rows within the incoming date range can collide
+    dates = existing['Arrival Date']
+    start = dates.searchsorted(incoming['Arrival Date'].min(), side='left')
+    end = dates.searchsorted(incoming['Arrival Date'].max(), side='right')
+    seen = pd.MultiIndex.from_frame(existing.iloc[start:end][DEDUP_KEY])
+    mask = ~pd.MultiIndex.from_frame(incoming[DEDUP_KEY]).isin(seen)
+    return incoming[mask].reset_index(drop=True)
+
+
+class MarketIngestion:
+    """Ingests report files into a MarketArchive"""
+
+    def __init__(self, data_path: Path, archive: MarketArchive):
+        self.data_path = Path(data_path)
+        self.archive = archive
+
+    def _signature(self, path: Path) -> Dict:
+        stat = path.stat()
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def pending(self) -> List[Path]:
+        """Report files in the data directory that are new or changed since ingested"""
+        try:
+            entries = sorted(os.scandir(self.data_path), key=lambda e: e.name)
+        except FileNotFoundError:
+            logger.warning(f"Market data directory not found: {self.data_path}")
+            return []
+
+        pending = []
+        for entry in entries:
+            if not (entry.name.endswith('.csv') and REPORT_MARKER in entry.name):
+                continue
+            seen = self.archive.sources.get(entry.name)
+            stat = entry.stat()
+            if seen and seen['size'] == stat.st_size and seen['mtime_ns'] == stat.st_mtime_ns:
+                continue
+            pending.append(Path(entry.path))
+        return pending
+
+    def ingest(
+        self,
+        frames: Optional[Dict[str, pd.DataFrame]] = None,
+        paths: Optional[Sequence[Path]] = None
+    ) -> Dict[str, Dict]:
+        """
+        Append the unseen rows of report files to the archive
+
+        Args:
+            frames: Current frame per commodity to deduplicate against
+                (loaded from the archive for commodities not given, or if
+                another process has written the archive since)
+            paths: Report files to ingest (defaults to pending())
+
+        Returns:
+            Commodity -> {'files', 'rows', 'new_rows', 'duplicates'}
+        """
+        frames = frames if frames is not None else {}
+        paths = self.pending() if paths is None else [Path(p) for p in paths]
+
+        by_commodity: Dict[str, List[Path]] = defaultdict(list)
+        for path in paths:
+            by_commodity[commodity_name(path)].append(path)
+
+        results = {}
+        # Once another process has changed the archive, the given frames may lack its rows
+        stale = False
+        for commodity, report_paths in sorted(by_commodity.items()):
+            parsed, sources = [], {}
+            for path in report_paths:
+                try:
+                    signature = self._signature(path)
+                    df = parse_report(path)
+                except Exception as e:
+                    logger.error(f"Error ingesting {path.name}: {str(e)}")
+                    continue
+                parsed.append(df)
+                sources[path.name] = {**signature, 'commodity': commodity, 'rows': len(df)}
+            if not parsed:
+                continue
+
+            incoming = merge_reports(parsed)
+            # Deduplicate and append under one lock, so rows another process
+            # archives in between are not appended twice
+            with self.archive.locked() as changed:
+                stale = stale or changed
+                existing = frames[commodity] if commodity in frames and not stale else self.archive.load(commodity)
+                new_rows = unseen_rows(existing, incoming)
+                self.archive.append(commodity, new_rows, sources)
+
+            read = sum(len(df) for df in parsed)
+            results[commodity] = {
+                'files': [p.name for p in report_paths],
+                'rows': read,
+                'new_rows': len(new_rows),
+                'duplicates': read - len(new_rows)
+            }
+            logger.info(f"Ingested {commodity}: {len(new_rows)} new of {read} rows from {len(parsed)} report(s)")
+        return results
@@ -14,6 +14,14 @@ import logging
 from functools import lru_cache
 import glob
 
+from app.config import settings
+from app.services.commodity_store import CommodityStore
+from app.services.commodity_catalog import CommodityCatalog
+from app.services.market_archive import MarketArchive
+from app.services.market_ingestion import MarketIngestion
+from app.services.price_forecasting import ForecastEngine
+from app.services.market_snapshot import SnapshotIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,93 +31,39 @@ class MarketIntelligenceService:
     def __init__(self):
         # Path to Gujarat market data (from server directory, go up 2 levels to root)
         self.data_path = Path("../../data/gujarat/market-price-arrival")
-        self.cache = {}
+        # New report files are merged into a deduplicated archive, whose rows stay in memory
+        self.archive = MarketArchive(settings.MARKET_ARCHIVE_DIR)
+        self.store = CommodityStore(self.data_path, ingestion=MarketIngestion(self.data_path, self.archive))
+        # Record counts and date ranges: rescanned only for changed files, archive totals once ingested
+        self.catalog = CommodityCatalog(self.data_path, settings.MARKET_CATALOG_PATH,
+                                        self._categorize_commodity, archive=self.archive)
+        # Backtested forecast models, fitted once per commodity (and variety)
+        self.forecaster = ForecastEngine()
+        # Latest report and rolling aggregates per market, updated as rows arrive
+        self.snapshots = SnapshotIndex()
+        self.store.add_listener(self.snapshots.advance)
         self.data_loaded = False
         
     def _load_commodity_data(self, commodity: str) -> Optional[pd.DataFrame]:
-        """Load data for a specific commodity"""
-        try:
-            # Find CSV file matching commodity name
-            pattern = f"{commodity}*Daily Price Arrival Report*.csv"
-            files = list(self.data_path.glob(pattern))
-            
-            if not files:
-                logger.warning(f"No data file found for commodity: {commodity}")
-                return None
-            
-            file_path = files[0]
-            
-            # Read CSV, skip title row
-            df = pd.read_csv(file_path, skiprows=1)
-            
-            # Clean price columns (remove commas, convert to float)
-            price_cols = ['Min Price', 'Max Price', 'Modal Price']
-            for col in price_cols:
-                if col in df.columns:
-                    df[col] = df[col].astype(str).str.replace(',', '').astype(float)
-            
-            # Clean arrival quantity
-            if 'Arrival Quantity' in df.columns:
-                df['Arrival Quantity'] = df['Arrival Quantity'].astype(str).str.replace(',', '').astype(float)
-            
-            # Parse dates
-            df['Arrival Date'] = pd.to_datetime(df['Arrival Date'], format='%d-%m-%Y')
-            
-            # Sort by date
-            df = df.sort_values('Arrival Date')
-            
-            logger.info(f"Loaded {len(df)} records for {commodity}")
-            return df
-            
-        except Exception as e:
-            logger.error(f"Error loading data for {commodity}: {str(e)}")
-            return None
+        """Parsed, date-sorted data for a commodity (shared and read-only)"""
+        df = self.store.get(commodity)
+        if df is None:
+            logger.warning(f"No data file found for commodity: {commodity}")
+        return df
+    
+    def _load_snapshot(self, commodity: str):
+        """Commodity data and its per-market snapshot"""
+        df = self._load_commodity_data(commodity)
+        if df is None or len(df) == 0:
+            return df, None
+        return df, self.snapshots.get(self.store.resolve(commodity), df)
     
     def get_available_commodities(self) -> List[Dict]:
         """Get list of all available commodities with metadata"""
         try:
-            commodities = []
-            csv_files = list(self.data_path.glob("*Daily Price Arrival Report*.csv"))
-            
-            for file_path in csv_files:
-                # Extract commodity name from filename
-                commodity_name = file_path.name.split(' Daily')[0]
-                
-                # Quick count of records
-                try:
-                    df = pd.read_csv(file_path, skiprows=1)
-                    record_count = len(df)
-                    
-                    # Get date range
-                    df['Arrival Date'] = pd.to_datetime(df['Arrival Date'], format='%d-%m-%Y', errors='coerce')
-                    dates = df['Arrival Date'].dropna()
-                    
-                    if len(dates) > 0:
-                        date_range = {
-                            'start': dates.min().strftime('%Y-%m-%d'),
-                            'end': dates.max().strftime('%Y-%m-%d'),
-                            'days': (dates.max() - dates.min()).days
-                        }
-                    else:
-                        date_range = None
-                    
-                    # Categorize commodity
-                    category = self._categorize_commodity(commodity_name)
-                    
-                    commodities.append({
-                        'name': commodity_name,
-                        'category': category,
-                        'record_count': record_count,
-                        'date_range': date_range
-                    })
-                except Exception as e:
-                    logger.error(f"Error processing {commodity_name}: {str(e)}")
-                    continue
-            
-            # Sort by category and name
-            commodities.sort(key=lambda x: (x['category'], x['name']))
-            return commodities
-            
+            # Ingest new reports first, so the counts match what the other endpoints serve
+            self.store.refresh()
+            return self.catalog.commodities()
         except Exception as e:
             logger.error(f"Error getting commodities: {str(e)}")
             return []
@@ -147,15 +101,16 @@ class MarketIntelligenceService:
     ) -> List[Dict]:
         """Compare prices across different markets for a commodity"""
         try:
-            df = self._load_commodity_data(commodity)
+            df, snapshot = self._load_snapshot(commodity)
             if df is None or len(df) == 0:
                 return []
             
-            # Filter by date (use latest if not specified)
-            if date:
-                target_date = pd.to_datetime(date)
-            else:
-                target_date = df['Arrival Date'].max()
+            # Latest and recent dates are answered from the snapshot
+            target_date = pd.to_datetime(date) if date else None
+            markets = snapshot.latest_by_market(target_date, 3, district, variety)
+            if markets is not None:
+                markets.sort(key=lambda x: x['modal_price'], reverse=True)
+                return markets
             
             # Get data for target date (within 3 days window)
             date_window = timedelta(days=3)
@@ -174,8 +129,8 @@ class MarketIntelligenceService:
             if len(filtered) == 0:
                 return []
             
-            # Group by market and get latest entry
-            latest_by_market = filtered.sort_values('Arrival Date').groupby('Market').tail(1)
+            # Group by market and get latest entry (frame is already date-sorted)
+            latest_by_market = filtered.groupby('Market').tail(1)
             
             # Create comparison list
             markets = []
@@ -204,7 +159,7 @@ class MarketIntelligenceService:
     def get_commodity_insights(self, commodity: str, days: int = 30) -> Dict:
         """Get comprehensive insights for a commodity"""
         try:
-            df = self._load_commodity_data(commodity)
+            df, snapshot = self._load_snapshot(commodity)
             if df is None or len(df) == 0:
                 return {}
             
@@ -261,19 +216,7 @@ class MarketIntelligenceService:
                 }
             
             # Top markets by price
-            top_markets = df.groupby('Market').agg({
-                'Modal Price': 'mean',
-                'Arrival Quantity': 'sum'
-            }).sort_values('Modal Price', ascending=False).head(5)
-            
-            insights['top_markets'] = [
-                {
-                    'market': market,
-                    'avg_price': float(row['Modal Price']),
-                    'total_arrival': float(row['Arrival Quantity'])
-                }
-                for market, row in top_markets.iterrows()
-            ]
+            insights['top_markets'] = snapshot.top_markets(5)
             
             return insights
             
@@ -281,8 +224,34 @@ class MarketIntelligenceService:
             logger.error(f"Error getting insights for {commodity}: {str(e)}")
             return {}
     
+    def forecast_prices(
+        self,
+        commodity: str,
+        days: int = 7,
+        district: Optional[str] = None,
+        market: Optional[str] = None,
+        variety: Optional[str] = None
+    ) -> Dict:
+        """
+        Price forecast for the state, a district or a market
+        
+        Uses whichever model backtested best for that series; prediction
+        intervals come from the model's backtest residuals.
+        """
+        try:
+            df = self._load_commodity_data(commodity)
+            if df is None or len(df) == 0:
+                return {'error': 'No data available'}
+            
+            name = self.store.resolve(commodity)
+            return self.forecaster.forecast(name, df, days, district=district, market=market, variety=variety)
+            
+        except Exception as e:
+            logger.error(f"Error in forecast for {commodity}: {str(e)}")
+            return {'error': str(e)}
+    
     def simple_forecast(self, commodity: str, days: int = 7) -> Dict:
-        """Simple moving average forecast as baseline"""
+        """Simple moving average forecast (baseline kept for comparison with forecast_prices)"""
         try:
             df = self._load_commodity_data(commodity)
             if df is None or len(df) == 0:
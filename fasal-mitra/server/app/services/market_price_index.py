@@ -0,0 +1,159 @@
+"""
+Market Price Index
+
+Build-once lookup over the Agmarknet weekly mandi price frame used by crop
+planning, so market scoring and the market-prices endpoint no longer run a
+str.contains scan over the full frame on every call. Each commodity is
+built in one pass: its rows are matched and sorted once and split by state
+with a single groupby. Only states present in the data get their own
+entry; any other requested state shares the commodity's all-states entry.
+
+Matching keeps the original semantics: commodity and state are matched
+case-insensitively by substring, and a state with no rows falls back to
+all states for that commodity.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Iterable, Optional
+import logging
+import threading
+
+from app.core.result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+# Number of most recent rows kept per entry for the market-prices endpoint
+RECENT_ROWS = 20
+
+
+# Columns copied into each entry's recent_prices
+RECENT_COLUMNS = {
+    "state": 'State',
+    "district": 'District',
+    "market": 'Market',
+    "date": 'Arrival_Date',
+    "min_price": 'Min Price',
+    "max_price": 'Max Price',
+    "modal_price": 'Modal Price'
+}
+
+
+def _newest_first(dates: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """
+    Rows ordered by date, newest first
+
+    Uses the same (unstable) sort as DataFrame.sort_values on the filtered
+    rows, so ties on a date resolve exactly as the per-request code did.
+    """
+    order = pd.Series(dates[rows]).sort_values(ascending=False).index.to_numpy()
+    return rows[order]
+
+
+def _price_stats(columns: Dict[str, np.ndarray], rows: np.ndarray) -> Dict:
+    """Stats for the given rows of a commodity's columns, in frame order"""
+    rows = _newest_first(columns['Arrival_Date'], rows)
+    modal = columns['Modal Price'][rows]
+    window = min(10, len(rows))
+
+    recent = rows[:RECENT_ROWS]
+    values = {key: columns[col][recent] for key, col in RECENT_COLUMNS.items()}
+    values["date"] = pd.DatetimeIndex(values["date"]).strftime('%Y-%m-%d')
+    recent_prices = [dict(zip(values, row)) for row in zip(*values.values())]
+
+    return {
+        "count": len(rows),
+        "avg_price": np.nanmean(modal),
+        "std_price": np.nanstd(modal, ddof=1) if len(modal) > 1 else np.nan,
+        "recent_avg": np.nanmean(modal[:window]),
+        "older_avg": np.nanmean(modal[-window:]),
+        "min_price": np.nanmin(columns['Min Price'][rows]),
+        "max_price": np.nanmax(columns['Max Price'][rows]),
+        "recent_prices": recent_prices
+    }
+
+
+class MarketPriceIndex:
+    """Commodity -> price statistics for all states and for each state in the data"""
+
+    def __init__(self, market_prices: pd.DataFrame):
+        self.market_prices = market_prices
+        # Commodity names are matched against the distinct values, not every row
+        self._codes, self._names = pd.factorize(market_prices['Commodity']) if 'Commodity' in market_prices else ([], [])
+        # Commodity names come from crop names in requests, so the cache is bounded
+        self._entries = ResultCache("market_price_index", max_entries=512, ttl_seconds=24 * 3600)
+        self._lock = threading.Lock()
+
+    def warm(self, commodities: Iterable[str]):
+        """Precompute the entries for every commodity planning will ask for"""
+        if self.market_prices.empty:
+            return
+
+        commodities = list(dict.fromkeys(commodities))
+        for commodity in commodities:
+            try:
+                self._entry(commodity)
+            except Exception as e:
+                logger.warning(f"Could not index market prices for {commodity}: {e}")
+
+        logger.info(f"Indexed market prices for {len(commodities)} commodities")
+
+    def _entry(self, commodity: str) -> Dict:
+        entry = self._entries.get(commodity)
+        if entry is None:
+            with self._lock:
+                entry = self._entries.get(commodity)
+                if entry is None:
+                    entry = self._build_entry(commodity)
+                    self._entries.put(commodity, entry)
+        return entry
+
+    def _build_entry(self, commodity: str) -> Dict:
+        """{'all': stats, 'states': {state: stats}, 'columns', 'combined'}; 'all' is None without rows"""
+        matched = pd.Series(self._names).str.contains(commodity, case=False, na=False).to_numpy()
+        prices = self.market_prices[np.isin(self._codes, np.flatnonzero(matched))]
+        if prices.empty:
+            return {'all': None, 'states': {}, 'combined': {}}
+
+        columns = {col: prices[col].to_numpy() for col in RECENT_COLUMNS.values()}
+        state_codes, states = pd.factorize(prices['State'])
+        # Stable argsort keeps each state's rows in frame order
+        order = np.argsort(state_codes, kind='stable')
+        bounds = np.searchsorted(state_codes[order], np.arange(len(states) + 1))
+        return {
+            'all': _price_stats(columns, np.arange(len(prices))),
+            'states': {
+                state: _price_stats(columns, order[bounds[i]:bounds[i + 1]])
+                for i, state in enumerate(states)
+            },
+            'columns': columns,
+            'combined': {}
+        }
+
+    def get(self, commodity: str, state: Optional[str] = None) -> Optional[Dict]:
+        """
+        Price statistics for a commodity, optionally narrowed to a state.
+
+        Returns:
+            Stats dict, or None if the commodity has no price rows
+        """
+        entry = self._entry(commodity)
+        if entry['all'] is None or not state:
+            return entry['all']
+
+        # Same matching as a case-insensitive str.contains on the State column
+        lowered = state.lower()
+        matched = tuple(s for s in entry['states'] if lowered in s.lower())
+        if not matched:
+            return entry['all']
+        if len(matched) == 1:
+            return entry['states'][matched[0]]
+
+        # A partial name matching several states ("Pradesh"): built once per match set
+        stats = entry['combined'].get(matched)
+        if stats is None:
+            columns = entry['columns']
+            stats = _price_stats(columns, np.flatnonzero(np.isin(columns['State'], matched)))
+            with self._lock:
+                entry['combined'][matched] = stats
+        return stats
@@ -0,0 +1,213 @@
+"""
+Market Snapshot
+
+Per-(district, market, variety) snapshot of a commodity's reports: the
+latest report, rolling 7/14/30-day mean modal prices and 30-day volatility,
+plus whole-history price/arrival totals per market. Snapshots are built
+once from the commodity frame and then updated with only the newly
+ingested rows, so market comparison and top-market queries read the
+snapshot instead of filtering, sorting and grouping the full history.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+WINDOWS = (7, 14, 30)
+HISTORY_DAYS = max(WINDOWS)
+
+_Key = Tuple[str, str, str]  # (district, market, variety)
+
+
+def _window_stats(dates: np.ndarray, prices: np.ndarray) -> Dict:
+    """Rolling means and volatility for days ending at the latest date"""
+    latest = dates[-1]
+    stats = {}
+    for window in WINDOWS:
+        values = prices[dates > latest - np.timedelta64(window, 'D')]
+        values = values[~np.isnan(values)]
+        stats[f'avg_{window}d'] = round(float(values.mean()), 2) if len(values) else None
+        if window == HISTORY_DAYS:
+            volatile = len(values) > 1 and values.mean() > 0
+            # Coefficient of variation of the modal price, in percent
+            stats[f'volatility_{window}d'] = (
+                round(float(values.std(ddof=1) / values.mean() * 100), 2) if volatile else None
+            )
+    return stats
+
+
+class MarketSnapshot:
+    """Latest report and rolling statistics per (district, market, variety)"""
+
+    def __init__(self):
+        self.entries: Dict[_Key, Dict] = {}
+        # key -> (arrival day, sequence) of the latest report, for ordering without numpy scalars
+        self._latest: Dict[_Key, Tuple[int, int]] = {}
+        # key -> dates, modal prices and sequence numbers of the last HISTORY_DAYS days
+        self._history: Dict[_Key, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self.market_totals: Dict[str, np.ndarray] = {}  # market -> [price sum, price count, arrival sum]
+        self.latest_date: Optional[pd.Timestamp] = None
+        self.next_seq = 0
+        self._top_markets: Optional[List[Dict]] = None
+
+    def apply(self, rows: pd.DataFrame):
+        """
+        Fold report rows into the snapshot
+
+        Rows must be in report order; rows applied later win ties on the
+        same arrival date, as they would after a stable sort by date.
+        """
+        if len(rows) == 0:
+            return
+        seq = self.next_seq + np.arange(len(rows))
+        self.next_seq += len(rows)
+
+        dates = rows['Arrival Date'].to_numpy(dtype='datetime64[D]')
+        modal = rows['Modal Price'].to_numpy(dtype=float)
+        groups = rows.groupby(['District', 'Market', 'Variety'], sort=False, dropna=False).indices
+
+        for key, positions in groups.items():
+            key_dates, key_prices, key_seq = dates[positions], modal[positions], seq[positions]
+            history = self._history.get(key)
+            if history is not None:
+                key_dates = np.concatenate([history[0], key_dates])
+                key_prices = np.concatenate([history[1], key_prices])
+                key_seq = np.concatenate([history[2], key_seq])
+
+            order = np.lexsort((key_seq, key_dates))
+            key_dates, key_prices, key_seq = key_dates[order], key_prices[order], key_seq[order]
+            # Only the last HISTORY_DAYS days are needed for the windows
+            keep = key_dates > key_dates[-1] - np.timedelta64(HISTORY_DAYS, 'D')
+            key_dates, key_prices, key_seq = key_dates[keep], key_prices[keep], key_seq[keep]
+            self._history[key] = (key_dates, key_prices, key_seq)
+
+            latest = (int(key_dates[-1].astype(int)), int(key_seq[-1]))
+            if latest != self._latest.get(key):
+                row = rows.iloc[positions[np.searchsorted(seq[positions], latest[1])]]
+                self.entries[key] = {
+                    'district': row['District'],
+                    'market': row['Market'],
+                    'variety': row['Variety'],
+                    'modal_price': float(row['Modal Price']),
+                    'min_price': float(row['Min Price']),
+                    'max_price': float(row['Max Price']),
+                    'arrival_quantity': float(row['Arrival Quantity']),
+                    'date': row['Arrival Date'].strftime('%Y-%m-%d'),
+                    'price_unit': row['Price Unit'],
+                }
+                self._latest[key] = latest
+            self.entries[key].update(_window_stats(key_dates, key_prices))
+
+        totals = rows.groupby('Market', sort=False).agg(
+            price_sum=('Modal Price', 'sum'),
+            price_count=('Modal Price', 'count'),
+            arrival_sum=('Arrival Quantity', 'sum')
+        )
+        for market, values in zip(totals.index, totals.to_numpy(dtype=float)):
+            current = self.market_totals.get(market)
+            self.market_totals[market] = values if current is None else current + values
+
+        latest_date = rows['Arrival Date'].max()
+        if self.latest_date is None or latest_date > self.latest_date:
+            self.latest_date = latest_date
+        self._top_markets = None
+
+    def latest_by_market(
+        self,
+        target_date: Optional[pd.Timestamp] = None,
+        window_days: int = 3,
+        district: Optional[str] = None,
+        variety: Optional[str] = None
+    ) -> Optional[List[Dict]]:
+        """
+        Latest report per market within window_days of target_date
+
+        Returns None when target_date is before the latest report: the
+        snapshot only holds the latest rows, so the caller must scan history.
+        The returned dicts are copies and may be modified.
+        """
+        target = self.latest_date if target_date is None else target_date
+        if self.latest_date is None or target < self.latest_date:
+            return None
+        since = int(np.datetime64(target - pd.Timedelta(days=window_days), 'D').astype(int))
+        district = district.lower() if district else None
+        variety = variety.lower() if variety else None
+
+        best: Dict[str, _Key] = {}
+        for key, latest in self._latest.items():
+            entry_district, market, entry_variety = key
+            if latest[0] < since or pd.isna(market):
+                continue
+            if district and str(entry_district).lower() != district:
+                continue
+            if variety and str(entry_variety).lower() != variety:
+                continue
+            current = best.get(market)
+            if current is None or latest > self._latest[current]:
+                best[market] = key
+
+        ordered = sorted(best.values(), key=self._latest.__getitem__)
+        return [dict(self.entries[key]) for key in ordered]
+
+    def top_markets(self, n: int = 5) -> List[Dict]:
+        """Markets by whole-history mean modal price"""
+        if self._top_markets is None:
+            ranked = []
+            for market, (price_sum, price_count, arrival_sum) in self.market_totals.items():
+                if price_count:
+                    ranked.append({
+                        'market': market,
+                        'avg_price': float(price_sum / price_count),
+                        'total_arrival': float(arrival_sum)
+                    })
+            ranked.sort(key=lambda m: m['avg_price'], reverse=True)
+            self._top_markets = ranked
+        return self._top_markets[:n]
+
+
+class SnapshotIndex:
+    """Commodity -> snapshot, tied to the frame it was built from"""
+
+    def __init__(self):
+        self._snapshots: Dict[str, Tuple[pd.DataFrame, MarketSnapshot]] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def get(self, commodity: str, df: pd.DataFrame) -> MarketSnapshot:
+        """Snapshot for the commodity, rebuilt if its frame was replaced"""
+        with self._lock:
+            cached = self._snapshots.get(commodity)
+            if cached is not None and cached[0] is df:
+                return cached[1]
+            snapshot = MarketSnapshot()
+            snapshot.apply(df)
+            self._snapshots[commodity] = (df, snapshot)
+            self.builds += 1
+            logger.info(f"Built market snapshot for {commodity}: {len(snapshot.entries)} market/variety entries")
+            return snapshot
+
+    def advance(self, commodity: str, old_df: pd.DataFrame, new_df: pd.DataFrame, new_rows: pd.DataFrame):
+        """
+        Apply newly ingested rows to the snapshot built from old_df
+
+        new_df must be old_df plus new_rows, stably sorted by date. A snapshot
+        that was never built, or was built from another frame, is left to be
+        rebuilt on its next get().
+        """
+        with self._lock:
+            cached = self._snapshots.get(commodity)
+            if cached is not None and cached[0] is old_df:
+                cached[1].apply(new_rows)
+                self._snapshots[commodity] = (new_df, cached[1])
+
+    def stats(self) -> Dict:
+        return {
+            'snapshots': len(self._snapshots),
+            'entries': sum(len(s.entries) for _, s in self._snapshots.values()),
+            'builds': self.builds
+        }
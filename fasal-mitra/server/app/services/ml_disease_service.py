@@ -4,6 +4,7 @@ ML-Based Disease Detection Service
 Integrates TensorFlow/Keras model for real plant disease detection.
 """
 
+import asyncio
 import numpy as np
 from datetime import datetime
 from typing import Optional, Dict, List
@@ -12,8 +13,14 @@ import logging
 import json
 import os
 from pathlib import Path
-from PIL import Image
-import io
+
+from app.config import settings
+from app.core.result_cache import ResultCache, content_hash
+from app.models.disease import AdviceMode
+from app.services.inference_batcher import MicroBatcher
+from app.services.image_preprocessing import ImagePreprocessor, decode_image_into
+from app.services.disease_model_runtime import load_disease_model
+from app.services.treatment_advice_service import TreatmentAdviceService, get_treatment_advice_service
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +32,21 @@ class MLDiseaseDetectionService:
         """Initialize ML model and disease database"""
         logger.info("[INIT] Initializing ML Disease Detection Service...")
         self.model = None
+        self.batcher: Optional[MicroBatcher] = None
+        self.preprocessor = ImagePreprocessor(
+            size=(160, 160),
+            max_workers=settings.IMAGE_PREPROCESS_WORKERS
+        )
+        
+        # Re-uploads and client retries of the same photo skip the CNN
+        self.prediction_cache = ResultCache(
+            "disease_prediction",
+            max_entries=settings.DISEASE_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.DISEASE_CACHE_TTL
+        )
+        # LLM advice is cached per diagnosis and generated off the detection path
+        self.advice_service: TreatmentAdviceService = get_treatment_advice_service()
+        
         self.disease_database = self._load_disease_database()
         logger.info(f"[INIT] Disease database loaded: {len(self.disease_database)} diseases")
         self.class_labels = self._get_class_labels()
@@ -32,7 +54,7 @@ class MLDiseaseDetectionService:
         self.model_loaded = False
         
         # Try to load model on initialization
-        logger.info("[INIT] Loading TensorFlow model (this may take 30-60 seconds on first load)...")
+        logger.info("[INIT] Loading disease model (Keras may take 30-60 seconds on first load)...")
         try:
             self._load_model()
             logger.info("[INIT] ML Model loaded successfully! Service ready.")
@@ -40,36 +62,30 @@ class MLDiseaseDetectionService:
             logger.warning(f"[WARN] Model not loaded on init: {e}. Will use fallback detection.")
     
     def _load_model(self):
-        """Load TensorFlow/Keras model"""
+        """Load the disease model (TFLite runtime if exported, else TensorFlow/Keras)"""
         try:
-            logger.info("[LOAD] Importing TensorFlow...")
-            import tensorflow as tf
-            logger.info(f"[LOAD] TensorFlow {tf.__version__} imported successfully")
-            
-            model_path = Path(__file__).parent.parent / "models" / "ml" / "plant_disease_recog_model_pwp.keras"
-            
-            if not model_path.exists():
-                raise FileNotFoundError(
-                    f"Model file not found at {model_path}. "
-                    "Please download the model from Google Drive and place it in the correct location. "
-                    "See app/models/ml/README.md for instructions."
-                )
-            
-            size_mb = model_path.stat().st_size / (1024 * 1024)
-            logger.info(f"[LOAD] Found model file: {model_path.name} ({size_mb:.2f} MB)")
-            logger.info(f"[LOAD] Loading model (this takes time, please wait)...")
-            
-            # Load model without compiling (compile=False) to avoid optimizer compatibility issues
-            # We only need the model for inference, not training
-            self.model = tf.keras.models.load_model(str(model_path), compile=False)
+            # TFLite skips the multi-second TensorFlow import entirely
+            self.model = load_disease_model(
+                backend=settings.DISEASE_MODEL_BACKEND,
+                num_threads=settings.DISEASE_MODEL_THREADS
+            )
+            logger.info(f"[LOAD] Using {self.model.name} inference backend")
+
+            # Concurrent requests share batched forward passes on one worker thread
+            self.batcher = MicroBatcher(
+                self.model.predict,
+                max_batch_size=settings.DISEASE_BATCH_MAX_SIZE,
+                max_latency_ms=settings.DISEASE_BATCH_MAX_LATENCY_MS,
+                name="disease-cnn"
+            )
             self.model_loaded = True
             logger.info("[LOAD] ML model loaded successfully into memory!")
             
         except ImportError as e:
-            logger.error(f"TensorFlow not installed: {e}")
+            logger.error(f"No inference runtime installed: {e}")
             raise ImportError(
-                "TensorFlow is required for ML-based disease detection. "
-                "Install it with: pip install tensorflow"
+                "TensorFlow (or tflite-runtime with an exported .tflite model) is required "
+                "for ML-based disease detection. Install it with: pip install tensorflow"
             )
         except Exception as e:
             logger.error(f"Error loading model: {e}")
@@ -149,31 +165,11 @@ class MLDiseaseDetectionService:
             Preprocessed numpy array ready for model input
         """
         try:
-            # Open image
-            image = Image.open(io.BytesIO(image_data))
-            logger.info(f"[PREPROCESS] Original image: size={image.size}, mode={image.mode}")
-            
-            # Convert to RGB if necessary
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-                logger.info(f"[PREPROCESS] Converted to RGB")
-            
-            # Resize to model input size (160x160)
-            image = image.resize((160, 160))
-            logger.info(f"[PREPROCESS] Resized to 160x160")
-            
-            # Convert to numpy array (uint8 for 0-255 range)
-            img_array = np.array(image, dtype=np.float32)
-            logger.info(f"[PREPROCESS] Converted to array: shape={img_array.shape}, dtype={img_array.dtype}")
-            logger.info(f"[PREPROCESS] Pixel range: min={img_array.min()}, max={img_array.max()}, mean={img_array.mean():.2f}")
-            
-            # Expand dimensions to match model input shape (1, 160, 160, 3)
-            img_array = np.expand_dims(img_array, axis=0)
-            
+            # Same decode path as the request pipeline, into a fresh (1, 160, 160, 3) array
             # NOTE: DO NOT NORMALIZE! Model was trained on 0-255 range
             # (Reference: Plant-Disease-Recognition-System uses img_to_array without normalization)
-            logger.info(f"[PREPROCESS] Final array: shape={img_array.shape}, range=[{img_array.min()}, {img_array.max()}]")
-            
+            img_array = np.empty((1, 160, 160, 3), dtype=np.float32)
+            decode_image_into(image_data, img_array[0])
             return img_array
         
         except Exception as e:
@@ -216,7 +212,8 @@ class MLDiseaseDetectionService:
         self,
         image_data: bytes,
         crop_type: str,
-        location: Optional[str] = None
+        location: Optional[str] = None,
+        advice_mode: Optional[str] = None
     ) -> Dict:
         """
         Detect disease from plant image using ML model
@@ -225,6 +222,8 @@ class MLDiseaseDetectionService:
             image_data: Image file bytes
             crop_type: Type of crop (for filtering/validation)
             location: Optional location information
+            advice_mode: "deferred" (don't wait for LLM advice) or "inline";
+                defaults to settings.DISEASE_ADVICE_MODE
             
         Returns:
             Dictionary with detection results
@@ -237,80 +236,32 @@ class MLDiseaseDetectionService:
                 except Exception as e:
                     return self._fallback_detection(crop_type, location, str(e))
             
-            # Preprocess image
             logger.info(f"[DETECT] Starting disease detection for {crop_type}...")
-            processed_image = self._preprocess_image(image_data)
-            
-            # Make prediction
-            import tensorflow as tf
-            logger.info(f"[PREDICT] Running model prediction...")
-            predictions = self.model.predict(processed_image, verbose=0)
-            logger.info(f"[PREDICT] Prediction complete. Shape: {predictions.shape}")
-            
-            # Log top 5 predictions for debugging
-            top_5_indices = np.argsort(predictions[0])[-5:][::-1]
-            logger.info(f"[PREDICT] Top 5 predictions:")
-            for i, idx in enumerate(top_5_indices, 1):
-                logger.info(f"[PREDICT]    {i}. {self.class_labels[idx]}: {predictions[0][idx]*100:.2f}%")
-            
-            # Get prediction index and confidence
-            predicted_index = np.argmax(predictions[0])
-            confidence = float(predictions[0][predicted_index])
-            
-            # Get disease label
-            disease_label = self.class_labels[predicted_index]
-            logger.info(f"[RESULT] Final prediction: {disease_label} (confidence: {confidence*100:.2f}%)")
+            image_key = (content_hash(image_data), crop_type)
             
-            # Get disease details from database
-            disease_info = self.disease_database.get(disease_label, {
-                'name': disease_label,
-                'cause': 'Information not available',
-                'cure': 'Consult agricultural expert for treatment'
-            })
-            
-            # Extract crop from label
-            detected_crop = self._get_crop_from_label(disease_label)
-            
-            # Determine severity
-            severity = self._get_severity_from_disease(disease_label, confidence)
-            
-            # Check if it's a healthy plant
-            is_healthy = 'healthy' in disease_label.lower()
+            probabilities = self.prediction_cache.get(image_key)
+            if probabilities is not None:
+                logger.info("[DETECT] Same image seen recently - reusing cached prediction")
+            else:
+                # Preprocess image (decode/resize on the preprocessing pool)
+                try:
+                    processed_image = await self.preprocessor.preprocess(image_data)
+                except Exception as e:
+                    logger.error(f"Error preprocessing image: {e}")
+                    raise ValueError(f"Failed to preprocess image: {e}")
+                
+                # Make prediction (batched with other concurrent requests)
+                try:
+                    probabilities = await self.batcher.predict(processed_image)
+                finally:
+                    self.preprocessor.release(processed_image)
+                self.prediction_cache.put(image_key, probabilities)
             
-            # Prepare response
-            response = {
-                "detection_id": str(uuid.uuid4()),
-                "timestamp": datetime.now().isoformat(),
-                "crop_type": crop_type,
-                "detected_crop": detected_crop,
-                "location": location,
-                "disease_label": disease_label,
-                "disease_name": self._format_disease_name(disease_label),
-                "is_healthy": is_healthy,
-                "confidence": round(confidence * 100, 2),
-                "severity": severity,
-                "cause": disease_info.get('cause', 'Unknown'),
-                "treatment": disease_info.get('cure', 'Consult expert'),
-                # Farmer-friendly additional information
-                "simple_explanation": disease_info.get('simple_explanation', 'Disease information being analyzed. Please consult local expert.'),
-                "how_to_spot": disease_info.get('how_to_spot', 'Check with agricultural expert for identification tips.'),
-                "prevention_tips": disease_info.get('prevention_tips', 'Follow general good agricultural practices.'),
-                "recommendations": self._generate_recommendations(disease_label, severity, confidence, detected_crop),
-                "next_steps": self._generate_next_steps(severity, is_healthy),
-                "model_used": "TensorFlow CNN (39 classes)"
-            }
+            response = self._build_detection(probabilities, crop_type, location)
             
             # Optional: Add LLM-generated personalized advice (if GEMINI_API_KEY is set)
-            if not is_healthy and severity != 'none':
-                llm_advice = await self.get_llm_treatment_advice(
-                    disease_name=self._format_disease_name(disease_label),
-                    crop=detected_crop,
-                    location=location or "Unknown",
-                    severity=severity
-                )
-                if llm_advice:
-                    response['llm_advice'] = llm_advice
-                    logger.info("✅ Added LLM-generated treatment advice to response")
+            if not response['is_healthy'] and response['severity'] != 'none':
+                await self._attach_advice(response, location, advice_mode)
             
             return response
         
@@ -319,6 +270,263 @@ class MLDiseaseDetectionService:
             # Fallback to simulated detection
             return self._fallback_detection(crop_type, location, str(e))
     
+    async def detect_disease_batch(
+        self,
+        images: List[bytes],
+        crop_type: str,
+        location: Optional[str] = None,
+        advice_mode: Optional[str] = None
+    ) -> Dict:
+        """
+        Detect disease from several photos of the same plant
+        
+        Photos are decoded in parallel and classified in one batched forward
+        pass; LLM advice is requested once per distinct disease found.
+        
+        Args:
+            images: Image file bytes, one entry per photo
+            crop_type: Type of crop (for filtering/validation)
+            location: Optional location information
+            advice_mode: "deferred" or "inline" (see detect_disease)
+            
+        Returns:
+            Dictionary with per-photo results and an aggregated diagnosis
+        """
+        # Ensure model is loaded
+        if not self.model_loaded:
+            try:
+                self._load_model()
+            except Exception as e:
+                fallback = self._fallback_detection(crop_type, location, str(e))
+                return {"photo_count": len(images), "results": [], "aggregated": fallback}
+        
+        logger.info(f"[DETECT] Starting batch disease detection: {len(images)} photos of {crop_type}...")
+        keys = [(content_hash(data), crop_type) for data in images]
+        probabilities = [self.prediction_cache.get(key) for key in keys]
+        pending = [i for i, probs in enumerate(probabilities) if probs is None]
+        errors = {}
+        
+        # Decode/resize every uncached photo concurrently on the preprocessing pool
+        decoded = await asyncio.gather(
+            *[self.preprocessor.preprocess(images[i]) for i in pending],
+            return_exceptions=True
+        )
+        ready = []
+        for i, buffer in zip(pending, decoded):
+            if isinstance(buffer, Exception):
+                logger.error(f"Error preprocessing image {i}: {buffer}")
+                errors[i] = f"Failed to preprocess image: {buffer}"
+            else:
+                ready.append((i, buffer))
+        
+        if ready:
+            try:
+                outputs = await self.batcher.predict_many([buffer for _, buffer in ready])
+            finally:
+                for _, buffer in ready:
+                    self.preprocessor.release(buffer)
+            for (i, _), probs in zip(ready, outputs):
+                probabilities[i] = probs
+                self.prediction_cache.put(keys[i], probs)
+        
+        results = []
+        detections = []
+        for i, probs in enumerate(probabilities):
+            if probs is None:
+                results.append({"image_index": i, "error": errors.get(i, "Prediction failed")})
+                continue
+            result = self._build_detection(probs, crop_type, location)
+            result["image_index"] = i
+            results.append(result)
+            detections.append((result, probs))
+        
+        aggregated = self._aggregate_detections(detections, crop_type, location) if detections else None
+        
+        # One advice lookup per distinct disease, shared by every photo showing it
+        if aggregated:
+            diseased = [d for d in aggregated['diseases'] if not d['is_healthy'] and d['severity'] != 'none']
+            await asyncio.gather(*[self._attach_advice(d, location, advice_mode) for d in diseased])
+            by_label = {d['disease_label']: d for d in diseased}
+            for target in [*results, aggregated]:
+                entry = by_label.get(target.get('disease_label'))
+                if entry is not None:
+                    for field in ('llm_advice', 'advice_status'):
+                        if field in entry:
+                            target[field] = entry[field]
+        
+        return {
+            "photo_count": len(images),
+            "analyzed_count": len(detections),
+            "results": results,
+            "aggregated": aggregated
+        }
+    
+    async def _attach_advice(self, target: Dict, location: Optional[str], advice_mode: Optional[str]):
+        """
+        Add LLM advice for a diagnosis to a result dict
+        
+        Inline mode waits for the advice; deferred mode only attaches it if
+        already cached and otherwise starts generating it in the background,
+        marking the result with advice_status="pending" so the client can
+        fetch it from GET /disease/advice.
+        """
+        mode = AdviceMode(advice_mode or settings.DISEASE_ADVICE_MODE)
+        if mode == AdviceMode.INLINE:
+            llm_advice = await self.get_llm_treatment_advice(
+                disease_name=target['disease_name'],
+                crop=target['detected_crop'],
+                location=location or "Unknown",
+                severity=target['severity']
+            )
+        else:
+            llm_advice = await self.advice_service.prefetch(
+                disease_name=target['disease_name'],
+                crop=target['detected_crop'],
+                severity=target['severity'],
+                location=location
+            )
+        
+        if llm_advice:
+            target['llm_advice'] = llm_advice
+            logger.info("✅ Added LLM-generated treatment advice to response")
+        elif mode == AdviceMode.DEFERRED and self.advice_service.is_enabled():
+            target['advice_status'] = 'pending'
+    
+    def _aggregate_detections(self, detections: List[tuple], crop_type: str, location: Optional[str]) -> Dict:
+        """
+        Combine per-photo results into one diagnosis
+        
+        The primary diagnosis is a soft vote (mean class probabilities across
+        photos); each detected disease keeps its average confidence and the
+        highest severity seen, as in the multi-photo analysis of the web app.
+        """
+        severity_order = {'none': 0, 'mild': 1, 'moderate': 2, 'severe': 3}
+        
+        diseases = {}
+        for result, _ in detections:
+            label = result['disease_label']
+            entry = diseases.get(label)
+            if entry is None:
+                entry = diseases[label] = {
+                    "disease_label": label,
+                    "disease_name": result['disease_name'],
+                    "detected_crop": result['detected_crop'],
+                    "is_healthy": result['is_healthy'],
+                    "severity": result['severity'],
+                    "confidence": 0.0,
+                    "photos": []
+                }
+            entry['confidence'] += result['confidence']
+            entry['photos'].append(result['image_index'])
+            # Take highest severity
+            if severity_order.get(result['severity'], 0) > severity_order.get(entry['severity'], 0):
+                entry['severity'] = result['severity']
+        
+        for entry in diseases.values():
+            entry['photo_count'] = len(entry['photos'])
+            entry['confidence'] = round(entry['confidence'] / entry['photo_count'], 2)
+        
+        mean_probabilities = np.mean([probs for _, probs in detections], axis=0)
+        primary_index = int(np.argmax(mean_probabilities))
+        primary_label = self.class_labels[primary_index]
+        primary_confidence = float(mean_probabilities[primary_index])
+        detected_crop = self._get_crop_from_label(primary_label)
+        is_healthy = 'healthy' in primary_label.lower()
+        
+        if primary_label in diseases:
+            severity = diseases[primary_label]['severity']
+        else:
+            severity = self._get_severity_from_disease(primary_label, primary_confidence)
+        votes = diseases[primary_label]['photo_count'] if primary_label in diseases else 0
+        
+        return {
+            "analysis_type": "multi_photo",
+            "photo_count": len(detections),
+            "crop_type": crop_type,
+            "detected_crop": detected_crop,
+            "location": location,
+            "disease_label": primary_label,
+            "disease_name": self._format_disease_name(primary_label),
+            "is_healthy": is_healthy,
+            "confidence": round(primary_confidence * 100, 2),
+            "agreement": round(votes / len(detections) * 100, 1),
+            "confidence_score": round(sum(r['confidence'] for r, _ in detections) / len(detections), 2),
+            "severity": severity,
+            "diseases": sorted(diseases.values(), key=lambda d: (d['photo_count'], d['confidence']), reverse=True),
+            "recommendations": self._generate_recommendations(primary_label, severity, primary_confidence, detected_crop),
+            "next_steps": self._generate_next_steps(severity, is_healthy)
+        }
+    
+    def _build_detection(self, probabilities: np.ndarray, crop_type: str, location: Optional[str]) -> Dict:
+        """Detection result (without LLM advice) from the model's class probabilities"""
+        # Log top 5 predictions for debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            top_5_indices = np.argsort(probabilities)[-5:][::-1]
+            for i, idx in enumerate(top_5_indices, 1):
+                logger.debug(f"[PREDICT]    {i}. {self.class_labels[idx]}: {probabilities[idx]*100:.2f}%")
+        
+        # Get prediction index and confidence
+        predicted_index = np.argmax(probabilities)
+        confidence = float(probabilities[predicted_index])
+        
+        # Get disease label
+        disease_label = self.class_labels[predicted_index]
+        logger.info(f"[RESULT] Final prediction: {disease_label} (confidence: {confidence*100:.2f}%)")
+        
+        # Get disease details from database
+        disease_info = self.disease_database.get(disease_label, {
+            'name': disease_label,
+            'cause': 'Information not available',
+            'cure': 'Consult agricultural expert for treatment'
+        })
+        
+        # Extract crop from label
+        detected_crop = self._get_crop_from_label(disease_label)
+        
+        # Determine severity
+        severity = self._get_severity_from_disease(disease_label, confidence)
+        
+        # Check if it's a healthy plant
+        is_healthy = 'healthy' in disease_label.lower()
+        
+        return {
+            "detection_id": str(uuid.uuid4()),
+            "timestamp": datetime.now().isoformat(),
+            "crop_type": crop_type,
+            "detected_crop": detected_crop,
+            "location": location,
+            "disease_label": disease_label,
+            "disease_name": self._format_disease_name(disease_label),
+            "is_healthy": is_healthy,
+            "confidence": round(confidence * 100, 2),
+            "severity": severity,
+            "cause": disease_info.get('cause', 'Unknown'),
+            "treatment": disease_info.get('cure', 'Consult expert'),
+            # Farmer-friendly additional information
+            "simple_explanation": disease_info.get('simple_explanation', 'Disease information being analyzed. Please consult local expert.'),
+            "how_to_spot": disease_info.get('how_to_spot', 'Check with agricultural expert for identification tips.'),
+            "prevention_tips": disease_info.get('prevention_tips', 'Follow general good agricultural practices.'),
+            "recommendations": self._generate_recommendations(disease_label, severity, confidence, detected_crop),
+            "next_steps": self._generate_next_steps(severity, is_healthy),
+            "model_used": f"{'TFLite' if self.model.name == 'tflite' else 'TensorFlow'} CNN (39 classes)"
+        }
+    
+    def cache_stats(self) -> Dict:
+        """Hit-rate metrics for the prediction and advice caches"""
+        stats = {
+            "prediction": self.prediction_cache.stats(),
+            "llm_advice": self.advice_service.stats()
+        }
+        if self.batcher is not None:
+            stats["batching"] = self.batcher.stats()
+        return stats
+    
+    def shutdown(self):
+        """Stop the inference worker and preprocessing threads"""
+        if self.batcher is not None:
+            self.batcher.stop()
+        self.preprocessor.shutdown()
+    
     def _format_disease_name(self, label: str) -> str:
         """Format disease label for display"""
         if '___' in label:
@@ -332,50 +540,16 @@ class MLDiseaseDetectionService:
         """
         Get personalized treatment advice from LLM (Gemini API)
         This is an OPTIONAL enhancement for better recommendations
+        
+        Cached per (disease, crop, severity, region); identical concurrent
+        requests share one LLM call.
         """
-        try:
-            import google.generativeai as genai
-            import os
-            
-            api_key = os.getenv('GEMINI_API_KEY')
-            if not api_key:
-                logger.debug("GEMINI_API_KEY not set, skipping LLM advice")
-                return None
-            
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-pro')
-            
-            prompt = f"""You are an expert agricultural advisor helping farmers.
-
-Disease Detected: {disease_name}
-Crop: {crop}
-Location: {location}
-Severity: {severity}
-
-Provide practical, farmer-friendly advice in simple language with these sections:
-1. IMMEDIATE ACTIONS (next 24-48 hours)
-2. ORGANIC TREATMENTS (natural, low-cost options)
-3. CHEMICAL TREATMENTS (if necessary, with safety warnings)
-4. PREVENTION (for future crops)
-5. WHEN TO CONSULT EXPERT
-
-IMPORTANT GUIDELINES:
-- Use simple language (5th grade reading level)
-- Focus on SAFE, affordable, locally-available treatments
-- Include safety warnings for chemical treatments
-- Suggest consulting local agricultural extension officer for serious cases
-- DO NOT recommend specific dosages unless you're certain they're safe
-- Prioritize organic/natural solutions first
-
-Keep response concise (under 300 words) and actionable."""
-            
-            response = model.generate_content(prompt)
-            logger.info("✅ LLM advice generated successfully")
-            return response.text
-            
-        except Exception as e:
-            logger.warning(f"Could not generate LLM advice: {e}")
-            return None
+        return await self.advice_service.get_advice(
+            disease_name=disease_name,
+            crop=crop,
+            severity=severity,
+            location=location
+        )
     
     def _generate_recommendations(self, disease_label: str, severity: str, confidence: float, crop: str) -> List[str]:
         """Generate actionable recommendations"""
@@ -0,0 +1,465 @@
+"""
+Price Forecasting
+
+Forecasting engine for the mandi modal price series. A commodity's reports
+are turned into a daily panel with one row per scope (the whole state, each
+district and each market), and every model is fitted to all rows at once
+with NumPy. A rolling-origin backtest scores each model per row (MAE/MAPE),
+the best one is selected, and prediction intervals are sized from its
+backtest residuals. Fits are cached per (commodity, variety) until the
+commodity's data is reloaded, so forecasts are served without refitting.
+
+Models implement ``fit(prices, arrivals) -> params`` and
+``predict(params, horizon) -> (rows, horizon)`` and are passed to
+``ForecastEngine``, so new ones can be plugged in.
+"""
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MAX_HORIZON = 30  # Longest forecast /market/forecast allows
+SEASON = 7  # Weekly market cycle
+MIN_HISTORY = 21  # Days of history needed to fit and backtest
+MIN_OBSERVATIONS = 10  # Reported days needed for a scope to be forecast
+BACKTEST_ORIGINS = 4
+BACKTEST_HORIZON = 7
+INTERVAL_LEVEL = 0.8
+INTERVAL_Z = 1.2816  # Two-sided 80% normal quantile
+
+
+@dataclass
+class PricePanel:
+    """Daily price/arrival matrices, one row per scope"""
+    keys: List[str]  # "all", "district:<name>", "market:<name>"
+    dates: pd.DatetimeIndex
+    prices: np.ndarray  # (rows, days) arrival-weighted modal price, gaps carried forward
+    observed: np.ndarray  # (rows, days) True where the scope reported that day
+    arrivals: np.ndarray  # (rows, days) total arrivals, 0 when not reported
+
+
+def _fill_gaps(values: np.ndarray) -> np.ndarray:
+    """Carry the last reported value forward (and the first one backward) along each row"""
+    observed = ~np.isnan(values)
+    days = np.arange(values.shape[1])
+    last = np.maximum.accumulate(np.where(observed, days, 0), axis=1)
+    filled = np.take_along_axis(values, last, axis=1)
+    first = np.argmax(observed, axis=1)
+    first_value = values[np.arange(len(values)), first]
+    return np.where(np.isnan(filled), first_value[:, None], filled)
+
+
+def build_panel(df: pd.DataFrame, variety: Optional[str] = None) -> Optional[PricePanel]:
+    """Aggregate report rows into state, district and market daily series"""
+    if variety:
+        df = df[df['Variety'].str.lower() == variety.lower()]
+    if len(df) == 0:
+        return None
+
+    start = df['Arrival Date'].min()
+    dates = pd.date_range(start, df['Arrival Date'].max(), freq='D')
+    n_days = len(dates)
+    day = (df['Arrival Date'] - start).dt.days.to_numpy()
+    price = df['Modal Price'].to_numpy(dtype=float)
+    arrival = np.nan_to_num(df['Arrival Quantity'].to_numpy(dtype=float))
+    # Weight prices by arrivals; rows reporting no arrivals still count a little
+    weight = np.where(arrival > 0, arrival, 1e-3)
+    valid = ~np.isnan(price)
+
+    keys, price_rows, arrival_rows = [], [], []
+    levels = [('all', np.zeros(len(df), dtype=np.int64), ['all'])]
+    for column in ('District', 'Market'):
+        codes, names = pd.factorize(df[column])
+        levels.append((column.lower(), codes, [f"{column.lower()}:{name}" for name in names]))
+
+    for _, codes, names in levels:
+        size = len(names) * n_days
+        index = codes * n_days + day
+        weighted = np.bincount(index[valid], weights=(weight * price)[valid], minlength=size)
+        total = np.bincount(index[valid], weights=weight[valid], minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            price_rows.append(np.where(total > 0, weighted / total, np.nan).reshape(-1, n_days))
+        arrival_rows.append(np.bincount(index, weights=arrival, minlength=size).reshape(-1, n_days))
+        keys.extend(names)
+
+    prices = np.vstack(price_rows)
+    return PricePanel(
+        keys=keys,
+        dates=dates,
+        prices=_fill_gaps(prices),
+        observed=~np.isnan(prices),
+        arrivals=np.vstack(arrival_rows)
+    )
+
+
+class ForecastModel(ABC):
+    """Base class: fit all rows of a panel at once, then project any horizon"""
+
+    name = "base"
+
+    @abstractmethod
+    def fit(self, prices: np.ndarray, arrivals: np.ndarray) -> Dict:
+        """Parameters for every row of the (series, days) price panel"""
+
+    @abstractmethod
+    def predict(self, params: Dict, horizon: int) -> np.ndarray:
+        """(series, horizon) forecasts from fitted parameters"""
+
+
+class SeasonalNaive(ForecastModel):
+    """Repeat the last week: price in h days = price on the same weekday last week"""
+
+    name = "seasonal_naive"
+
+    def fit(self, prices, arrivals):
+        return {'last_season': prices[:, -SEASON:].copy()}
+
+    def predict(self, params, horizon):
+        return params['last_season'][:, np.arange(horizon) % SEASON]
+
+
+class ExponentialSmoothing(ForecastModel):
+    """Exponentially weighted level; alpha chosen per row by one-step-ahead error"""
+
+    name = "ewma"
+    alphas = np.array([0.1, 0.2, 0.3, 0.5, 0.7, 0.9])
+
+    def fit(self, prices, arrivals):
+        level = np.repeat(prices[:, :1], len(self.alphas), axis=1)
+        sse = np.zeros_like(level)
+        for t in range(1, prices.shape[1]):
+            error = prices[:, t:t + 1] - level
+            sse += error ** 2
+            level += self.alphas * error
+        best = np.argmin(sse, axis=1)
+        rows = np.arange(len(prices))
+        return {'alpha': self.alphas[best], 'level': level[rows, best]}
+
+    def predict(self, params, horizon):
+        return np.repeat(params['level'][:, None], horizon, axis=1)
+
+
+class HoltWinters(ForecastModel):
+    """Additive level + damped trend + weekly seasonality, parameters from a small grid per row"""
+
+    name = "holt_winters"
+    grid = np.array([
+        (alpha, beta, gamma)
+        for alpha in (0.2, 0.4, 0.7)
+        for beta in (0.02, 0.1)
+        for gamma in (0.05, 0.2)
+    ])
+    phi = 0.9
+
+    def fit(self, prices, arrivals):
+        n_rows, n_days = prices.shape
+        alpha, beta, gamma = (self.grid[:, i] for i in range(3))
+        phi = self.phi
+
+        first, second = prices[:, :SEASON].mean(axis=1), prices[:, SEASON:2 * SEASON].mean(axis=1)
+        level = np.repeat(first[:, None], len(self.grid), axis=1)
+        trend = np.repeat(((second - first) / SEASON)[:, None], len(self.grid), axis=1)
+        season = np.repeat((prices[:, :SEASON] - first[:, None])[:, None, :], len(self.grid), axis=1)
+        sse = np.zeros_like(level)
+
+        for t in range(SEASON, n_days):
+            y = prices[:, t:t + 1]
+            s = season[:, :, t % SEASON]
+            error = y - (level + phi * trend + s)
+            if t >= 2 * SEASON:
+                sse += error ** 2
+            new_level = alpha * (y - s) + (1 - alpha) * (level + phi * trend)
+            trend = beta * (new_level - level) + (1 - beta) * phi * trend
+            season[:, :, t % SEASON] = gamma * (y - new_level) + (1 - gamma) * s
+            level = new_level
+
+        best = np.argmin(sse, axis=1)
+        rows = np.arange(n_rows)
+        return {
+            'alpha_beta_gamma': self.grid[best],
+            'level': level[rows, best],
+            'trend': trend[rows, best],
+            'season': season[rows, best],
+            'last_day': n_days - 1,
+        }
+
+    def predict(self, params, horizon):
+        steps = np.arange(1, horizon + 1)
+        damped = self.phi * (1 - self.phi ** steps) / (1 - self.phi)
+        season_index = (params['last_day'] + steps) % SEASON
+        return (params['level'][:, None] + params['trend'][:, None] * damped
+                + params['season'][:, season_index])
+
+
+def _trailing_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean of the last `window` days (fewer at the start) for every day"""
+    csum = np.cumsum(values, axis=1)
+    shifted = np.zeros_like(csum)
+    shifted[:, window:] = csum[:, :-window]
+    counts = np.minimum(np.arange(1, values.shape[1] + 1), window)
+    return (csum - shifted) / counts
+
+
+class ArrivalsRegression(ForecastModel):
+    """
+    Daily relative price change regressed on supply and momentum, per row
+
+    change(t+1) = c0 + c1 * supply_anomaly(t) + c2 * gap(t), where
+    supply_anomaly is log of 7-day over 28-day mean arrivals (a glut pushes
+    prices down) and gap is the price's distance from its 7-day mean.
+    Forecasts roll forward day by day with the supply anomaly decaying.
+    """
+
+    name = "arrivals_regression"
+    ridge = 1e-3
+    anomaly_decay = 0.8
+    max_daily_change = 0.1
+
+    def _features(self, prices, arrivals):
+        supply = np.log1p(_trailing_mean(arrivals, 7)) - np.log1p(_trailing_mean(arrivals, 28))
+        ma7 = _trailing_mean(prices, 7)
+        gap = (prices - ma7) / np.maximum(ma7, 1e-6)
+        return supply, gap
+
+    def fit(self, prices, arrivals):
+        supply, gap = self._features(prices, arrivals)
+        X = np.stack([np.ones_like(supply), supply, gap], axis=2)[:, :-1]
+        y = np.diff(prices, axis=1) / np.maximum(prices[:, :-1], 1e-6)
+        XtX = np.einsum('rtk,rtl->rkl', X, X) + self.ridge * np.eye(3)
+        Xty = np.einsum('rtk,rt->rk', X, y)
+        coef = np.linalg.solve(XtX, Xty[:, :, None])[:, :, 0]
+        return {'coef': coef, 'supply': supply[:, -1], 'recent': prices[:, -SEASON:].copy()}
+
+    def predict(self, params, horizon):
+        coef, supply = params['coef'], params['supply'].copy()
+        recent = params['recent'].copy()
+        out = np.empty((len(recent), horizon))
+        for step in range(horizon):
+            price = recent[:, -1]
+            ma7 = recent.mean(axis=1)
+            gap = (price - ma7) / np.maximum(ma7, 1e-6)
+            change = coef[:, 0] + coef[:, 1] * supply + coef[:, 2] * gap
+            out[:, step] = price * (1 + np.clip(change, -self.max_daily_change, self.max_daily_change))
+            recent = np.concatenate([recent[:, 1:], out[:, step:step + 1]], axis=1)
+            supply *= self.anomaly_decay
+        return out
+
+
+DEFAULT_MODELS = (SeasonalNaive(), ExponentialSmoothing(), HoltWinters(), ArrivalsRegression())
+
+
+def backtest(
+    model: ForecastModel,
+    panel: PricePanel,
+    origins: int = BACKTEST_ORIGINS,
+    horizon: int = BACKTEST_HORIZON
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rolling-origin backtest: refit on data up to each origin, forecast the next days
+
+    Returns (errors, actuals), each (rows, origins, horizon); errors are
+    actual - forecast on reported days and NaN elsewhere.
+    """
+    n_rows, n_days = panel.prices.shape
+    errors = np.full((n_rows, origins, horizon), np.nan)
+    actuals = np.full_like(errors, np.nan)
+    for i in range(origins):
+        origin = n_days - horizon - i * SEASON
+        if origin < MIN_HISTORY:
+            break
+        params = model.fit(panel.prices[:, :origin], panel.arrivals[:, :origin])
+        forecast = model.predict(params, horizon)
+        actual = np.where(panel.observed[:, origin:origin + horizon], panel.prices[:, origin:origin + horizon], np.nan)
+        errors[:, i] = actual - forecast
+        actuals[:, i] = actual
+    return errors, actuals
+
+
+@dataclass
+class PanelForecast:
+    """Everything needed to serve forecasts for one panel without refitting"""
+    panel: PricePanel
+    model_names: List[str]
+    params: Dict[str, Dict]
+    forecasts: np.ndarray  # (models, rows, MAX_HORIZON)
+    mae: np.ndarray  # (models, rows)
+    mape: np.ndarray  # (models, rows)
+    sigma: np.ndarray  # (models, rows) relative one-day residual scale
+    best: np.ndarray  # (rows,) index into model_names
+    fitted_at: str
+
+
+def fit_panel(panel: PricePanel, models: Sequence[ForecastModel]) -> PanelForecast:
+    """Fit, backtest and select a model for every row of the panel"""
+    n_models, n_rows = len(models), len(panel.keys)
+    forecasts = np.empty((n_models, n_rows, MAX_HORIZON))
+    mae = np.full((n_models, n_rows), np.nan)
+    mape = np.full_like(mae, np.nan)
+    sigma = np.full_like(mae, np.nan)
+    params = {}
+    steps = np.arange(1, BACKTEST_HORIZON + 1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for m, model in enumerate(models):
+            params[model.name] = model.fit(panel.prices, panel.arrivals)
+            forecasts[m] = model.predict(params[model.name], MAX_HORIZON)
+
+            errors, actuals = backtest(model, panel)
+            counts = np.sum(~np.isnan(errors), axis=(1, 2))
+            has_errors = counts > 0
+            relative = errors / actuals
+            mae[m, has_errors] = np.nanmean(np.abs(errors[has_errors]), axis=(1, 2))
+            mape[m, has_errors] = np.nanmean(np.abs(relative[has_errors]), axis=(1, 2)) * 100
+
+            # Relative errors grow roughly with sqrt(horizon): sigma_h = sigma * sqrt(h)
+            scaled = relative ** 2 / steps
+            pooled = np.sqrt(np.nanmean(scaled)) if has_errors.any() else 0.05
+            row_sigma = np.sqrt(np.nanmean(scaled[has_errors], axis=(1, 2)))
+            sigma[m] = pooled
+            # Rows with few residuals use the model's pooled scale
+            enough = counts[has_errors] >= 5
+            sigma[m, np.flatnonzero(has_errors)[enough]] = row_sigma[enough]
+
+    # Best backtest MAPE per row; rows with no backtest use the best model overall
+    scored = ~np.isnan(mape)
+    scores = np.where(scored, mape, np.inf)
+    model_mape = np.where(scored.any(axis=1), np.where(scored, mape, 0).sum(axis=1) / np.maximum(scored.sum(axis=1), 1), np.inf)
+    overall = int(np.argmin(model_mape))
+    best = np.where(scored.any(axis=0), np.argmin(scores, axis=0), overall)
+
+    return PanelForecast(
+        panel=panel,
+        model_names=[model.name for model in models],
+        params=params,
+        forecasts=forecasts,
+        mae=mae,
+        mape=mape,
+        sigma=sigma,
+        best=best,
+        fitted_at=datetime.now().isoformat()
+    )
+
+
+class ForecastEngine:
+    """Cached panel fits per (commodity, variety), refitted when the data frame changes"""
+
+    def __init__(self, models: Optional[Sequence[ForecastModel]] = None):
+        self.models = list(models or DEFAULT_MODELS)
+        self._fits: Dict[Tuple[str, Optional[str]], Tuple[pd.DataFrame, Optional[PanelForecast]]] = {}
+        self._lock = threading.Lock()
+        self.fit_count = 0
+
+    def get_fit(self, commodity: str, df: pd.DataFrame, variety: Optional[str] = None) -> Optional[PanelForecast]:
+        """Cached fit for the commodity (and variety), fitting it if the data changed"""
+        key = (commodity, variety.lower() if variety else None)
+        with self._lock:
+            cached = self._fits.get(key)
+            if cached is not None and cached[0] is df:
+                return cached[1]
+
+            panel = build_panel(df, variety)
+            fit = None
+            if panel is not None and len(panel.dates) >= MIN_HISTORY:
+                fit = fit_panel(panel, self.models)
+                self.fit_count += 1
+                logger.info(f"Fitted {len(self.models)} forecast models to {len(panel.keys)} {commodity} series")
+            self._fits[key] = (df, fit)
+            return fit
+
+    @staticmethod
+    def _row(fit: PanelForecast, district: Optional[str], market: Optional[str]) -> Optional[int]:
+        if market:
+            wanted = f"market:{market}".lower()
+        elif district:
+            wanted = f"district:{district}".lower()
+        else:
+            wanted = "all"
+        for index, key in enumerate(fit.panel.keys):
+            if key.lower() == wanted:
+                return index
+        return None
+
+    def forecast(
+        self,
+        commodity: str,
+        df: pd.DataFrame,
+        days: int = 7,
+        district: Optional[str] = None,
+        market: Optional[str] = None,
+        variety: Optional[str] = None
+    ) -> Dict:
+        """Forecast for one scope from the cached fit"""
+        days = max(1, min(days, MAX_HORIZON))
+        fit = self.get_fit(commodity, df, variety)
+        if fit is None:
+            return {'error': 'Insufficient data for forecasting'}
+
+        row = self._row(fit, district, market)
+        if row is None:
+            scope = market or district
+            return {'error': f"No {commodity} data for {scope}" + (f" ({variety})" if variety else "")}
+        if fit.panel.observed[row].sum() < MIN_OBSERVATIONS:
+            return {'error': 'Insufficient data for forecasting'}
+
+        panel = fit.panel
+        m = int(fit.best[row])
+        predicted = fit.forecasts[m, row, :days]
+        spread = INTERVAL_Z * fit.sigma[m, row] * np.sqrt(np.arange(1, days + 1))
+        last_date = panel.dates[-1]
+
+        forecast = [
+            {
+                'date': (last_date + pd.Timedelta(days=i + 1)).strftime('%Y-%m-%d'),
+                'predicted_price': round(float(price), 2),
+                'lower_bound': round(float(price * max(0.0, 1 - width)), 2),
+                'upper_bound': round(float(price * (1 + width)), 2)
+            }
+            for i, (price, width) in enumerate(zip(predicted, spread))
+        ]
+
+        # Trend over the last week of the scope's daily series
+        history = panel.prices[row]
+        trend_slope = float(np.polyfit(np.arange(7), history[-7:], 1)[0])
+        if trend_slope > 50:
+            direction = 'rising'
+        elif trend_slope < -50:
+            direction = 'falling'
+        else:
+            direction = 'stable'
+
+        observed_days = np.flatnonzero(panel.observed[row])
+        return {
+            'commodity': commodity,
+            'scope': {'district': district, 'market': market, 'variety': variety},
+            'current_price': round(float(history[observed_days[-1]]), 2),
+            'data_through': panel.dates[observed_days[-1]].strftime('%Y-%m-%d'),
+            'forecast': forecast,
+            'trend': {
+                'direction': direction,
+                'slope': trend_slope,
+                'ma_7': float(history[-7:].mean()),
+                'ma_14': float(history[-14:].mean())
+            },
+            'model': fit.model_names[m],
+            'interval_level': INTERVAL_LEVEL,
+            'backtest': {
+                name: {
+                    'mae': None if np.isnan(fit.mae[i, row]) else round(float(fit.mae[i, row]), 2),
+                    'mape': None if np.isnan(fit.mape[i, row]) else round(float(fit.mape[i, row]), 2)
+                }
+                for i, name in enumerate(fit.model_names)
+            },
+            'fitted_at': fit.fitted_at,
+            'last_updated': datetime.now().isoformat()
+        }
+
+    def stats(self) -> Dict:
+        return {'cached_fits': len(self._fits), 'fits': self.fit_count, 'models': [m.name for m in self.models]}
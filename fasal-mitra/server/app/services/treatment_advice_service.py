@@ -0,0 +1,231 @@
+"""
+Treatment Advice Service
+
+LLM (Gemini) treatment advice for detected diseases, decoupled from the
+detection itself. Advice depends only on (disease, crop, severity, coarse
+location), so it is cached under that key:
+
+- in memory for the running process, and
+- in a small SQLite file that survives restarts and is shared by workers.
+
+Concurrent requests for the same key share one in-flight LLM call, and
+detection can start the call in the background and return immediately
+(clients pick the advice up with GET /disease/advice).
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+from app.config import settings
+from app.core.result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+try:
+    import google.generativeai as genai
+    GEMINI_AVAILABLE = True
+except ImportError:
+    GEMINI_AVAILABLE = False
+
+
+def coarse_location(location: Optional[str]) -> str:
+    """State/region-level location ("Pune, Maharashtra" -> "maharashtra")"""
+    if not location:
+        return "unknown"
+    parts = [part.strip() for part in location.split(',') if part.strip()]
+    return " ".join(parts[-1].lower().split()) if parts else "unknown"
+
+
+def advice_key(disease_name: str, crop: str, severity: str, location: Optional[str]) -> str:
+    """Cache key for one piece of advice"""
+    return "|".join([disease_name.lower(), crop.lower(), severity.lower(), coarse_location(location)])
+
+
+class AdviceStore:
+    """Persistent key -> advice text table with a TTL"""
+
+    def __init__(self, path: Path, ttl_seconds: float):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS advice "
+                "(key TEXT PRIMARY KEY, advice TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT advice FROM advice WHERE key = ? AND created_at > ?",
+                (key, time.time() - self.ttl_seconds)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, advice: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO advice (key, advice, created_at) VALUES (?, ?, ?)",
+                (key, advice, time.time())
+            )
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM advice").fetchone()[0]
+
+
+class TreatmentAdviceService:
+    """Cached, single-flight LLM treatment advice"""
+
+    def __init__(self, store_path: Path = None):
+        self.memory = ResultCache(
+            "llm_advice",
+            max_entries=settings.DISEASE_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_ADVICE_TTL
+        )
+        self.store = AdviceStore(store_path or settings.LLM_ADVICE_CACHE_PATH, settings.LLM_ADVICE_TTL)
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._model = None
+        self.llm_calls = 0
+        self.coalesced = 0
+
+    def is_enabled(self) -> bool:
+        """Whether advice can be generated at all (Gemini installed and API key set)"""
+        return GEMINI_AVAILABLE and bool(settings.GEMINI_API_KEY)
+
+    async def get_cached(self, key: str) -> Optional[str]:
+        """Advice from memory or the persistent store, without calling the LLM"""
+        advice = self.memory.get(key)
+        if advice is None:
+            # SQLite read off the event loop, as the write in _generate is
+            advice = await asyncio.to_thread(self.store.get, key)
+            if advice is not None:
+                self.memory.put(key, advice)
+        return advice
+
+    async def get_advice(self, disease_name: str, crop: str, severity: str, location: Optional[str]) -> Optional[str]:
+        """
+        Advice for a diagnosis, generating it if needed.
+
+        Returns None when the LLM is not configured or the call fails.
+        """
+        key = advice_key(disease_name, crop, severity, location)
+        advice = await self.get_cached(key)
+        if advice is not None:
+            return advice
+        task = self._start(key, disease_name, crop, severity, location)
+        if task is None:
+            return None
+        # Shield so one caller disconnecting doesn't cancel the shared call
+        return await asyncio.shield(task)
+
+    async def prefetch(self, disease_name: str, crop: str, severity: str, location: Optional[str]) -> Optional[str]:
+        """
+        Cached advice if available; otherwise start generating it in the
+        background and return None (the result lands in the cache).
+        Only waits for the cache lookup, never for the LLM.
+        """
+        key = advice_key(disease_name, crop, severity, location)
+        advice = await self.get_cached(key)
+        if advice is None:
+            self._start(key, disease_name, crop, severity, location)
+        return advice
+
+    def _start(self, key: str, disease_name: str, crop: str, severity: str, location: Optional[str]) -> Optional[asyncio.Task]:
+        """In-flight generation task for key, creating it if needed"""
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+        if not self.is_enabled():
+            logger.debug("GEMINI_API_KEY not set, skipping LLM advice")
+            return None
+        task = asyncio.get_running_loop().create_task(
+            self._generate(key, disease_name, crop, severity, location)
+        )
+        self._in_flight[key] = task
+        return task
+
+    async def _generate(self, key: str, disease_name: str, crop: str, severity: str, location: Optional[str]) -> Optional[str]:
+        try:
+            self.llm_calls += 1
+            advice = await asyncio.wait_for(
+                self._call_llm(disease_name, crop, severity, location),
+                timeout=settings.LLM_ADVICE_TIMEOUT
+            )
+            if advice:
+                self.memory.put(key, advice)
+                await asyncio.to_thread(self.store.put, key, advice)
+                logger.info("✅ LLM advice generated successfully")
+            return advice
+        except Exception as e:
+            logger.warning(f"Could not generate LLM advice: {e}")
+            return None
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def _call_llm(self, disease_name: str, crop: str, severity: str, location: Optional[str]) -> Optional[str]:
+        """Ask Gemini for farmer-friendly treatment advice"""
+        if self._model is None:
+            genai.configure(api_key=settings.GEMINI_API_KEY)
+            self._model = genai.GenerativeModel('gemini-pro')
+
+        region = coarse_location(location)
+        prompt = f"""You are an expert agricultural advisor helping farmers.
+
+Disease Detected: {disease_name}
+Crop: {crop}
+Location: {region.title() if region != "unknown" else "Unknown"}
+Severity: {severity}
+
+Provide practical, farmer-friendly advice in simple language with these sections:
+1. IMMEDIATE ACTIONS (next 24-48 hours)
+2. ORGANIC TREATMENTS (natural, low-cost options)
+3. CHEMICAL TREATMENTS (if necessary, with safety warnings)
+4. PREVENTION (for future crops)
+5. WHEN TO CONSULT EXPERT
+
+IMPORTANT GUIDELINES:
+- Use simple language (5th grade reading level)
+- Focus on SAFE, affordable, locally-available treatments
+- Include safety warnings for chemical treatments
+- Suggest consulting local agricultural extension officer for serious cases
+- DO NOT recommend specific dosages unless you're certain they're safe
+- Prioritize organic/natural solutions first
+
+Keep response concise (under 300 words) and actionable."""
+
+        # Async call: the Gemini round trip must not block the event loop
+        response = await self._model.generate_content_async(prompt)
+        return response.text
+
+    def stats(self) -> Dict:
+        """Cache and LLM call counters for the health endpoint"""
+        return {
+            **self.memory.stats(),
+            "persisted_entries": self.store.count(),
+            "in_flight": len(self._in_flight),
+            "llm_calls": self.llm_calls,
+            "coalesced": self.coalesced
+        }
+
+
+# Singleton instance
+_treatment_advice_service = None
+
+
+def get_treatment_advice_service() -> TreatmentAdviceService:
+    """Get or create treatment advice service instance"""
+    global _treatment_advice_service
+    if _treatment_advice_service is None:
+        _treatment_advice_service = TreatmentAdviceService()
+    return _treatment_advice_service
@@ -2,14 +2,25 @@
 Weather Service API
 
 Ports logic from src/features/weather_service.py
+
+All Open-Meteo calls go through one shared httpx.AsyncClient (connection
+pooling + keep-alive), so a slow upstream response only delays its own
+request instead of blocking the event loop.
+
+Upstream responses are cached per spatial tile (see app.core.tile_cache):
+nearby coordinates within the TTL reuse one call, queried at the tile centre.
 """
 
-import requests
+import asyncio
+import httpx
 from typing import Dict, List, Optional
 from datetime import datetime
 import logging
 from functools import lru_cache
 
+from app.config import settings
+from app.core.tile_cache import TileCache, tile_for, tile_center
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,7 +30,24 @@ class WeatherServiceAPI:
     def __init__(self):
         self.base_url = "https://api.open-meteo.com/v1/forecast"
         self.geocoding_url = "https://geocoding-api.open-meteo.com/v1/reverse"
-        self.timeout = 15
+        self.timeout = httpx.Timeout(
+            settings.WEATHER_READ_TIMEOUT,
+            connect=settings.WEATHER_CONNECT_TIMEOUT
+        )
+        self.limits = httpx.Limits(
+            max_connections=settings.WEATHER_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.WEATHER_MAX_KEEPALIVE
+        )
+        
+        # Shared client, created lazily on the running event loop
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Per-tile caches: current conditions change fastest, place names practically never
+        self.tile_size = settings.WEATHER_TILE_SIZE_DEG
+        self.current_cache = TileCache("weather_current", settings.WEATHER_CURRENT_TTL)
+        self.forecast_cache = TileCache("weather_forecast", settings.WEATHER_FORECAST_TTL)
+        self.geocode_cache = TileCache("reverse_geocode", settings.GEOCODE_TTL)
         
         # WMO Weather codes mapping
         self.weather_codes = {
@@ -35,12 +63,59 @@ class WeatherServiceAPI:
             95: "Thunderstorm", 96: "Thunderstorm with slight hail", 99: "Thunderstorm with heavy hail"
         }
     
+    def _get_client(self) -> httpx.AsyncClient:
+        """Pooled client bound to the current event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            # A client cannot be reused across event loops (e.g. asyncio.run in scripts)
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+            self._client_loop = loop
+        return self._client
+    
+    async def _get(self, url: str, params: Dict) -> httpx.Response:
+        """GET through the shared client"""
+        return await self._get_client().get(url, params=params)
+    
+    async def _get_tile_json(
+        self,
+        cache: TileCache,
+        url: str,
+        latitude: float,
+        longitude: float,
+        params: Dict,
+        error_label: str,
+        key_extra: tuple = ()
+    ) -> Dict:
+        """Upstream JSON for the tile containing (latitude, longitude), cached"""
+        tile = tile_for(latitude, longitude, self.tile_size)
+        
+        async def fetch():
+            tile_lat, tile_lon = tile_center(tile, self.tile_size)
+            response = await self._get(url, {'latitude': tile_lat, 'longitude': tile_lon, **params})
+            if response.status_code != 200:
+                raise Exception(f"{error_label}: {response.status_code}")
+            return response.json()
+        
+        return await cache.get_or_fetch((tile, *key_extra), fetch)
+    
+    def cache_stats(self) -> Dict:
+        """Hit/miss statistics for the weather and geocoding caches"""
+        return {
+            "tile_size_deg": self.tile_size,
+            "caches": [cache.stats() for cache in (self.current_cache, self.forecast_cache, self.geocode_cache)]
+        }
+    
+    async def close(self):
+        """Close the shared HTTP client (called on app shutdown)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+    
     async def get_current_weather(self, latitude: float, longitude: float) -> Dict:
         """Get current weather conditions"""
         try:
             params = {
-                'latitude': latitude,
-                'longitude': longitude,
                 'current': [
                     'temperature_2m',
                     'relative_humidity_2m',
@@ -51,36 +126,35 @@ class WeatherServiceAPI:
                 'timezone': 'auto'
             }
             
-            response = requests.get(
-                self.base_url,
-                params=params,
-                timeout=self.timeout
+            # Weather and reverse geocoding in parallel
+            data, location = await asyncio.gather(
+                self._get_tile_json(
+                    self.current_cache, self.base_url, latitude, longitude, params,
+                    error_label="Weather API error"
+                ),
+                self.get_location_name(latitude, longitude)
             )
             
-            if response.status_code == 200:
-                data = response.json()
-                current = data.get('current', {})
-                
-                weather_code = current.get('weather_code', 0)
-                location_name = self.get_location_name(latitude, longitude).get('location_name', 'Unknown')
-                
-                result = {
-                    'latitude': latitude,
-                    'longitude': longitude,
-                    'location_name': location_name,
-                    'temperature': current.get('temperature_2m', 0),
-                    'humidity': current.get('relative_humidity_2m', 0),
-                    'wind_speed': current.get('wind_speed_10m', 0),
-                    'precipitation': current.get('precipitation', 0),
-                    'weather_code': weather_code,
-                    'weather_description': self.weather_codes.get(weather_code, 'Unknown'),
-                    'observation_time': datetime.fromisoformat(current.get('time', datetime.now().isoformat())),
-                    'recommendations': self._generate_weather_recommendations(current)
-                }
-                
-                return result
-            else:
-                raise Exception(f"Weather API error: {response.status_code}")
+            current = data.get('current', {})
+            
+            weather_code = current.get('weather_code', 0)
+            location_name = location.get('location_name', 'Unknown')
+            
+            result = {
+                'latitude': latitude,
+                'longitude': longitude,
+                'location_name': location_name,
+                'temperature': current.get('temperature_2m', 0),
+                'humidity': current.get('relative_humidity_2m', 0),
+                'wind_speed': current.get('wind_speed_10m', 0),
+                'precipitation': current.get('precipitation', 0),
+                'weather_code': weather_code,
+                'weather_description': self.weather_codes.get(weather_code, 'Unknown'),
+                'observation_time': datetime.fromisoformat(current.get('time', datetime.now().isoformat())),
+                'recommendations': self._generate_weather_recommendations(current)
+            }
+            
+            return result
         
         except Exception as e:
             logger.error(f"Error fetching current weather: {str(e)}")
@@ -89,9 +163,8 @@ class WeatherServiceAPI:
     async def get_forecast(self, latitude: float, longitude: float, days: int = 7) -> Dict:
         """Get weather forecast"""
         try:
+            forecast_days = min(days, 16)
             params = {
-                'latitude': latitude,
-                'longitude': longitude,
                 'daily': [
                     'temperature_2m_max',
                     'temperature_2m_min',
@@ -100,80 +173,69 @@ class WeatherServiceAPI:
                     'weather_code'
                 ],
                 'timezone': 'auto',
-                'forecast_days': min(days, 16)
+                'forecast_days': forecast_days
             }
             
-            response = requests.get(
-                self.base_url,
-                params=params,
-                timeout=self.timeout
+            # Forecast and reverse geocoding in parallel
+            data, location = await asyncio.gather(
+                self._get_tile_json(
+                    self.forecast_cache, self.base_url, latitude, longitude, params,
+                    error_label="Forecast API error", key_extra=(forecast_days,)
+                ),
+                self.get_location_name(latitude, longitude)
             )
             
-            if response.status_code == 200:
-                data = response.json()
-                daily = data.get('daily', {})
-                
-                forecast = []
-                for i in range(len(daily.get('time', []))):
-                    weather_code = daily['weather_code'][i]
-                    forecast.append({
-                        'date': daily['time'][i],
-                        'temp_max': daily['temperature_2m_max'][i],
-                        'temp_min': daily['temperature_2m_min'][i],
-                        'precipitation_sum': daily['precipitation_sum'][i],
-                        'wind_speed_max': daily['wind_speed_10m_max'][i],
-                        'weather_code': weather_code,
-                        'weather_description': self.weather_codes.get(weather_code, 'Unknown')
-                    })
-                
-                location_name = self.get_location_name(latitude, longitude).get('location_name', 'Unknown')
-                
-                result = {
-                    'latitude': latitude,
-                    'longitude': longitude,
-                    'location_name': location_name,
-                    'forecast': forecast,
-                    'farming_recommendations': self._generate_farming_recommendations(forecast),
-                    'alerts': self._generate_alerts(forecast)
-                }
-                
-                return result
-            else:
-                raise Exception(f"Forecast API error: {response.status_code}")
+            daily = data.get('daily', {})
+            
+            forecast = []
+            for i in range(len(daily.get('time', []))):
+                weather_code = daily['weather_code'][i]
+                forecast.append({
+                    'date': daily['time'][i],
+                    'temp_max': daily['temperature_2m_max'][i],
+                    'temp_min': daily['temperature_2m_min'][i],
+                    'precipitation_sum': daily['precipitation_sum'][i],
+                    'wind_speed_max': daily['wind_speed_10m_max'][i],
+                    'weather_code': weather_code,
+                    'weather_description': self.weather_codes.get(weather_code, 'Unknown')
+                })
+            
+            location_name = location.get('location_name', 'Unknown')
+            
+            result = {
+                'latitude': latitude,
+                'longitude': longitude,
+                'location_name': location_name,
+                'forecast': forecast,
+                'farming_recommendations': self._generate_farming_recommendations(forecast),
+                'alerts': self._generate_alerts(forecast)
+            }
+            
+            return result
         
         except Exception as e:
             logger.error(f"Error fetching forecast: {str(e)}")
             raise
     
-    def get_location_name(self, latitude: float, longitude: float) -> Dict:
+    async def get_location_name(self, latitude: float, longitude: float) -> Dict:
         """Get location name from coordinates (reverse geocoding)"""
         try:
-            params = {
-                'latitude': latitude,
-                'longitude': longitude,
-                'format': 'json'
-            }
-            
-            response = requests.get(
-                self.geocoding_url,
-                params=params,
-                timeout=self.timeout
+            data = await self._get_tile_json(
+                self.geocode_cache, self.geocoding_url, latitude, longitude, {'format': 'json'},
+                error_label="Geocoding API error"
             )
+            results = data.get('results', [])
             
-            if response.status_code == 200:
-                data = response.json()
-                results = data.get('results', [])
-                
-                if results:
-                    location = results[0]
-                    return {
-                        'latitude': latitude,
-                        'longitude': longitude,
-                        'location_name': location.get('name', 'Unknown'),
-                        'country': location.get('country', None),
-                        'state': location.get('admin1', None),
-                        'district': location.get('admin2', None)
-                    }
+            if results:
+                location = results[0]
+                return {
+                    'latitude': latitude,
+                    'longitude': longitude,
+                    'location_name': location.get('name', 'Unknown'),
+                    'country': location.get('country', None),
+                    'state': location.get('admin1', None),
+                    'district': location.get('admin2', None)
+                }
             
             return {
                 'latitude': latitude,
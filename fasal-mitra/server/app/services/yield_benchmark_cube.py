@@ -0,0 +1,86 @@
+"""
+Yield Benchmark Cube
+
+Materialized yield benchmarks for every (crop, state, season) and
+(crop, state) combination in the historical crop data. Built once when the
+yield service starts, so the benchmark and gap-analysis endpoints read
+precomputed statistics instead of filtering and re-aggregating the data on
+every request.
+
+Each entry keeps the yields sorted, so a percentile rank is a binary search.
+Keys are case-normalized to match DataLoader.filter_data.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Yield percentile that marks a record as a top performer
+TOP_PERFORMER_PERCENTILE = 80
+
+
+def _benchmark_entry(group: pd.DataFrame) -> Dict:
+    """Benchmarks for one slice of the crop data (rows in original order)"""
+    yields = group['yield'].to_numpy()
+
+    threshold = np.percentile(yields, TOP_PERFORMER_PERCENTILE)
+    top_performers = group[group['yield'] >= threshold]
+
+    return {
+        'total_records': len(group),
+        'year_min': group['year'].min(),
+        'year_max': group['year'].max(),
+        'average_yield': np.mean(yields),
+        'median_yield': np.median(yields),
+        'top_10_percent': np.percentile(yields, 90),
+        'top_25_percent': np.percentile(yields, 75),
+        'max_yield_achieved': np.max(yields),
+        'yield_std': np.std(yields),
+        'sorted_yields': np.sort(yields),
+        'top_performers': {
+            'avg_fertilizer': round(top_performers['fertilizer'].mean(), 0) if 'fertilizer' in top_performers.columns else None,
+            'avg_area': round(top_performers['area'].mean(), 2) if 'area' in top_performers.columns else None,
+            'count': len(top_performers)
+        }
+    }
+
+
+class YieldBenchmarkCube:
+    """(crop, state[, season]) -> precomputed yield benchmarks"""
+
+    def __init__(self, crop_data: Optional[pd.DataFrame]):
+        self._entries: Dict[Tuple[str, str, Optional[str]], Dict] = {}
+
+        if crop_data is None or crop_data.empty:
+            return
+
+        keys = pd.DataFrame({
+            col: crop_data[col].str.lower() for col in ('crop', 'state', 'season')
+        })
+
+        # groupby().indices gives ascending row positions per group
+        for (crop, state, season), rows in keys.groupby(['crop', 'state', 'season'], sort=False).indices.items():
+            self._entries[(crop, state, season)] = _benchmark_entry(crop_data.iloc[rows])
+
+        for (crop, state), rows in keys.groupby(['crop', 'state'], sort=False).indices.items():
+            self._entries[(crop, state, None)] = _benchmark_entry(crop_data.iloc[rows])
+
+        logger.info(f"Built yield benchmark cube: {len(self._entries):,} crop/state(/season) entries")
+
+    def get(self, crop: str, state: str, season: Optional[str] = None) -> Optional[Dict]:
+        """Benchmarks for a crop in a state (optionally one season), or None if no data"""
+        key = (crop.lower(), state.lower(), season.lower() if season else None)
+        return self._entries.get(key)
+
+    def percentile_rank(self, value: float, crop: str, state: str, season: Optional[str] = None) -> Optional[float]:
+        """Percentage of historical yields below value, or None if no data"""
+        entry = self.get(crop, state, season)
+        if entry is None:
+            return None
+
+        sorted_yields = entry['sorted_yields']
+        below = np.searchsorted(sorted_yields, value, side='left')
+        return below / len(sorted_yields) * 100
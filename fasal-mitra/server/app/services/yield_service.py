@@ -4,6 +4,7 @@ Yield Prediction Service
 Ports logic from src/features/yield_gap_analyzer.py and multi_scenario_predictor.py
 """
 
+import asyncio
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -15,7 +16,10 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
 
+from app.config import settings
 from app.core.data_loader import DataLoader, get_data_loader
+from app.core.model_store import ModelArtifactStore, fingerprint_training_data
+from app.services.yield_benchmark_cube import YieldBenchmarkCube
 from app.models.yield_models import (
     YieldPredictionRequest,
     YieldGapRequest,
@@ -28,114 +32,114 @@ logger = logging.getLogger(__name__)
 class YieldPredictionService:
     """Yield prediction and gap analysis service"""
     
+    # Features and hyperparameters; part of the artifact fingerprint
+    CATEGORICAL_FEATURES = ['crop', 'state', 'season']
+    NUMERICAL_FEATURES = ['area', 'fertilizer', 'pesticide', 'avg_temp_c',
+                          'total_rainfall_mm', 'avg_humidity_percent', 'N', 'P', 'K', 'pH']
+    MODEL_PARAMS = {
+        'n_estimators': 100,
+        'max_depth': 15,
+        'min_samples_split': 5,
+        'random_state': 42
+    }
+    
     def __init__(self, data_loader: DataLoader):
         self.data_loader = data_loader
         self.model: Optional[RandomForestRegressor] = None
         self.label_encoders = {}
         self.feature_columns = []
+        self.category_codes: Dict[str, Dict[str, int]] = {}
         self.is_trained = False
         
         # Load datasets if not loaded
         if data_loader.crop_data is None:
             data_loader.load_datasets()
         
-        # Train model on initialization
+        # Benchmarks for every crop/state(/season), served from memory
+        self.benchmark_cube = YieldBenchmarkCube(data_loader.crop_data)
+        
+        # Load the persisted model (or train it once if the data changed)
         self._train_model()
     
     def _train_model(self):
-        """Train the yield prediction model"""
+        """Load the yield prediction model from the artifact store, training it if needed"""
         try:
-            logger.info("Training yield prediction model...")
-            
             # Merge datasets if needed
             if self.data_loader.merged_data is None:
                 self.data_loader.merge_datasets()
             
             data = self.data_loader.merged_data.dropna()
+            feature_columns = self.CATEGORICAL_FEATURES + self.NUMERICAL_FEATURES
             
-            # Define features
-            categorical_features = ['crop', 'state', 'season']
-            numerical_features = ['area', 'fertilizer', 'pesticide', 'avg_temp_c', 
-                                'total_rainfall_mm', 'avg_humidity_percent', 'N', 'P', 'K', 'pH']
-            
-            self.feature_columns = categorical_features + numerical_features
-            
-            # Prepare features
-            X = data[self.feature_columns].copy()
-            y = data['yield'].values
-            
-            # Encode categorical variables
-            for col in categorical_features:
-                le = LabelEncoder()
-                X[col] = le.fit_transform(X[col].astype(str))
-                self.label_encoders[col] = le
-            
-            # Train model
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-            
-            self.model = RandomForestRegressor(
-                n_estimators=100,
-                max_depth=15,
-                min_samples_split=5,
-                random_state=42,
-                n_jobs=-1
+            fingerprint = fingerprint_training_data(
+                data[feature_columns + ['yield']],
+                {'features': feature_columns, 'model': self.MODEL_PARAMS, 'test_size': 0.2}
+            )
+            store = ModelArtifactStore(settings.MODEL_ARTIFACT_DIR)
+            payload = store.load_or_train(
+                "yield_model",
+                fingerprint,
+                lambda: self._fit_model(data, feature_columns)
             )
             
-            self.model.fit(X_train, y_train)
-            
-            # Evaluate
-            train_score = self.model.score(X_train, y_train)
-            test_score = self.model.score(X_test, y_test)
-            
-            logger.info(f"✅ Model trained - Train R²: {train_score:.3f}, Test R²: {test_score:.3f}")
+            self.model = payload['model']
+            self.label_encoders = payload['label_encoders']
+            self.feature_columns = payload['feature_columns']
+            # Label -> code lookup for vectorized encoding of batches
+            self.category_codes = {
+                col: {label: code for code, label in enumerate(le.classes_)}
+                for col, le in self.label_encoders.items()
+            }
             self.is_trained = True
         
         except Exception as e:
             logger.error(f"Error training model: {str(e)}")
             self.is_trained = False
     
+    def _fit_model(self, data: pd.DataFrame, feature_columns: List[str]):
+        """Fit the random forest; returns (artifact payload, metrics)"""
+        logger.info("Training yield prediction model...")
+        
+        # Prepare features
+        X = data[feature_columns].copy()
+        y = data['yield'].values
+        
+        # Encode categorical variables
+        label_encoders = {}
+        for col in self.CATEGORICAL_FEATURES:
+            le = LabelEncoder()
+            X[col] = le.fit_transform(X[col].astype(str))
+            label_encoders[col] = le
+        
+        # Train model
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        
+        model = RandomForestRegressor(**self.MODEL_PARAMS, n_jobs=-1)
+        model.fit(X_train, y_train)
+        
+        # Evaluate
+        train_score = model.score(X_train, y_train)
+        test_score = model.score(X_test, y_test)
+        
+        logger.info(f"✅ Model trained - Train R²: {train_score:.3f}, Test R²: {test_score:.3f}")
+        
+        payload = {
+            'model': model,
+            'label_encoders': label_encoders,
+            'feature_columns': feature_columns
+        }
+        return payload, {'train_r2': round(train_score, 4), 'test_r2': round(test_score, 4)}
+    
     async def predict_yield(self, request: YieldPredictionRequest) -> Dict:
         """Predict crop yield"""
         if not self.is_trained:
             raise ValueError("Model not trained")
         
         try:
-            # Prepare input
-            input_data = {
-                'crop': request.crop,
-                'state': request.state,
-                'season': request.season,
-                'area': request.area,
-                'fertilizer': request.fertilizer,
-                'pesticide': request.pesticide
-            }
-            
-            # Get default weather values if not provided
-            if request.avg_temp_c is None or request.total_rainfall_mm is None or request.avg_humidity_percent is None:
-                defaults = self._get_weather_defaults(request.state)
-                input_data.update({
-                    'avg_temp_c': request.avg_temp_c or defaults['temp'],
-                    'total_rainfall_mm': request.total_rainfall_mm or defaults['rainfall'],
-                    'avg_humidity_percent': request.avg_humidity_percent or defaults['humidity']
-                })
-            else:
-                input_data.update({
-                    'avg_temp_c': request.avg_temp_c,
-                    'total_rainfall_mm': request.total_rainfall_mm,
-                    'avg_humidity_percent': request.avg_humidity_percent
-                })
-            
-            # Get soil data
-            soil_data = self.data_loader.get_soil_data_for_state(request.state)
-            if soil_data:
-                input_data.update({
-                    'N': soil_data.get('N', 50),
-                    'P': soil_data.get('P', 25),
-                    'K': soil_data.get('K', 30),
-                    'pH': soil_data.get('pH', 6.5)
-                })
-            else:
-                input_data.update({'N': 50, 'P': 25, 'K': 30, 'pH': 6.5})
+            input_data = self._build_input_row(
+                request,
+                soil_data=self.data_loader.get_soil_data_for_state(request.state)
+            )
             
             # Encode and predict
             X = pd.DataFrame([input_data])
@@ -146,7 +150,7 @@ class YieldPredictionService:
             prediction = self.model.predict(X)[0]
             
             # Calculate confidence interval (using model's tree predictions)
-            tree_predictions = np.array([tree.predict(X)[0] for tree in self.model.estimators_])
+            tree_predictions = self._tree_prediction_matrix(X)[:, 0]
             lower_bound = np.percentile(tree_predictions, 10)
             upper_bound = np.percentile(tree_predictions, 90)
             
@@ -173,6 +177,133 @@ class YieldPredictionService:
             logger.error(f"Error in yield prediction: {str(e)}")
             raise
     
+    async def predict_yield_batch(self, requests: List[YieldPredictionRequest]) -> Dict:
+        """
+        Predict yields for many farms in one call.
+        
+        All rows are encoded together and every tree in the forest is
+        evaluated once over the whole batch, giving a (n_trees, n_rows)
+        matrix from which point estimates and 10th/90th percentile
+        intervals are taken. Rows with a crop/state/season the model has
+        never seen are reported individually instead of failing the batch.
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained")
+        
+        # Tree evaluation is CPU-bound; keep it off the event loop
+        loop = asyncio.get_running_loop()
+        predictions = await loop.run_in_executor(None, self._predict_batch, requests)
+        
+        return {
+            "prediction_id": str(uuid.uuid4()),
+            "timestamp": datetime.now(),
+            "total": len(requests),
+            "succeeded": sum(1 for p in predictions if p.get("error") is None),
+            "predictions": predictions,
+            "factors_affecting": self._get_important_factors(),
+            "model_confidence": 0.85
+        }
+    
+    def _predict_batch(self, requests: List[YieldPredictionRequest]) -> List[Dict]:
+        """Vectorized prediction for a list of requests"""
+        # Weather defaults and soil profiles are per state - look each up once
+        states = {r.state for r in requests}
+        weather_defaults = {state: self._get_weather_defaults(state) for state in states}
+        soil_profiles = {state: self.data_loader.get_soil_data_for_state(state) for state in states}
+        
+        X = pd.DataFrame([
+            self._build_input_row(r, weather_defaults[r.state], soil_profiles[r.state])
+            for r in requests
+        ])
+        
+        # Encode categoricals with the training label mapping; unknown labels -> NaN
+        valid = np.ones(len(X), dtype=bool)
+        errors: Dict[int, str] = {}
+        for col in ['crop', 'state', 'season']:
+            codes = X[col].astype(str).map(self.category_codes[col])
+            unknown = codes.isna().to_numpy()
+            for i in np.flatnonzero(unknown & valid):
+                errors[i] = f"Unknown {col}: {X[col].iloc[i]}"
+            valid &= ~unknown
+            X[col] = codes
+        
+        X = X[self.feature_columns]
+        
+        results: List[Dict] = [
+            {"index": i, "error": errors[i]} if i in errors else {"index": i}
+            for i in range(len(requests))
+        ]
+        
+        if valid.any():
+            tree_predictions = self._tree_prediction_matrix(X[valid])
+            point = tree_predictions.mean(axis=0)
+            lower = np.percentile(tree_predictions, 10, axis=0)
+            upper = np.percentile(tree_predictions, 90, axis=0)
+            
+            for j, i in enumerate(np.flatnonzero(valid)):
+                results[i].update({
+                    "predicted_yield": round(float(point[j]), 2),
+                    "confidence_interval": {
+                        "lower": round(float(lower[j]), 2),
+                        "upper": round(float(upper[j]), 2)
+                    },
+                    "total_production": round(float(point[j]) * requests[i].area, 2),
+                    "error": None
+                })
+        
+        return results
+    
+    def _tree_prediction_matrix(self, X: pd.DataFrame) -> np.ndarray:
+        """Per-tree predictions for all rows, shape (n_trees, n_rows)"""
+        # Trees were fitted on plain arrays by the forest; convert once for all of them
+        X_arr = np.asarray(X, dtype=np.float32)
+        return np.stack([tree.predict(X_arr) for tree in self.model.estimators_])
+    
+    def _build_input_row(
+        self,
+        request: YieldPredictionRequest,
+        weather_defaults: Optional[Dict] = None,
+        soil_data: Optional[Dict] = None
+    ) -> Dict:
+        """Assemble the raw (unencoded) feature row for one request"""
+        input_data = {
+            'crop': request.crop,
+            'state': request.state,
+            'season': request.season,
+            'area': request.area,
+            'fertilizer': request.fertilizer,
+            'pesticide': request.pesticide
+        }
+        
+        # Get default weather values if not provided
+        if request.avg_temp_c is None or request.total_rainfall_mm is None or request.avg_humidity_percent is None:
+            if weather_defaults is None:
+                weather_defaults = self._get_weather_defaults(request.state)
+            input_data.update({
+                'avg_temp_c': request.avg_temp_c or weather_defaults['temp'],
+                'total_rainfall_mm': request.total_rainfall_mm or weather_defaults['rainfall'],
+                'avg_humidity_percent': request.avg_humidity_percent or weather_defaults['humidity']
+            })
+        else:
+            input_data.update({
+                'avg_temp_c': request.avg_temp_c,
+                'total_rainfall_mm': request.total_rainfall_mm,
+                'avg_humidity_percent': request.avg_humidity_percent
+            })
+        
+        # Soil data for the state
+        if soil_data:
+            input_data.update({
+                'N': soil_data.get('N', 50),
+                'P': soil_data.get('P', 25),
+                'K': soil_data.get('K', 30),
+                'pH': soil_data.get('pH', 6.5)
+            })
+        else:
+            input_data.update({'N': 50, 'P': 25, 'K': 30, 'pH': 6.5})
+        
+        return input_data
+    
     async def analyze_yield_gap(self, request: YieldGapRequest) -> Dict:
         """Analyze yield gap"""
         benchmarks = self.get_benchmarks(
@@ -195,12 +326,10 @@ class YieldPredictionService:
         }
         
         # Calculate percentile rank
-        data = self.data_loader.filter_data(crop=request.crop, state=request.state, season=request.season)
-        if not data.empty:
-            yields = data['yield'].values
-            percentile_rank = round((yields < request.current_yield).sum() / len(yields) * 100, 1)
-        else:
-            percentile_rank = 50.0
+        percentile_rank = self.benchmark_cube.percentile_rank(
+            request.current_yield, request.crop, request.state, request.season
+        )
+        percentile_rank = round(percentile_rank, 1) if percentile_rank is not None else 50.0
         
         # Improvement potential
         improvement_potential = max(0, round((benchmarks['top_10_percent'] - request.current_yield) / request.current_yield * 100, 1))
@@ -221,32 +350,26 @@ class YieldPredictionService:
     
     def get_benchmarks(self, request: BenchmarkRequest) -> Dict:
         """Get yield benchmarks"""
-        data = self.data_loader.filter_data(
-            crop=request.crop,
-            state=request.state,
-            season=request.season
-        )
+        entry = self.benchmark_cube.get(request.crop, request.state, request.season)
         
-        if data.empty:
+        if entry is None:
             return {
                 'error': f'No data available for {request.crop} in {request.state}' + (f' during {request.season}' if request.season else ''),
                 'available_seasons': self.data_loader.filter_data(crop=request.crop, state=request.state)['season'].str.strip().unique().tolist()
             }
         
-        yields = data['yield'].values
-        
         benchmarks = {
             'crop': request.crop,
             'state': request.state,
             'season': request.season,
-            'total_records': len(data),
-            'years_covered': f"{data['year'].min()}-{data['year'].max()}",
-            'average_yield': round(np.mean(yields), 2),
-            'median_yield': round(np.median(yields), 2),
-            'top_10_percent': round(np.percentile(yields, 90), 2),
-            'top_25_percent': round(np.percentile(yields, 75), 2),
-            'max_yield_achieved': round(np.max(yields), 2),
-            'yield_std': round(np.std(yields), 2)
+            'total_records': entry['total_records'],
+            'years_covered': f"{entry['year_min']}-{entry['year_max']}",
+            'average_yield': round(entry['average_yield'], 2),
+            'median_yield': round(entry['median_yield'], 2),
+            'top_10_percent': round(entry['top_10_percent'], 2),
+            'top_25_percent': round(entry['top_25_percent'], 2),
+            'max_yield_achieved': round(entry['max_yield_achieved'], 2),
+            'yield_std': round(entry['yield_std'], 2)
         }
         
         return benchmarks
@@ -310,19 +433,12 @@ class YieldPredictionService:
     
     def _get_top_performer_characteristics(self, crop: str, state: str, season: Optional[str]) -> Dict:
         """Get characteristics of top performers"""
-        data = self.data_loader.filter_data(crop=crop, state=state, season=season)
+        entry = self.benchmark_cube.get(crop, state, season)
         
-        if data.empty:
+        if entry is None:
             return {}
         
-        threshold = np.percentile(data['yield'], 80)
-        top_performers = data[data['yield'] >= threshold]
-        
-        return {
-            'avg_fertilizer': round(top_performers['fertilizer'].mean(), 0) if 'fertilizer' in top_performers.columns else None,
-            'avg_area': round(top_performers['area'].mean(), 2) if 'area' in top_performers.columns else None,
-            'count': len(top_performers)
-        }
+        return dict(entry['top_performers'])
     
     def get_available_crops(self) -> List[str]:
         """Get available crops"""
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Export the plant disease Keras model to TensorFlow Lite
+
+The server prefers the exported model (DISEASE_MODEL_BACKEND=auto) and runs
+it with tflite-runtime, so production workers never import TensorFlow.
+This script is the only place TensorFlow is needed.
+
+Usage:
+    python export_disease_model.py                                # float32
+    python export_disease_model.py --quantize float16             # ~2x smaller
+    python export_disease_model.py --quantize int8 \\
+        --calibration-dir path/to/leaf/photos                     # ~4x smaller
+
+Check accuracy afterwards with:
+    python test_disease_model_parity.py --images path/to/leaf/photos
+"""
+
+import argparse
+import json
+import sys
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from app.services.disease_model_runtime import KERAS_MODEL_PATH, TFLITE_MODEL_PATH
+from app.services.image_preprocessing import decode_image_into
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+
+
+def load_calibration_images(directory: Path, limit: int = 200):
+    """Preprocessed (160, 160, 3) float32 arrays, exactly as the server feeds the model"""
+    paths = sorted(p for p in directory.rglob('*') if p.suffix.lower() in IMAGE_EXTENSIONS)[:limit]
+    images = []
+    for path in paths:
+        images.append(decode_image_into(path.read_bytes(), np.empty((160, 160, 3), dtype=np.float32)))
+    return images
+
+
+def export(quantize: str = "none", calibration_dir: Path = None, output: Path = TFLITE_MODEL_PATH):
+    import tensorflow as tf
+
+    print(f"📦 Loading {KERAS_MODEL_PATH.name}...")
+    model = tf.keras.models.load_model(str(KERAS_MODEL_PATH), compile=False)
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    calibration_count = 0
+
+    if quantize == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantize == "int8":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if calibration_dir:
+            images = load_calibration_images(calibration_dir)
+            if not images:
+                raise SystemExit(f"❌ No images found in {calibration_dir}")
+            calibration_count = len(images)
+
+            def representative_dataset():
+                for image in images:
+                    yield [image[np.newaxis, ...]]
+
+            # Full integer quantization of weights and activations; I/O stays float32
+            converter.representative_dataset = representative_dataset
+        else:
+            print("⚠️ No --calibration-dir given: using dynamic-range int8 (weights only)")
+
+    print(f"⚙️ Converting (quantize={quantize})...")
+    tflite_model = converter.convert()
+
+    output.write_bytes(tflite_model)
+    keras_mb = KERAS_MODEL_PATH.stat().st_size / (1024 * 1024)
+    tflite_mb = len(tflite_model) / (1024 * 1024)
+
+    metadata = {
+        "source": KERAS_MODEL_PATH.name,
+        "quantize": quantize,
+        "calibration_images": calibration_count,
+        "tensorflow_version": tf.__version__,
+        "exported_at": datetime.now().isoformat(),
+        "size_mb": round(tflite_mb, 2)
+    }
+    output.with_suffix('.json').write_text(json.dumps(metadata, indent=2))
+
+    print(f"✅ Wrote {output} ({keras_mb:.1f} MB -> {tflite_mb:.1f} MB)")
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the disease model to TensorFlow Lite")
+    parser.add_argument("--quantize", choices=["none", "float16", "int8"], default="none",
+                        help="Post-training quantization (default: none)")
+    parser.add_argument("--calibration-dir", type=Path,
+                        help="Leaf photos for int8 activation calibration")
+    parser.add_argument("--output", type=Path, default=TFLITE_MODEL_PATH,
+                        help=f"Output path (default: {TFLITE_MODEL_PATH})")
+    args = parser.parse_args()
+
+    export(args.quantize, args.calibration_dir, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Ingest Agmarknet daily price/arrival reports into the market archive
+
+Reports for the same commodity may overlap; rows already in the archive
+(same date, district, market, variety and grade) are skipped, so running
+this after each daily download only appends the new rows. A running
+server picks up the new archive segments on its next refresh. The server
+also ingests new reports in the data directory by itself, so this command
+is for cron jobs and for reports kept outside the data directory.
+
+Usage:
+    python ingest_market_reports.py                       # new/changed reports in the data directory
+    python ingest_market_reports.py path/to/report.csv    # specific report files
+    python ingest_market_reports.py --status              # archived commodities
+"""
+
+import argparse
+import sys
+import os
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from app.config import settings
+from app.services.market_archive import MarketArchive
+from app.services.market_ingestion import MarketIngestion
+
+# Same as MarketIntelligenceService.data_path (run from the server directory)
+DATA_PATH = Path("../../data/gujarat/market-price-arrival")
+
+
+def print_status(archive: MarketArchive):
+    print(f"📦 {archive.root} ({len(archive.sources)} reports ingested)")
+    for name in archive.commodities():
+        summary = archive.summary(name)
+        date_range = summary['date_range'] or {}
+        print(f"  {name:32s} {summary['records']:7d} rows  "
+              f"{date_range.get('start', '-')} to {date_range.get('end', '-')}  "
+              f"({len(archive.segments(name))} segments)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest market price/arrival reports")
+    parser.add_argument("reports", nargs="*", type=Path,
+                        help="Report CSVs to ingest (default: new or changed reports in the data directory)")
+    parser.add_argument("--data-dir", type=Path, default=DATA_PATH,
+                        help=f"Report directory (default: {DATA_PATH})")
+    parser.add_argument("--archive-dir", type=Path, default=settings.MARKET_ARCHIVE_DIR,
+                        help=f"Archive directory (default: {settings.MARKET_ARCHIVE_DIR})")
+    parser.add_argument("--status", action="store_true", help="Show archived commodities and exit")
+    args = parser.parse_args()
+
+    archive = MarketArchive(args.archive_dir)
+    if args.status:
+        print_status(archive)
+        return
+
+    ingestion = MarketIngestion(args.data_dir, archive)
+    missing = [p for p in args.reports if not p.is_file()]
+    if missing:
+        raise SystemExit(f"❌ Report not found: {', '.join(map(str, missing))}")
+
+    results = ingestion.ingest(paths=args.reports or None)
+    if not results:
+        print("✅ Nothing to ingest")
+        return
+    for name, result in results.items():
+        print(f"  {name:32s} +{result['new_rows']:5d} rows "
+              f"({result['duplicates']} already archived, {len(result['files'])} report(s))")
+    print(f"✅ Ingested {sum(r['new_rows'] for r in results.values())} new rows")
+
+
+if __name__ == "__main__":
+    main()
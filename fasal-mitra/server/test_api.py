@@ -55,6 +55,40 @@ def test_yield_prediction():
     return response.status_code == 200
 
 
+def test_yield_batch_prediction():
+    """Test bulk yield prediction"""
+    print("\n" + "="*60)
+    print("Testing Batch Yield Prediction")
+    print("="*60)
+    
+    farm = {
+        "crop": "Rice",
+        "state": "Punjab",
+        "season": "Kharif",
+        "area": 100,
+        "fertilizer": 25000,
+        "pesticide": 500
+    }
+    payload = {
+        "items": [
+            farm,
+            {**farm, "area": 20, "fertilizer": 4000},
+            {**farm, "crop": "Not A Crop"}
+        ]
+    }
+    
+    response = requests.post(f"{BASE_URL}/yield/predict/batch", json=payload)
+    print(f"Status Code: {response.status_code}")
+    data = response.json()
+    pprint(data)
+    predictions = data["data"]["predictions"]
+    return (
+        response.status_code == 200
+        and predictions[0]["error"] is None
+        and predictions[2]["error"] is not None
+    )
+
+
 def test_yield_benchmarks():
     """Test yield benchmarks"""
     print("\n" + "="*60)
@@ -157,6 +191,7 @@ def main():
             ("Health Check", test_health),
             ("System Info", test_info),
             ("Yield Prediction", test_yield_prediction),
+            ("Batch Yield Prediction", test_yield_batch_prediction),
             ("Yield Benchmarks", test_yield_benchmarks),
             ("Weather Service", test_weather),
             ("Soil Data", test_soil_data),
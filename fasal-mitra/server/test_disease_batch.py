@@ -0,0 +1,164 @@
+"""
+Batch Disease Detection Test - No Server Required
+
+Swaps the CNN for a stub backend (classifies by dominant colour) and checks
+that several photos share one forward pass, that the aggregated diagnosis
+follows the majority, that LLM advice is requested once per disease, and
+that an unknown advice_mode is rejected.
+"""
+
+import sys
+import os
+import io
+import asyncio
+
+import numpy as np
+from PIL import Image
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from app.services.ml_disease_service import MLDiseaseDetectionService
+from app.services.inference_batcher import MicroBatcher
+
+
+class StubBackend:
+    """Red-ish photos -> late blight, green-ish -> healthy, blue-ish -> early blight"""
+
+    name = "stub"
+
+    def __init__(self, class_labels):
+        self.n_classes = len(class_labels)
+        self.classes = [
+            class_labels.index('Tomato___Late_blight'),
+            class_labels.index('Tomato___healthy'),
+            class_labels.index('Tomato___Early_blight'),
+        ]
+        self.batch_sizes = []
+
+    def predict(self, batch):
+        self.batch_sizes.append(len(batch))
+        probs = np.full((len(batch), self.n_classes), 0.01 / self.n_classes, dtype=np.float32)
+        for row, image in zip(probs, batch):
+            row[self.classes[int(np.argmax(image.mean(axis=(0, 1))))]] += 0.99
+        return probs
+
+
+def photo(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (400, 300), color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def make_service():
+    service = MLDiseaseDetectionService()
+    if service.batcher is not None:
+        service.batcher.stop()
+    service.model = StubBackend(service.class_labels)
+    service.batcher = MicroBatcher(service.model.predict, max_batch_size=16, max_latency_ms=20, name="stub")
+    service.model_loaded = True
+
+    service.llm_calls = []
+
+    async def fake_advice(disease_name, crop, location, severity):
+        service.llm_calls.append(disease_name)
+        return f"Advice for {disease_name}"
+
+    service.get_llm_treatment_advice = fake_advice
+    return service
+
+
+def test_single_forward_pass():
+    """Five photos -> one model call, majority diagnosis, one LLM call per disease"""
+    print("="*60)
+    print("📸 TESTING BATCH DISEASE DETECTION")
+    print("="*60)
+
+    service = make_service()
+    images = [photo((200, 40, 30)), photo((190, 60, 40)), photo((210, 30, 20)),
+              photo((30, 180, 40)), photo((30, 40, 200))]
+    result = asyncio.run(service.detect_disease_batch(images, crop_type="Tomato", location="Pune", advice_mode="inline"))
+    service.shutdown()
+
+    aggregated = result['aggregated']
+    print(f"Batch sizes: {service.model.batch_sizes}")
+    print(f"Primary: {aggregated['disease_name']} ({aggregated['agreement']}% of photos)")
+    print(f"LLM calls: {service.llm_calls}")
+
+    assert service.model.batch_sizes == [5]
+    assert len(result['results']) == 5
+    assert aggregated['disease_label'] == 'Tomato___Late_blight'
+    assert aggregated['agreement'] == 60.0
+    assert {d['disease_label'] for d in aggregated['diseases']} == {
+        'Tomato___Late_blight', 'Tomato___healthy', 'Tomato___Early_blight'}
+    # Healthy photos need no advice; each disease is asked about once
+    assert sorted(service.llm_calls) == sorted(set(service.llm_calls))
+    assert len(service.llm_calls) == 2
+    assert all('llm_advice' in r for r in result['results'] if not r['is_healthy'])
+    print("✓ One forward pass, majority diagnosis, deduplicated advice")
+    return True
+
+
+def test_bad_photo_and_cache():
+    """An undecodable photo is reported per image; repeat photos skip the model"""
+    print("\n" + "="*60)
+    print("🧩 TESTING PARTIAL FAILURES AND CACHE")
+    print("="*60)
+
+    service = make_service()
+    images = [photo((200, 40, 30)), b"not an image", photo((30, 180, 40))]
+
+    async def run():
+        first = await service.detect_disease_batch(images, crop_type="Tomato")
+        second = await service.detect_disease_batch(images, crop_type="Tomato")
+        return first, second
+
+    first, second = asyncio.run(run())
+    service.shutdown()
+
+    assert 'error' in first['results'][1]
+    assert first['analyzed_count'] == 2
+    assert service.model.batch_sizes == [2], service.model.batch_sizes
+    assert second['aggregated']['photo_count'] == 2
+    print(f"✓ Errors isolated, repeat request served from cache: {service.model.batch_sizes}")
+    return True
+
+
+def test_invalid_advice_mode():
+    """advice_mode other than deferred/inline is a 400, not silently deferred"""
+    print("\n" + "="*60)
+    print("🚦 TESTING ADVICE MODE VALIDATION")
+    print("="*60)
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    leaf = photo((40, 160, 40))
+    for path, files in (
+        ("/api/v1/disease/detect", {"file": ("leaf.jpg", leaf, "image/jpeg")}),
+        ("/api/v1/disease/detect/batch", [("files", ("leaf.jpg", leaf, "image/jpeg"))]),
+    ):
+        response = client.post(path, files=files, data={"crop_type": "Tomato", "advice_mode": "inlne"})
+        assert response.status_code == 400, (path, response.status_code)
+        assert "advice_mode" in response.json()["message"]
+        print(f"✓ {path} with advice_mode=inlne: {response.status_code}")
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    results = {
+        "Single forward pass": test_single_forward_pass(),
+        "Partial failures and cache": test_bad_photo_and_cache(),
+        "Invalid advice mode": test_invalid_advice_mode()
+    }
+
+    print("\n" + "="*60)
+    for name, passed in results.items():
+        print(f"{'✅' if passed else '❌'} {name}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
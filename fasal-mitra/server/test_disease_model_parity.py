@@ -0,0 +1,156 @@
+"""
+Disease Model Parity Test - No Server Required
+
+Runs the same fixture images through the original Keras model and the
+exported TFLite model and checks that predictions agree within the
+tolerance for the export's quantization mode.
+
+Fixtures are deterministic synthetic leaf photos; pass real ones with
+    python test_disease_model_parity.py --images path/to/leaf/photos
+Requires TensorFlow and an exported model (python export_disease_model.py).
+"""
+
+import sys
+import os
+import io
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from app.services.disease_model_runtime import (
+    KERAS_MODEL_PATH, TFLITE_MODEL_PATH, KerasBackend, TFLiteBackend
+)
+from app.services.image_preprocessing import decode_image_into
+
+# (min top-1 agreement, max abs probability difference) per export mode
+TOLERANCES = {
+    "none": (1.0, 1e-3),
+    "float16": (0.98, 2e-2),
+    "int8": (0.9, 0.15),
+}
+
+
+def synthetic_leaf_images(count: int = 24, seed: int = 7):
+    """JPEG bytes of leaf-like shapes with lesions on a soil background"""
+    rng = np.random.default_rng(seed)
+    images = []
+    for _ in range(count):
+        size = int(rng.integers(320, 900))
+        soil = tuple(int(c) for c in rng.integers(60, 140, 3))
+        image = Image.new('RGB', (size, size), soil)
+        draw = ImageDraw.Draw(image)
+
+        leaf = (int(rng.integers(20, 90)), int(rng.integers(110, 200)), int(rng.integers(20, 80)))
+        margin = size // 8
+        draw.ellipse([margin, margin * 2, size - margin, size - margin * 2], fill=leaf)
+        for _ in range(int(rng.integers(0, 12))):
+            x, y = rng.integers(margin * 2, size - margin * 2, 2)
+            r = int(rng.integers(4, size // 12))
+            spot = (int(rng.integers(90, 160)), int(rng.integers(50, 100)), int(rng.integers(10, 40)))
+            draw.ellipse([x - r, y - r, x + r, y + r], fill=spot)
+
+        noise = rng.normal(0, 8, (size, size, 3))
+        pixels = np.clip(np.asarray(image, dtype=np.float32) + noise, 0, 255).astype(np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, format='JPEG', quality=90)
+        images.append(buffer.getvalue())
+    return images
+
+
+def load_fixtures():
+    """Preprocessed (N, 160, 160, 3) batch from --images DIR or synthetic fixtures"""
+    if '--images' in sys.argv:
+        directory = Path(sys.argv[sys.argv.index('--images') + 1])
+        raw = [p.read_bytes() for p in sorted(directory.rglob('*'))
+               if p.suffix.lower() in {'.jpg', '.jpeg', '.png', '.webp'}]
+    else:
+        raw = synthetic_leaf_images()
+    return np.stack([decode_image_into(data, np.empty((160, 160, 3), dtype=np.float32)) for data in raw])
+
+
+def export_mode() -> str:
+    metadata_path = TFLITE_MODEL_PATH.with_suffix('.json')
+    if metadata_path.exists():
+        return json.loads(metadata_path.read_text()).get('quantize', 'none')
+    return 'none'
+
+
+def test_keras_tflite_parity():
+    """Top-1 agreement and probability drift between Keras and TFLite"""
+    print("="*60)
+    print("🔬 TESTING KERAS vs TFLITE PARITY")
+    print("="*60)
+
+    if not TFLITE_MODEL_PATH.exists():
+        pytest.skip(f"{TFLITE_MODEL_PATH.name} not found (run export_disease_model.py)")
+
+    batch = load_fixtures()
+    keras_probs = KerasBackend(KERAS_MODEL_PATH).predict(batch)
+    tflite_probs = TFLiteBackend(TFLITE_MODEL_PATH, allow_tensorflow=True).predict(batch)
+
+    mode = export_mode()
+    min_agreement, max_diff = TOLERANCES[mode]
+    agreement = float(np.mean(keras_probs.argmax(axis=1) == tflite_probs.argmax(axis=1)))
+    diff = float(np.abs(keras_probs - tflite_probs).max())
+
+    print(f"Export mode: {mode}, images: {len(batch)}")
+    print(f"Top-1 agreement: {agreement:.1%} (min {min_agreement:.0%})")
+    print(f"Max abs diff: {diff:.5f} (max {max_diff})")
+
+    assert tflite_probs.shape == keras_probs.shape
+    assert agreement >= min_agreement, f"Top-1 agreement {agreement:.1%} below {min_agreement:.0%}"
+    assert diff <= max_diff, f"Probability drift {diff:.5f} above {max_diff}"
+    print("✓ TFLite predictions match Keras")
+    return True
+
+
+def test_tflite_batch_sizes():
+    """Resizing the interpreter between batch sizes gives the same rows"""
+    print("\n" + "="*60)
+    print("📐 TESTING TFLITE BATCH RESIZING")
+    print("="*60)
+
+    if not TFLITE_MODEL_PATH.exists():
+        pytest.skip(f"{TFLITE_MODEL_PATH.name} not found")
+
+    batch = load_fixtures()[:5]
+    backend = TFLiteBackend(TFLITE_MODEL_PATH, allow_tensorflow=True)
+    together = backend.predict(batch)
+    one_by_one = np.concatenate([backend.predict(batch[i:i + 1]) for i in range(len(batch))])
+
+    assert np.allclose(together, one_by_one, atol=1e-5)
+    assert np.allclose(together.sum(axis=1), 1.0, atol=1e-2)
+    print(f"✓ Batch of {len(batch)} matches single-image predictions")
+    return True
+
+
+def run_skippable(test):
+    """Run a test as a script: True/False, or None if it skipped"""
+    try:
+        return test()
+    except pytest.skip.Exception as e:
+        print(f"⏭️ Skipped: {e.msg}")
+        return None
+
+
+def run_all_tests():
+    """Run all tests"""
+    results = {
+        "Keras/TFLite parity": run_skippable(test_keras_tflite_parity),
+        "TFLite batch sizes": run_skippable(test_tflite_batch_sizes)
+    }
+
+    print("\n" + "="*60)
+    for name, passed in results.items():
+        print(f"{'⏭️' if passed is None else '✅' if passed else '❌'} {name}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
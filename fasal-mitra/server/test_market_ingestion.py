@@ -0,0 +1,299 @@
+"""
+Market Ingestion Test - No Server Required
+
+Checks that overlapping report downloads are merged without duplicates,
+that a daily refresh appends only the new rows (to the archive, the
+in-memory frame and the market snapshot), that a restarted store loads the
+archive without re-reading reports, that rows ingested by another
+process are picked up incrementally, that the commodity catalog
+reports the merged archive rather than a single report, and that
+concurrent writers on one archive don't lose each other's rows.
+"""
+
+import sys
+import os
+import multiprocessing
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from app.services import market_archive
+from app.services.commodity_catalog import CommodityCatalog
+from app.services.commodity_store import CommodityStore, parse_report
+from app.services.market_archive import MarketArchive
+from app.services.market_ingestion import MarketIngestion
+from app.services.market_snapshot import MarketSnapshot, SnapshotIndex
+
+SOURCE = Path("../../data/gujarat/market-price-arrival")
+WHEAT = next(SOURCE.glob("Wheat Daily*.csv"))
+
+
+def write_report(path, lines, keep):
+    """Report with the title/header of Wheat and the data lines whose date passes keep(date)"""
+    header, rows = lines[:2], [l for l in lines[2:] if l.strip()]
+    kept = [l for l in rows if keep(pd.to_datetime(l.rstrip().rsplit(',', 1)[-1], format='%d-%m-%Y'))]
+    path.write_text("".join(header + kept))
+    return len(kept)
+
+
+def make_store(data_dir, archive_dir):
+    store = CommodityStore(data_dir, check_interval=0,
+                           ingestion=MarketIngestion(data_dir, MarketArchive(archive_dir)))
+    snapshots = SnapshotIndex()
+    store.add_listener(snapshots.advance)
+    return store, snapshots
+
+
+def test_overlapping_daily_reports():
+    """A second, overlapping download appends only its new days"""
+    print("="*60)
+    print("📥 TESTING OVERLAPPING REPORT INGESTION")
+    print("="*60)
+
+    work = Path(tempfile.mkdtemp())
+    data_dir, archive_dir = work / "reports", work / "archive"
+    data_dir.mkdir()
+    lines = WHEAT.read_text().splitlines(keepends=True)
+    full = parse_report(WHEAT)
+    cutoff = full['Arrival Date'].max() - pd.Timedelta(days=5)
+
+    # Yesterday's download stops 5 days early; today's covers the last 20 days
+    write_report(data_dir / "Wheat Daily Price Arrival Report-old.csv", lines, lambda d: d <= cutoff)
+    store, snapshots = make_store(data_dir, archive_dir)
+    before = store.get("Wheat")
+    snapshots.get("Wheat", before)
+    assert len(before) == (full['Arrival Date'] <= cutoff).sum()
+
+    overlap = write_report(data_dir / "Wheat Daily Price Arrival Report-new.csv", lines,
+                           lambda d: d > cutoff - pd.Timedelta(days=15))
+    start = time.perf_counter()
+    store.refresh(force=True)
+    elapsed = time.perf_counter() - start
+    after = store.get("Wheat")
+
+    pd.testing.assert_frame_equal(after, full)
+    assert store.loads == 1 and store.appends == 1
+    assert len(store.archive.segments("Wheat")) == 2
+    new_rows = len(full) - len(before)
+    print(f"✓ {new_rows} new of {overlap} rows appended in {elapsed*1000:.0f}ms; frame equals a full parse")
+
+    # The snapshot was advanced, not rebuilt, and matches a rebuild
+    assert snapshots.builds == 1
+    rebuilt = MarketSnapshot()
+    rebuilt.apply(full)
+    assert snapshots.get("Wheat", after).entries == rebuilt.entries
+    print("✓ Market snapshot updated incrementally")
+
+    # Re-running over the same directory reads nothing
+    assert store.ingestion.pending() == []
+    store.refresh(force=True)
+    assert store.appends == 1
+
+    # A restarted server loads the archive and re-reads no reports
+    restarted, _ = make_store(data_dir, archive_dir)
+    pd.testing.assert_frame_equal(restarted.get("Wheat"), full)
+    assert restarted.appends == 0 and restarted.ingestion.pending() == []
+    print("✓ Restart loads the archive without re-ingesting")
+    shutil.rmtree(work)
+    return True
+
+
+def test_ingest_command_picked_up():
+    """Rows ingested by another process reach a running store as an append"""
+    print("\n" + "="*60)
+    print("🔄 TESTING INGEST FROM ANOTHER PROCESS")
+    print("="*60)
+
+    work = Path(tempfile.mkdtemp())
+    data_dir, archive_dir, outside = work / "reports", work / "archive", work / "downloads"
+    data_dir.mkdir()
+    outside.mkdir()
+    lines = WHEAT.read_text().splitlines(keepends=True)
+    full = parse_report(WHEAT)
+    cutoff = full['Arrival Date'].max() - pd.Timedelta(days=3)
+
+    write_report(data_dir / "Wheat Daily Price Arrival Report-a.csv", lines, lambda d: d <= cutoff)
+    store, _ = make_store(data_dir, archive_dir)
+    store.get("Wheat")
+
+    # What `python ingest_market_reports.py <file>` does
+    write_report(outside / "Wheat Daily Price Arrival Report-b.csv", lines, lambda d: True)
+    results = MarketIngestion(data_dir, MarketArchive(archive_dir)).ingest(
+        paths=list(outside.glob("*.csv")))
+    assert results['Wheat']['new_rows'] == (full['Arrival Date'] > cutoff).sum()
+    assert results['Wheat']['duplicates'] == (full['Arrival Date'] <= cutoff).sum()
+
+    store.refresh(force=True)
+    pd.testing.assert_frame_equal(store.get("Wheat"), full)
+    assert store.loads == 1 and store.appends == 1
+    print(f"✓ {results['Wheat']['new_rows']} rows from the ingest command appended to the running store")
+    shutil.rmtree(work)
+    return True
+
+
+def test_catalog_counts_merged_archive():
+    """Overlapping reports are listed once, with the archive's count and date range"""
+    print("\n" + "="*60)
+    print("📋 TESTING CATALOG OVER OVERLAPPING REPORTS")
+    print("="*60)
+
+    work = Path(tempfile.mkdtemp())
+    data_dir, archive_dir = work / "reports", work / "archive"
+    data_dir.mkdir()
+    lines = WHEAT.read_text().splitlines(keepends=True)
+    full = parse_report(WHEAT)
+    first, last = full['Arrival Date'].min(), full['Arrival Date'].max()
+    cutoff = last - pd.Timedelta(days=10)
+
+    # An older report and a newer one that overlaps it by 10 days
+    write_report(data_dir / "Wheat Daily Price Arrival Report-old.csv", lines, lambda d: d <= cutoff)
+    newest = write_report(data_dir / "Wheat Daily Price Arrival Report-new.csv", lines,
+                          lambda d: d > cutoff - pd.Timedelta(days=10))
+    store, _ = make_store(data_dir, archive_dir)
+    catalog = CommodityCatalog(data_dir, work / "catalog.json", lambda name: "Grains",
+                               check_interval=0, archive=store.archive)
+    store.refresh(force=True)
+
+    entries = [c for c in catalog.commodities() if c['name'] == "Wheat"]
+    assert len(entries) == 1
+    wheat = entries[0]
+    assert wheat['record_count'] == len(store.get("Wheat")) == len(full) != newest
+    assert wheat['date_range']['start'] == first.strftime('%Y-%m-%d')
+    assert wheat['date_range']['end'] == last.strftime('%Y-%m-%d')
+    assert wheat['date_range']['days'] == (last - first).days
+    print(f"✓ Wheat listed once: {wheat['record_count']} rows from {wheat['date_range']['start']} "
+          f"(newest report alone: {newest} rows)")
+
+    # Rows ingested by another process show up without a rescan of the reports
+    extra = full[full['Arrival Date'] == last].assign(Grade='Test')
+    store.archive.append("Wheat", extra, {})
+    scans = catalog.scans
+    assert catalog.commodities()[0]['record_count'] == len(full) + len(extra)
+    assert catalog.scans == scans
+    print("✓ Catalog follows archive appends")
+    shutil.rmtree(work)
+    return True
+
+
+def append_days(root, days, name):
+    """Worker process: append one archive segment per day of Wheat rows"""
+    full = parse_report(WHEAT)
+    archive = MarketArchive(Path(root))
+    for day in days:
+        archive.append("Wheat", full[full['Arrival Date'] == day], {f"{name}-{day}.csv": {'rows': 0}})
+
+
+def test_concurrent_writers():
+    """Two archive instances (server and ingest command) appending to one root"""
+    print("\n" + "="*60)
+    print("🔒 TESTING CONCURRENT ARCHIVE WRITERS")
+    print("="*60)
+
+    work = Path(tempfile.mkdtemp())
+    full = parse_report(WHEAT)
+    days = sorted(full['Arrival Date'].unique())
+    server, command = MarketArchive(work), MarketArchive(work)
+
+    # Both start from the same (empty) manifest
+    server.append("Wheat", full[full['Arrival Date'] == days[0]], {"server.csv": {'rows': 0}})
+    command.append("Wheat", full[full['Arrival Date'] == days[1]], {"command.csv": {'rows': 0}})
+
+    server.reload()
+    assert set(server.sources) == {"server.csv", "command.csv"}
+    assert len(set(server.segments("Wheat"))) == 2
+    expected = full[full['Arrival Date'].isin(days[:2])].reset_index(drop=True)
+    pd.testing.assert_frame_equal(server.load("Wheat"), expected)
+    assert server.summary("Wheat")['records'] == len(expected)
+    print(f"✓ Both appends kept: {len(expected)} rows in 2 segments")
+
+    # The other writer archives a day after the server loaded its frame; the
+    # server's ingest must deduplicate against that day, not its stale frame
+    frames = {"Wheat": server.load("Wheat")}
+    command.append("Wheat", full[full['Arrival Date'] == days[2]], {"command-2.csv": {'rows': 0}})
+    report = work / "Wheat Daily Price Arrival Report-x.csv"
+    write_report(report, WHEAT.read_text().splitlines(keepends=True), lambda d: d <= days[3])
+    results = MarketIngestion(work, server).ingest(frames=frames, paths=[report])
+    assert results['Wheat']['new_rows'] == (full['Arrival Date'] == days[3]).sum()
+    expected = full[full['Arrival Date'].isin(days[:4])].reset_index(drop=True)
+    pd.testing.assert_frame_equal(server.load("Wheat"), expected)
+    print("✓ Ingest deduplicates against rows appended by the other writer")
+
+    # Separate processes appending at the same time
+    shutil.rmtree(work)
+    work.mkdir()
+    groups = [days[i::3][:4] for i in range(3)]
+    workers = [multiprocessing.Process(target=append_days, args=(str(work), group, f"p{i}"))
+               for i, group in enumerate(groups)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert all(worker.exitcode == 0 for worker in workers)
+
+    archive = MarketArchive(work)
+    appended = sorted(day for group in groups for day in group)
+    expected = full[full['Arrival Date'].isin(appended)]
+    assert len(archive.sources) == len(appended)
+    assert len(archive.segments("Wheat")) == len(appended)
+    assert len(archive.load("Wheat")) == len(expected) == archive.summary("Wheat")['records']
+    assert not archive.lock_path.exists()
+    print(f"✓ {len(workers)} processes, {len(appended)} appends: no rows or sources lost")
+    shutil.rmtree(work)
+    return True
+
+
+def test_compaction():
+    """Many daily segments are compacted without changing the rows"""
+    print("\n" + "="*60)
+    print("🗜️ TESTING SEGMENT COMPACTION")
+    print("="*60)
+
+    work = Path(tempfile.mkdtemp())
+    full = parse_report(WHEAT)
+    days = sorted(full['Arrival Date'].unique())
+    archive = MarketArchive(work)
+    compact_after, market_archive.COMPACT_SEGMENTS = market_archive.COMPACT_SEGMENTS, 4
+    try:
+        ingestion = MarketIngestion(work, archive)
+        lines = WHEAT.read_text().splitlines(keepends=True)
+        for i, day in enumerate(days[-10:]):
+            path = work / f"Wheat Daily Price Arrival Report-{i}.csv"
+            write_report(path, lines, lambda d, day=day: d <= day)
+            ingestion.ingest(paths=[path])
+            path.unlink()
+    finally:
+        market_archive.COMPACT_SEGMENTS = compact_after
+
+    segments = archive.segments("Wheat")
+    assert len(segments) < 4 and len(list(work.glob("*.pkl")) + list(work.glob("*.parquet"))) == len(segments)
+    pd.testing.assert_frame_equal(archive.load("Wheat"), full)
+    assert archive.summary("Wheat")['records'] == len(full)
+    print(f"✓ 10 daily ingests -> {len(segments)} segments, rows unchanged")
+    shutil.rmtree(work)
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    results = {
+        "Overlapping daily reports": test_overlapping_daily_reports(),
+        "Ingest command picked up": test_ingest_command_picked_up(),
+        "Catalog counts merged archive": test_catalog_counts_merged_archive(),
+        "Concurrent writers": test_concurrent_writers(),
+        "Compaction": test_compaction()
+    }
+
+    print("\n" + "="*60)
+    for name, passed in results.items():
+        print(f"{'✅' if passed else '❌'} {name}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
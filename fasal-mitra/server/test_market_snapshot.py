@@ -0,0 +1,169 @@
+"""
+Market Snapshot Test - No Server Required
+
+Checks that market comparison and top markets read from the per-market
+snapshot give the same answers as the old full-history pandas queries,
+that the rolling windows match a direct computation, and that applying
+new rows incrementally gives the same snapshot as a full rebuild.
+"""
+
+import sys
+import os
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from app.services.market_snapshot import MarketSnapshot, SnapshotIndex
+from app.services.market_intelligence_service import MarketIntelligenceService
+
+
+def legacy_comparison(df, date=None, district=None, variety=None):
+    """The original per-request comparison query"""
+    target_date = pd.to_datetime(date) if date else df['Arrival Date'].max()
+    filtered = df[(df['Arrival Date'] >= target_date - timedelta(days=3)) & (df['Arrival Date'] <= target_date)]
+    if district:
+        filtered = filtered[filtered['District'].str.lower() == district.lower()]
+    if variety:
+        filtered = filtered[filtered['Variety'].str.lower() == variety.lower()]
+    latest = filtered.sort_values('Arrival Date', kind='stable').groupby('Market').tail(1)
+    return sorted(
+        (row['Market'], row['Variety'], row['Arrival Date'].strftime('%Y-%m-%d'), float(row['Modal Price']))
+        for _, row in latest.iterrows()
+    )
+
+
+def legacy_top_markets(df):
+    """The original whole-history top-markets query"""
+    top = df.groupby('Market').agg({'Modal Price': 'mean', 'Arrival Quantity': 'sum'})
+    top = top.sort_values('Modal Price', ascending=False).head(5)
+    return [(market, row['Modal Price'], row['Arrival Quantity']) for market, row in top.iterrows()]
+
+
+def test_matches_legacy_queries():
+    """Snapshot answers equal the full-history queries for every commodity"""
+    print("="*60)
+    print("📊 TESTING SNAPSHOT AGAINST LEGACY QUERIES")
+    print("="*60)
+
+    service = MarketIntelligenceService()
+    checked = 0
+    for commodity in service.store.commodities():
+        df = service.store.get(commodity)
+        district, variety = df['District'].iloc[-1], df['Variety'].iloc[-1]
+        for kwargs in [{}, {'district': district.upper()}, {'variety': variety}]:
+            markets = service.get_market_comparison(commodity, **kwargs)
+            got = sorted((m['market'], m['variety'], m['date'], m['modal_price']) for m in markets)
+            assert got == legacy_comparison(df, **kwargs), (commodity, kwargs)
+            checked += 1
+
+        insights = service.get_commodity_insights(commodity)
+        got = [(m['market'], m['avg_price'], m['total_arrival']) for m in insights['top_markets']]
+        expected = legacy_top_markets(df)
+        assert [m for m, _, _ in got] == [m for m, _, _ in expected], commodity
+        assert np.allclose([g[1:] for g in got], [e[1:] for e in expected]), commodity
+
+    # A past date falls back to scanning the history
+    cotton = service.store.get("Cotton")
+    past = (cotton['Arrival Date'].max() - timedelta(days=20)).strftime('%Y-%m-%d')
+    got = sorted((m['market'], m['variety'], m['date'], m['modal_price'])
+                 for m in service.get_market_comparison("Cotton", date=past))
+    assert got and got == legacy_comparison(cotton, date=past)
+    print(f"✓ {checked} comparisons and {len(service.store.commodities())} top-market lists match")
+    return True
+
+
+def test_rolling_windows():
+    """Rolling means and volatility match a direct computation"""
+    print("\n" + "="*60)
+    print("📈 TESTING ROLLING WINDOWS")
+    print("="*60)
+
+    df = MarketIntelligenceService().store.get("Wheat")
+    snapshot = MarketSnapshot()
+    snapshot.apply(df)
+
+    key = df.groupby(['District', 'Market', 'Variety']).size().idxmax()
+    entry = snapshot.entries[key]
+    rows = df[(df['District'] == key[0]) & (df['Market'] == key[1]) & (df['Variety'] == key[2])]
+    latest = rows['Arrival Date'].max()
+    for window in (7, 14, 30):
+        prices = rows.loc[rows['Arrival Date'] > latest - timedelta(days=window), 'Modal Price']
+        assert entry[f'avg_{window}d'] == round(prices.mean(), 2), window
+    assert entry['volatility_30d'] == round(prices.std() / prices.mean() * 100, 2)
+    assert entry['modal_price'] == rows['Modal Price'].iloc[-1]
+    print(f"✓ {key[1]} ({key[2]}): 7d={entry['avg_7d']} 30d={entry['avg_30d']} vol={entry['volatility_30d']}%")
+    return True
+
+
+def test_incremental_matches_rebuild():
+    """Applying new rows to a snapshot equals rebuilding it from the merged frame"""
+    print("\n" + "="*60)
+    print("🔁 TESTING INCREMENTAL UPDATES")
+    print("="*60)
+
+    rng = np.random.default_rng(0)
+    df = MarketIntelligenceService().store.get("Cotton")
+    # Late-arriving rows are spread over the whole history, not just the tail
+    new_mask = rng.random(len(df)) < 0.1
+    old_df, new_rows = df[~new_mask].reset_index(drop=True), df[new_mask].reset_index(drop=True)
+    merged = pd.concat([old_df, new_rows]).sort_values('Arrival Date', kind='stable').reset_index(drop=True)
+
+    index = SnapshotIndex()
+    index.get("Cotton", old_df)
+    start = time.perf_counter()
+    index.advance("Cotton", old_df, merged, new_rows)
+    elapsed = time.perf_counter() - start
+    incremental = index.get("Cotton", merged)
+    assert index.builds == 1
+
+    rebuilt = MarketSnapshot()
+    rebuilt.apply(merged)
+    assert incremental.entries == rebuilt.entries
+    top, expected = incremental.top_markets(10), rebuilt.top_markets(10)
+    assert [m['market'] for m in top] == [m['market'] for m in expected]
+    assert np.allclose([m['avg_price'] for m in top], [m['avg_price'] for m in expected])
+    assert incremental.latest_by_market() == rebuilt.latest_by_market()
+    print(f"✓ {len(new_rows)} rows applied in {elapsed*1000:.1f}ms, same as a full rebuild")
+    return True
+
+
+def test_query_speed():
+    """Comparison and insights are served from the snapshot"""
+    print("\n" + "="*60)
+    print("⚡ TESTING QUERY SPEED")
+    print("="*60)
+
+    service = MarketIntelligenceService()
+    service.get_market_comparison("Wheat")
+    start = time.perf_counter()
+    for _ in range(200):
+        service.get_market_comparison("Wheat")
+    per_call_ms = (time.perf_counter() - start) / 200 * 1000
+    assert service.snapshots.builds == 1
+    print(f"✓ Wheat comparison: {per_call_ms:.3f}ms per call ({service.snapshots.stats()})")
+    assert per_call_ms < 1
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    results = {
+        "Matches legacy queries": test_matches_legacy_queries(),
+        "Rolling windows": test_rolling_windows(),
+        "Incremental matches rebuild": test_incremental_matches_rebuild(),
+        "Query speed": test_query_speed()
+    }
+
+    print("\n" + "="*60)
+    for name, passed in results.items():
+        print(f"{'✅' if passed else '❌'} {name}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
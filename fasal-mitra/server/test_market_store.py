@@ -0,0 +1,188 @@
+"""
+Commodity Store Test - No Server Required
+
+Checks that the in-memory commodity store parses reports exactly like the
+old per-request CSV read, that repeated market calls don't reload
+anything, and that a modified report is picked up by its mtime. Also
+checks the persisted commodity catalog against a full pandas parse.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from app.services.commodity_store import CommodityStore
+from app.services.commodity_catalog import CommodityCatalog
+from app.services.market_intelligence_service import MarketIntelligenceService
+
+
+def legacy_load(file_path):
+    """The original per-request parse"""
+    df = pd.read_csv(file_path, skiprows=1)
+    for col in ['Min Price', 'Max Price', 'Modal Price', 'Arrival Quantity']:
+        df[col] = df[col].astype(str).str.replace(',', '').astype(float)
+    df['Arrival Date'] = pd.to_datetime(df['Arrival Date'], format='%d-%m-%Y')
+    return df.sort_values('Arrival Date', kind='stable').reset_index(drop=True)
+
+
+def test_parse_matches_legacy():
+    """Every commodity parses to the same values as before"""
+    print("="*60)
+    print("🧾 TESTING COMMODITY STORE PARSING")
+    print("="*60)
+
+    service = MarketIntelligenceService()
+    names = service.store.commodities()
+    assert len(names) >= 20, names
+
+    for path in sorted(service.data_path.glob("*Daily Price Arrival Report*.csv")):
+        name = path.name.split(' Daily')[0]
+        pd.testing.assert_frame_equal(service.store.get(name), legacy_load(path))
+    print(f"✓ {len(names)} commodities match the legacy parse")
+
+    # Prefix lookup still resolves short names, exact names win
+    assert service.store.resolve("Kabuli Chana") == "Kabuli Chana(Chickpeas-white)"
+    assert service.store.resolve("cotton") == "Cotton"
+    print("✓ Name resolution (exact, case-insensitive, prefix)")
+    return True
+
+
+def test_repeated_calls_stay_in_memory():
+    """Market calls after the first load never re-parse a report"""
+    print("\n" + "="*60)
+    print("⚡ TESTING REPEATED MARKET CALLS")
+    print("="*60)
+
+    service = MarketIntelligenceService()
+    service.store.refresh(force=True)
+    loads = service.store.loads
+
+    start = time.perf_counter()
+    for _ in range(20):
+        for commodity in ["Cotton", "Wheat", "Potato"]:
+            service.get_market_comparison(commodity)
+            service.get_commodity_insights(commodity)
+            service.simple_forecast(commodity)
+            service.get_best_market_recommendation(commodity)
+    elapsed = time.perf_counter() - start
+
+    assert service.store.loads == loads
+    print(f"✓ 240 calls in {elapsed*1000:.0f}ms with no reloads ({service.store.stats()})")
+    return True
+
+
+def test_mtime_invalidation():
+    """A rewritten report is reloaded; an untouched one is not"""
+    print("\n" + "="*60)
+    print("🔄 TESTING MTIME INVALIDATION")
+    print("="*60)
+
+    source = MarketIntelligenceService().data_path
+    data_dir = Path(tempfile.mkdtemp())
+    for path in source.glob("Cotton*.csv"):
+        shutil.copy(path, data_dir / path.name)
+
+    store = CommodityStore(data_dir, check_interval=0)
+    before = store.get("Cotton")
+    assert store.loads == 2  # Cotton and Cotton seed
+
+    store.get("Cotton")
+    assert store.loads == 2
+
+    # Drop the last row of the Cotton report and bump its mtime
+    cotton = next(data_dir.glob("Cotton Daily*.csv"))
+    lines = cotton.read_text().rstrip("\n").splitlines(keepends=True)
+    cotton.write_text("".join(lines[:-1]))
+    os.utime(cotton, ns=(time.time_ns(), time.time_ns() + 10**9))
+
+    after = store.get("Cotton")
+    assert store.loads == 3
+    assert len(after) == len(before) - 1
+    shutil.rmtree(data_dir)
+    print(f"✓ Modified report reloaded ({len(before)} -> {len(after)} rows), other report untouched")
+    return True
+
+
+def legacy_catalog_entry(file_path):
+    """The original full-parse metadata for /market/commodities"""
+    df = pd.read_csv(file_path, skiprows=1)
+    dates = pd.to_datetime(df['Arrival Date'], format='%d-%m-%Y', errors='coerce').dropna()
+    return len(df), {
+        'start': dates.min().strftime('%Y-%m-%d'),
+        'end': dates.max().strftime('%Y-%m-%d'),
+        'days': (dates.max() - dates.min()).days
+    }
+
+
+def test_catalog_manifest():
+    """Catalog matches a full parse, persists, and rescans only changed files"""
+    print("\n" + "="*60)
+    print("📇 TESTING COMMODITY CATALOG")
+    print("="*60)
+
+    service = MarketIntelligenceService()
+    data_dir = Path(tempfile.mkdtemp())
+    for path in service.data_path.glob("*.csv"):
+        shutil.copy(path, data_dir / path.name)
+    manifest = data_dir / "cache" / "catalog.json"
+
+    catalog = CommodityCatalog(data_dir, manifest, service._categorize_commodity, check_interval=0)
+    commodities = catalog.commodities()
+    assert catalog.scans == 20 and manifest.exists()
+    for path in data_dir.glob("*.csv"):
+        entry = next(c for c in commodities if c['name'] == path.name.split(' Daily')[0])
+        assert (entry['record_count'], entry['date_range']) == legacy_catalog_entry(path), entry
+    print(f"✓ {len(commodities)} entries match the full parse")
+
+    # A fresh instance (e.g. after restart) reads the manifest and scans nothing
+    restarted = CommodityCatalog(data_dir, manifest, service._categorize_commodity, check_interval=0)
+    assert restarted.commodities() == commodities and restarted.scans == 0
+
+    # Appending rows rescans that file only
+    wheat = next(data_dir.glob("Wheat*.csv"))
+    with open(wheat, 'a') as f:
+        f.write('Gujarat,Rajkot,Rajkot APMC,Cereals,Wheat,Lokwan,FAQ,"2,500.00","2,900.00","2,700.00",'
+                'Rs./Quintal,12.00,Metric Tonnes,09-02-2026\n')
+    updated = {c['name']: c for c in restarted.commodities()}
+    assert restarted.scans == 1
+    assert updated['Wheat']['date_range']['end'] == '2026-02-09'
+    print("✓ Manifest reused after restart; appended report rescanned alone")
+
+    # Served from memory between directory checks
+    cached = CommodityCatalog(data_dir, manifest, service._categorize_commodity)
+    cached.commodities()
+    start = time.perf_counter()
+    for _ in range(1000):
+        cached.commodities()
+    per_call_us = (time.perf_counter() - start) * 1000
+    shutil.rmtree(data_dir)
+    print(f"✓ {per_call_us:.1f}µs per call")
+    assert per_call_us < 100
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    results = {
+        "Parse matches legacy": test_parse_matches_legacy(),
+        "Repeated calls stay in memory": test_repeated_calls_stay_in_memory(),
+        "Mtime invalidation": test_mtime_invalidation(),
+        "Catalog manifest": test_catalog_manifest()
+    }
+
+    print("\n" + "="*60)
+    for name, passed in results.items():
+        print(f"{'✅' if passed else '❌'} {name}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
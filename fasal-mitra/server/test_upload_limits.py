@@ -0,0 +1,203 @@
+"""
+Upload Limits Test - No Server Required
+
+Checks that image headers are sniffed without decoding, that oversized or
+non-image uploads are rejected after reading only the first chunk, and
+that the middleware refuses an oversized request from its Content-Length,
+and that a chunked upload with no Content-Length is cut off once it passes
+the limit.
+"""
+
+import sys
+import os
+import io
+import asyncio
+
+from PIL import Image
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from fastapi import HTTPException, UploadFile
+
+from app.config import settings
+from app.core.uploads import (
+    read_image_upload, sniff_image_format, sniff_image_size, HEADER_CHUNK_SIZE
+)
+
+
+class CountingFile(io.BytesIO):
+    """BytesIO that records how many bytes were read"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def encode(fmt, size=(640, 480), **kwargs):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (40, 140, 40)).save(buffer, format=fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def upload(data, filename="photo.jpg", size=None):
+    return UploadFile(file=CountingFile(data), filename=filename, size=size)
+
+
+def rejection(data, **kwargs):
+    """(status code, bytes read) for an upload expected to be refused"""
+    file = upload(data, **kwargs)
+    try:
+        asyncio.run(read_image_upload(file))
+    except HTTPException as e:
+        return e.status_code, file.file.bytes_read
+    raise AssertionError("upload was accepted")
+
+
+def test_header_sniffing():
+    """Format and dimensions come from the header for JPEG, PNG and WEBP"""
+    print("="*60)
+    print("🔍 TESTING IMAGE HEADER SNIFFING")
+    print("="*60)
+
+    # 40 KB of EXIF before the frame header
+    jpeg = encode('JPEG', exif=b"Exif\x00\x00" + b"\x00" * 40000)
+    cases = {
+        "jpeg": jpeg,
+        "png": encode('PNG'),
+        "webp": encode('WEBP'),
+        "webp-lossless": encode('WEBP', lossless=True),
+    }
+    for name, data in cases.items():
+        fmt = sniff_image_format(data)
+        assert sniff_image_size(data, fmt) == (640, 480), name
+        # Not enough bytes yet -> ask for more
+        assert sniff_image_size(data[:20], fmt) is None, name
+        print(f"✓ {name}: {fmt} 640x480")
+
+    result = asyncio.run(read_image_upload(upload(jpeg)))
+    assert (result.format, result.width, result.height) == ("jpeg", 640, 480)
+    assert result.data == jpeg
+    print(f"✓ Accepted {result.size_bytes/1024:.1f}KB JPEG as one buffer")
+    return True
+
+
+def test_early_rejection():
+    """Bad uploads are refused after the header chunk, not after a full read"""
+    print("\n" + "="*60)
+    print("🚫 TESTING EARLY REJECTION")
+    print("="*60)
+
+    too_big = encode('PNG', size=(16, 16)) + b"\x00" * (settings.MAX_UPLOAD_SIZE + 1)
+    status, read = rejection(too_big, size=len(too_big))
+    assert status == 413 and read == 0
+    print(f"✓ Declared size over limit: {status}, {read} bytes read")
+
+    status, read = rejection(too_big, size=None)
+    assert status == 413 and read <= settings.MAX_UPLOAD_SIZE + 1 + HEADER_CHUNK_SIZE
+    print(f"✓ Undeclared size over limit: {status}, read stopped at {read} bytes")
+
+    status, read = rejection(b"%PDF-1.7" + b"\x00" * 5_000_000, filename="photo.pdf")
+    assert status == 415 and read == HEADER_CHUNK_SIZE
+    print(f"✓ Not an image: {status}, {read} bytes read")
+
+    # PNG header claiming 100000x100000 pixels
+    bomb = bytearray(encode('PNG') + b"\x00" * 5_000_000)
+    bomb[16:24] = (100000).to_bytes(4, "big") * 2
+    status, read = rejection(bytes(bomb), filename="bomb.png")
+    assert status == 400 and read == HEADER_CHUNK_SIZE
+    print(f"✓ Oversized dimensions: {status}, {read} bytes read")
+
+    status, _ = rejection(b"")
+    assert status == 400
+    print("✓ Empty file: 400")
+    return True
+
+
+def test_content_length_middleware():
+    """Requests declaring a body over the limit never reach the endpoint"""
+    print("\n" + "="*60)
+    print("📏 TESTING CONTENT-LENGTH LIMIT")
+    print("="*60)
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    payload = encode('JPEG') + b"\x00" * (settings.MAX_UPLOAD_SIZE + 256 * 1024)
+    response = client.post(
+        "/api/v1/disease/detect",
+        files={"file": ("photo.jpg", payload, "image/jpeg")},
+        data={"crop_type": "Tomato"}
+    )
+    assert response.status_code == 413, response.status_code
+    # Refused by the middleware, not by the endpoint's per-file check
+    assert response.json()["message"].startswith("Upload exceeds"), response.json()
+    print(f"✓ /disease/detect with {len(payload)/1024/1024:.1f}MB: {response.status_code}")
+
+    response = client.post(
+        "/api/v1/soil/analyze-image",
+        files={"image": ("soil.txt", b"not an image", "image/jpeg")},
+        data={"state": "Punjab", "crop": "Wheat"}
+    )
+    assert response.status_code == 415, response.status_code
+    print(f"✓ /soil/analyze-image with a non-image: {response.status_code}")
+    return True
+
+
+def test_chunked_upload_limit():
+    """A chunked body with no Content-Length is refused once it passes the limit"""
+    print("\n" + "="*60)
+    print("📦 TESTING CHUNKED UPLOAD LIMIT")
+    print("="*60)
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    boundary = "limit-test"
+    head = (f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="photo.jpg"\r\n'
+            "Content-Type: image/jpeg\r\n\r\n").encode() + encode('JPEG')
+    chunk = b"\x00" * (256 * 1024)
+
+    def body():
+        yield head
+        # Well over the limit, streamed without a Content-Length
+        for _ in range(settings.MAX_UPLOAD_SIZE // len(chunk) * 2):
+            yield chunk
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    client = TestClient(app)
+    response = client.post(
+        "/api/v1/disease/detect",
+        content=body(),
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+    assert response.status_code == 413, response.status_code
+    assert response.json()["message"].startswith("Upload exceeds"), response.json()
+    print(f"✓ Chunked upload refused with {response.status_code}")
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    results = {
+        "Header sniffing": test_header_sniffing(),
+        "Early rejection": test_early_rejection(),
+        "Content-Length limit": test_content_length_middleware(),
+        "Chunked upload limit": test_chunked_upload_limit()
+    }
+
+    print("\n" + "="*60)
+    for name, passed in results.items():
+        print(f"{'✅' if passed else '❌'} {name}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,187 @@
+"""
+Weather Tile Cache Test - No Server Required
+
+Points WeatherServiceAPI at a local stub of the Open-Meteo endpoints and
+checks that nearby coordinates share one upstream call, that concurrent
+misses are coalesced, that a cancelled caller doesn't cancel the fetch for
+the others, and that failures are not cached.
+"""
+
+import sys
+import os
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from app.core.tile_cache import TileCache
+from app.services.weather_service import WeatherServiceAPI
+
+
+class StubOpenMeteo(BaseHTTPRequestHandler):
+    """Counts calls per path and answers with a fixed payload"""
+
+    calls = {}
+    fail = False
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        StubOpenMeteo.calls[path] = StubOpenMeteo.calls.get(path, 0) + 1
+        time.sleep(0.2)  # Slow upstream so concurrent requests overlap
+
+        if StubOpenMeteo.fail:
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        if path == '/reverse':
+            body = {'results': [{'name': 'Stubpur', 'country': 'India', 'admin1': 'Punjab'}]}
+        else:
+            body = {
+                'current': {'temperature_2m': 30.0, 'relative_humidity_2m': 60,
+                            'precipitation': 0.0, 'wind_speed_10m': 5.0,
+                            'weather_code': 1, 'time': '2024-06-01T12:00'},
+                'daily': {'time': ['2024-06-01'], 'temperature_2m_max': [35.0],
+                          'temperature_2m_min': [25.0], 'precipitation_sum': [0.0],
+                          'wind_speed_10m_max': [10.0], 'weather_code': [1]}
+            }
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubOpenMeteo)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_service(server):
+    service = WeatherServiceAPI()
+    host, port = server.server_address
+    service.base_url = f"http://{host}:{port}/forecast"
+    service.geocoding_url = f"http://{host}:{port}/reverse"
+    return service
+
+
+def test_nearby_requests_share_tile():
+    """Concurrent requests a few hundred metres apart -> one upstream call each"""
+    print("="*60)
+    print("🌦️ TESTING WEATHER TILE CACHE")
+    print("="*60)
+
+    server = start_stub()
+    StubOpenMeteo.calls = {}
+    service = make_service(server)
+
+    async def run():
+        coords = [(30.9010 + i * 0.001, 75.8573 + i * 0.001) for i in range(10)]
+        results = await asyncio.gather(*[service.get_forecast(lat, lon) for lat, lon in coords])
+        await service.close()
+        return results
+
+    results = asyncio.run(run())
+    server.shutdown()
+
+    assert all(r['location_name'] == 'Stubpur' for r in results)
+    assert StubOpenMeteo.calls.get('/forecast') == 1, StubOpenMeteo.calls
+    assert StubOpenMeteo.calls.get('/reverse') == 1, StubOpenMeteo.calls
+
+    stats = {c['name']: c for c in service.cache_stats()['caches']}
+    assert stats['weather_forecast']['misses'] == 1
+    assert stats['weather_forecast']['coalesced'] == 9
+    print(f"✓ 10 requests -> upstream calls {StubOpenMeteo.calls}")
+    return True
+
+
+def test_cancelled_caller_keeps_fetch():
+    """The first caller going away doesn't cancel the fetch for the others"""
+    print("\n" + "="*60)
+    print("🔌 TESTING CANCELLED CALLER")
+    print("="*60)
+
+    cache = TileCache("test", ttl_seconds=60)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "forecast"
+
+    async def run():
+        first = asyncio.create_task(cache.get_or_fetch("tile", fetch))
+        await asyncio.sleep(0)
+        others = [asyncio.create_task(cache.get_or_fetch("tile", fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        first.cancel()  # e.g. the first client disconnected
+        results = await asyncio.gather(*others)
+        return first, results
+
+    first, results = asyncio.run(run())
+
+    assert first.cancelled()
+    assert results == ["forecast"] * 3
+    assert len(calls) == 1
+    assert cache.stats()['entries'] == 1
+    print(f"✓ 3 waiters got the result after the first caller was cancelled; {len(calls)} upstream call")
+    return True
+
+
+def test_failures_not_cached():
+    """A failed upstream call is retried on the next request"""
+    print("\n" + "="*60)
+    print("🚫 TESTING FAILURES ARE NOT CACHED")
+    print("="*60)
+
+    server = start_stub()
+    StubOpenMeteo.calls = {}
+    service = make_service(server)
+
+    async def run():
+        StubOpenMeteo.fail = True
+        try:
+            await service.get_current_weather(28.6139, 77.2090)
+            raise AssertionError("expected upstream error")
+        except Exception as e:
+            assert "503" in str(e)
+        StubOpenMeteo.fail = False
+        result = await service.get_current_weather(28.6139, 77.2090)
+        await service.close()
+        return result
+
+    result = asyncio.run(run())
+    server.shutdown()
+
+    assert result['temperature'] == 30.0
+    assert StubOpenMeteo.calls.get('/forecast') == 2, StubOpenMeteo.calls
+    print(f"✓ Retried after failure: {StubOpenMeteo.calls}")
+    return True
+
+
+def run_all_tests():
+    """Run all tests"""
+    results = {
+        "Nearby requests share tile": test_nearby_requests_share_tile(),
+        "Cancelled caller keeps fetch": test_cancelled_caller_keeps_fetch(),
+        "Failures not cached": test_failures_not_cached()
+    }
+
+    print("\n" + "="*60)
+    for name, passed in results.items():
+        print(f"{'✅' if passed else '❌'} {name}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
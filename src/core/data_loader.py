@@ -9,6 +9,8 @@ import numpy as np
 from pathlib import Path
 import os
 
+from src.core.dataset_cache import load_csv_cached
+
 class DataLoader:
     """Centralized data loading and preprocessing for farming advisory system."""
     
@@ -20,13 +22,17 @@ class DataLoader:
         self.merged_data = None
         
     def load_datasets(self):
-        """Load all three core datasets."""
+        """Load all three core datasets (from the binary cache when it is up to date)."""
         print("Loading agricultural datasets...")
         
         # Load crop yield data
         crop_file = self.data_dir / "data/raw/crop_yield.csv"
         if crop_file.exists():
-            self.crop_data = pd.read_csv(crop_file)
+            self.crop_data = load_csv_cached(
+                crop_file,
+                strip_columns=['crop', 'season', 'state'],
+                categorical_columns=['crop', 'season', 'state']
+            )
             print(f"✅ Loaded crop data: {len(self.crop_data):,} records")
         else:
             raise FileNotFoundError(f"Crop yield data not found: {crop_file}")
@@ -34,7 +40,7 @@ class DataLoader:
         # Load soil data
         soil_file = self.data_dir / "data/raw/state_soil_data.csv"
         if soil_file.exists():
-            self.soil_data = pd.read_csv(soil_file)
+            self.soil_data = load_csv_cached(soil_file, strip_columns=['state'])
             print(f"✅ Loaded soil data: {len(self.soil_data):,} records")
         else:
             raise FileNotFoundError(f"Soil data not found: {soil_file}")
@@ -42,7 +48,11 @@ class DataLoader:
         # Load weather data
         weather_file = self.data_dir / "data/raw/state_weather_data_1997_2020.csv"
         if weather_file.exists():
-            self.weather_data = pd.read_csv(weather_file)
+            self.weather_data = load_csv_cached(
+                weather_file,
+                strip_columns=['state'],
+                categorical_columns=['state']
+            )
             print(f"✅ Loaded weather data: {len(self.weather_data):,} records")
         else:
             raise FileNotFoundError(f"Weather data not found: {weather_file}")
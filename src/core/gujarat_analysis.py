@@ -10,6 +10,8 @@ from sklearn.preprocessing import LabelEncoder
 import warnings
 warnings.filterwarnings('ignore')
 
+from src.core.model_store import ModelArtifactStore, fingerprint_training_data
+
 class GujaratDataLoader:
     """Load and process Gujarat-specific datasets"""
     
@@ -179,44 +181,68 @@ class GujaratEnhancedPredictor:
         
         all_features = categorical_features + numerical_features
         
+        model_params = {
+            'n_estimators': 200,  # More trees for Gujarat-specific model
+            'max_depth': 20,
+            'min_samples_split': 3,
+            'min_samples_leaf': 2,
+            'random_state': 42
+        }
+        
+        # Reuse the saved model unless the Gujarat training data or settings changed
+        fingerprint = fingerprint_training_data(
+            enhanced_data[all_features + ['yield']],
+            {'features': all_features, 'model': model_params}
+        )
+        payload = ModelArtifactStore().load_or_train(
+            "gujarat_model",
+            fingerprint,
+            lambda: self._fit_model(enhanced_data, categorical_features, all_features, model_params)
+        )
+        self.model = payload['model']
+        self.label_encoders = payload['label_encoders']
+        score = payload['score']
+        
+        # Feature importance
+        feature_importance = pd.DataFrame({
+            'feature': all_features,
+            'importance': self.model.feature_importances_
+        }).sort_values('importance', ascending=False)
+        
+        print("\n📊 Top 5 Important Features for Gujarat:")
+        for idx, row in feature_importance.head(5).iterrows():
+            print(f"   {row['feature']}: {row['importance']:.4f}")
+        
+        return score
+    
+    def _fit_model(self, enhanced_data, categorical_features, all_features, model_params):
+        """Fit the Gujarat random forest; returns (artifact payload, metrics)"""
         # Prepare data
         X = enhanced_data[all_features].copy()
         y = enhanced_data['yield'].values
         
         # Encode categorical variables
+        label_encoders = {}
         for col in categorical_features:
             le = LabelEncoder()
             X[col] = le.fit_transform(X[col].astype(str))
-            self.label_encoders[col] = le
+            label_encoders[col] = le
         
         # Train model
-        self.model = RandomForestRegressor(
-            n_estimators=200,  # More trees for Gujarat-specific model
-            max_depth=20,
-            min_samples_split=3,
-            min_samples_leaf=2,
-            random_state=42,
-            n_jobs=-1
-        )
-        
-        self.model.fit(X, y)
+        model = RandomForestRegressor(**model_params, n_jobs=-1)
+        model.fit(X, y)
         
         # Calculate accuracy
-        score = self.model.score(X, y)
+        score = model.score(X, y)
         print(f"✅ Gujarat-specific model trained!")
         print(f"   Model R² score: {score:.4f}")
         
-        # Feature importance
-        feature_importance = pd.DataFrame({
-            'feature': all_features,
-            'importance': self.model.feature_importances_
-        }).sort_values('importance', ascending=False)
-        
-        print("\n📊 Top 5 Important Features for Gujarat:")
-        for idx, row in feature_importance.head(5).iterrows():
-            print(f"   {row['feature']}: {row['importance']:.4f}")
-        
-        return score
+        payload = {
+            'model': model,
+            'label_encoders': label_encoders,
+            'score': score
+        }
+        return payload, {'r2': round(score, 4)}
     
     def predict_with_gujarat_context(self, crop, season, fertilizer, area=1.0):
         """Make prediction with Gujarat-specific context"""
@@ -0,0 +1,105 @@
+"""
+Model Artifact Store
+
+Saves trained models to disk so the Streamlit pages and console app load a
+fitted model instead of retraining it on every start. Artifacts are keyed by a
+fingerprint of the training data and parameters, so a model is retrained only
+when the data (or the model settings) change.
+
+Layout: models/artifacts/<name>/<fingerprint prefix>/{model.joblib, meta.json}
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+# Bump when the payload layout changes so old artifacts are ignored
+ARTIFACT_VERSION = 1
+
+DEFAULT_ARTIFACT_DIR = Path(__file__).parent.parent.parent / "models" / "artifacts"
+
+
+def fingerprint_training_data(data, params):
+    """Hash the training frame content together with the training parameters."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(list(data.columns)).encode())
+    row_hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    digest.update(np.ascontiguousarray(row_hashes).tobytes())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    digest.update(f"v{ARTIFACT_VERSION}-sklearn{sklearn.__version__}".encode())
+    return digest.hexdigest()
+
+
+class ModelArtifactStore:
+    """Load-or-train cache for fitted models."""
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else DEFAULT_ARTIFACT_DIR
+
+    def _artifact_dir(self, name, fingerprint):
+        return self.root / name / fingerprint[:16]
+
+    def load(self, name, fingerprint):
+        """Load an artifact for this fingerprint, or None if missing/outdated."""
+        artifact_dir = self._artifact_dir(name, fingerprint)
+        meta_file = artifact_dir / "meta.json"
+        model_file = artifact_dir / "model.joblib"
+
+        if not meta_file.exists() or not model_file.exists():
+            return None
+
+        try:
+            meta = json.loads(meta_file.read_text())
+            if meta.get("fingerprint") != fingerprint or meta.get("version") != ARTIFACT_VERSION:
+                return None
+            return joblib.load(model_file, mmap_mode='r')
+        except Exception as e:
+            print(f"⚠️ Could not load {name} artifact: {e}")
+            return None
+
+    def save(self, name, fingerprint, payload, metrics=None):
+        """Write an artifact atomically (temp file + rename)."""
+        artifact_dir = self._artifact_dir(name, fingerprint)
+        artifact_dir.mkdir(parents=True, exist_ok=True)
+
+        tmp_model = artifact_dir / f"model.joblib.{os.getpid()}.tmp"
+        joblib.dump(payload, tmp_model)
+        os.replace(tmp_model, artifact_dir / "model.joblib")
+
+        meta = {
+            "name": name,
+            "fingerprint": fingerprint,
+            "version": ARTIFACT_VERSION,
+            "sklearn_version": sklearn.__version__,
+            "created_at": datetime.now().isoformat(),
+            "metrics": metrics or {}
+        }
+        tmp_meta = artifact_dir / f"meta.json.{os.getpid()}.tmp"
+        tmp_meta.write_text(json.dumps(meta, indent=2))
+        os.replace(tmp_meta, artifact_dir / "meta.json")
+        return artifact_dir
+
+    def load_or_train(self, name, fingerprint, train_fn):
+        """
+        Return the stored artifact for this fingerprint, training it if missing.
+
+        train_fn must return (payload, metrics).
+        """
+        payload = self.load(name, fingerprint)
+        if payload is not None:
+            print(f"✅ Loaded saved {name} ({fingerprint[:12]})")
+            return payload
+
+        payload, metrics = train_fn()
+        try:
+            self.save(name, fingerprint, payload, metrics)
+        except OSError as e:
+            print(f"⚠️ Could not save {name} artifact: {e}")
+        return payload
@@ -10,12 +10,19 @@ from datetime import datetime
 import random
 from PIL import Image
 import io
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.features.image_analysis_context import ImageAnalysisContext
 
 class CropDiseaseDetector:
     """AI-powered crop disease detection and treatment recommendation system."""
     
-    def __init__(self, data_loader=None):
+    def __init__(self, data_loader=None, max_analysis_pixels=ImageAnalysisContext.DEFAULT_MAX_PIXELS):
         self.data_loader = data_loader
+        # Photos are analyzed at no more than this many pixels (None = full resolution)
+        self.max_analysis_pixels = max_analysis_pixels
         
         # Disease database with comprehensive information
         self.disease_database = {
@@ -204,6 +211,32 @@ class CropDiseaseDetector:
         
         return base_analysis
     
+    def analyze_images(self, images, crop_type="Unknown", location="Unknown", max_workers=None):
+        """
+        Analyze several photos in parallel, yielding (index, analysis) as each finishes.
+        
+        Photos are spread over a process pool sized to the CPU cores, so a
+        multi-photo submission takes about as long as its slowest photo.
+        Falls back to analyzing in this process for a single photo or core.
+        
+        Args:
+            images: List of raw image bytes
+            max_workers: Pool size (default: number of CPU cores)
+        """
+        workers = min(max_workers or os.cpu_count() or 1, len(images))
+        if workers <= 1:
+            for index, image_data in enumerate(images):
+                yield index, self.analyze_image(image_data, crop_type, location)
+            return
+        
+        pool = _get_analysis_pool(max_workers or os.cpu_count())
+        futures = {
+            pool.submit(_analyze_in_worker, image_data, crop_type, location, self.max_analysis_pixels): index
+            for index, image_data in enumerate(images)
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    
     def get_enhanced_treatment_plan(self, disease_id, severity, crop_type, location=None):
         """Get enhanced treatment plan with location-specific recommendations."""
         
@@ -253,16 +286,10 @@ class CropDiseaseDetector:
         Only analyzes images that actually contain crops/plants.
         """
         
-        # Simulate image processing time
-        import time
-        time.sleep(1.5)
-        
         # Analyze actual image properties and validate if it contains crops
         try:
-            from PIL import Image
-            import io
-            image = Image.open(io.BytesIO(image_data))
-            image_width, image_height = image.size
+            # Large JPEGs are decoded straight to the bounded working resolution
+            image = ImageAnalysisContext.from_bytes(image_data, max_pixels=self.max_analysis_pixels)
             
             # First, validate if this image actually contains crops/plants
             is_crop_image, validation_result = self._validate_crop_image(image)
@@ -318,13 +345,16 @@ class CropDiseaseDetector:
         """
         Ultra-robust validation to ensure only genuine crop/plant images are analyzed.
         Uses multiple strict validation layers with weighted scoring.
+        Accepts a PIL image or an ImageAnalysisContext.
         Returns (is_valid, validation_details)
         """
-        import numpy as np
         
-        # Convert PIL image to RGB array for analysis
-        img_array = np.array(image.convert('RGB'))
-        height, width, channels = img_array.shape
+        # Working-resolution pixels plus lazily computed maps shared by every check
+        if isinstance(image, ImageAnalysisContext):
+            context = image
+        else:
+            context = ImageAnalysisContext(image, max_pixels=self.max_analysis_pixels)
+        img_array = context.rgb
         
         # Initialize validation system with strict scoring
         validation_scores = {
@@ -344,17 +374,17 @@ class CropDiseaseDetector:
         # === STRICT VALIDATION CHECKS ===
         
         # 1. ENHANCED GREEN CONTENT ANALYSIS (HSV-based)
-        green_score, green_details = self._advanced_green_analysis(img_array)
+        green_score, green_details = self._advanced_green_analysis(context)
         validation_scores['green_content'] = green_score
         validation_details.extend(green_details)
         
         # 2. PLANT STRUCTURE DETECTION
-        structure_score, structure_details = self._detect_plant_structures(img_array)
+        structure_score, structure_details = self._detect_plant_structures(context)
         validation_scores['plant_structure'] = structure_score
         validation_details.extend(structure_details)
         
         # 3. ARTIFICIAL PATTERN REJECTION
-        artificial_score, artificial_details = self._detect_artificial_patterns(img_array)
+        artificial_score, artificial_details = self._detect_artificial_patterns(context)
         validation_scores['artificial_patterns'] = artificial_score
         validation_details.extend(artificial_details)
         if artificial_score < -2:  # Strong artificial indicators
@@ -366,22 +396,22 @@ class CropDiseaseDetector:
         validation_details.extend(bg_details)
         
         # 5. ENHANCED ORGANIC SHAPE ANALYSIS
-        organic_score, organic_details = self._advanced_organic_analysis(img_array)
+        organic_score, organic_details = self._advanced_organic_analysis(context)
         validation_scores['organic_shapes'] = organic_score
         validation_details.extend(organic_details)
         
         # 6. SOPHISTICATED TEXTURE ANALYSIS
-        texture_score, texture_details = self._advanced_texture_analysis(img_array)
+        texture_score, texture_details = self._advanced_texture_analysis(context)
         validation_scores['natural_texture'] = texture_score
         validation_details.extend(texture_details)
         
         # 7. ENHANCED COLOR DIVERSITY
-        color_score, color_details = self._advanced_color_analysis(img_array)
+        color_score, color_details = self._advanced_color_analysis(context)
         validation_scores['color_diversity'] = color_score
         validation_details.extend(color_details)
         
         # 8. ADVANCED EDGE PATTERN ANALYSIS
-        edge_score, edge_details = self._advanced_edge_analysis(img_array)
+        edge_score, edge_details = self._advanced_edge_analysis(context)
         validation_scores['edge_patterns'] = edge_score
         validation_details.extend(edge_details)
         
@@ -411,6 +441,7 @@ class CropDiseaseDetector:
                 'details': validation_details,
                 'rejection_reasons': rejection_flags,
                 'detected_content': self._classify_non_crop_image_advanced(img_array, validation_scores),
+                'analysis_memory': context.memory_report(),
                 'message': f"❌ Image rejected: {'; '.join(rejection_flags)}",
                 'suggestions': [
                     "📸 Upload a photo of real crops, plants, or agricultural fields",
@@ -470,45 +501,56 @@ class CropDiseaseDetector:
                 ]
             }
         
+        validation_result['analysis_memory'] = context.memory_report()
         return is_valid, validation_result
     
-    def _advanced_green_analysis(self, img_array):
+    @staticmethod
+    def _histogram_variance(counts):
+        """Variance of integer values 0..len(counts)-1 given their counts."""
+        total = counts.sum()
+        if total == 0:
+            return 0.0
+        values = np.arange(len(counts), dtype=np.float64)
+        mean = np.dot(counts, values) / total
+        return float(np.dot(counts, (values - mean) ** 2) / total)
+    
+    @staticmethod
+    def _binned_histogram(counts, bins):
+        """
+        np.histogram(values, bins) computed from per-value counts of integer data
+        (equal-width bins spanning the data's min..max, as numpy does by default).
+        """
+        present = np.flatnonzero(counts)
+        if len(present) == 0:
+            return np.zeros(bins, dtype=np.int64)
+        values = np.arange(len(counts))
+        return np.histogram(values, bins=bins, range=(present[0], present[-1]), weights=counts)[0]
+    
+    def _advanced_green_analysis(self, context):
         """Advanced green content analysis using HSV color space for better plant detection."""
         try:
-            # Convert RGB to HSV for better color analysis
-            rgb_normalized = img_array.astype(float) / 255.0
-            
-            # Manual RGB to HSV conversion (simplified)
-            r, g, b = rgb_normalized[:,:,0], rgb_normalized[:,:,1], rgb_normalized[:,:,2]
+            # Integer arithmetic on the 0-255 values (no full-size float copies)
+            img_array = context.rgb
+            r, g, b = img_array[:, :, 0], img_array[:, :, 1], img_array[:, :, 2]
+            green_max = (g >= r) & (g >= b)
             
             # Green detection in multiple ways
-            # 1. Simple green dominance
-            green_dominant = (g > r) & (g > b) & (g > 0.25)
+            # 1. Simple green dominance (g > 0.25 on the 0-1 scale)
+            green_dominant = (g > r) & (g > b) & (g >= 64)
             
             # 2. Plant-like green colors (HSV approximation)
             # Plants typically have hue 60-180 degrees (green-yellow to blue-green)
-            max_rgb = np.maximum(np.maximum(r, g), b)
-            min_rgb = np.minimum(np.minimum(r, g), b)
-            delta = max_rgb - min_rgb
-            
-            # Avoid division by zero
-            safe_delta = np.where(delta == 0, 1, delta)
-            
-            # Simplified hue calculation for green detection
-            hue_green_like = np.where(
-                (max_rgb == g) & (delta > 0.1),  # Green is dominant with sufficient saturation
-                True,
-                False
-            )
+            # Green is dominant with sufficient saturation (delta = g - min(r, b) > 0.1)
+            hue_green_like = green_max & (g - np.minimum(r, b) >= 26)
             
             # 3. Vegetation indices (simplified NDVI-like)
             # Plants reflect more in near-infrared, but we approximate with green vs red
-            vegetation_index = (g - r) / np.maximum(g + r, 0.01)
-            high_vegetation = vegetation_index > 0.1
+            # (g - r) / (g + r) > 0.1  <=>  9g > 11r
+            high_vegetation = 9 * g.astype(np.uint16) > 11 * r.astype(np.uint16)
             
             # Combine all green indicators
             plant_green_pixels = green_dominant | hue_green_like | high_vegetation
-            green_percentage = np.sum(plant_green_pixels) / plant_green_pixels.size
+            green_percentage = np.count_nonzero(plant_green_pixels) / plant_green_pixels.size
             
             # Score based on green content percentage
             if green_percentage > 0.4:  # >40% plant-like pixels
@@ -526,29 +568,27 @@ class CropDiseaseDetector:
             else:
                 score = 0.0
                 detail = f"❌ Very low/no plant green content ({green_percentage:.1%})"
-                
-            return score, [detail]
             
+            return score, [detail]
+        
         except Exception:
             return 0.5, ["⚠️ Green analysis failed - using default"]
     
-    def _detect_plant_structures(self, img_array):
+    def _detect_plant_structures(self, context):
         """Detect plant-like structures: leaves, stems, branches, veins."""
         try:
-            # Convert to grayscale for structural analysis
-            gray = np.mean(img_array, axis=2).astype(np.uint8)
             
             # Detect linear structures (stems/branches)
-            linear_score = self._detect_linear_structures(gray)
+            linear_score = self._detect_linear_structures(context)
             
             # Detect leaf-like shapes (oval/elongated structures)
-            leaf_score = self._detect_leaf_shapes(gray)
+            leaf_score = self._detect_leaf_shapes(context)
             
             # Detect vein-like patterns
-            vein_score = self._detect_vein_patterns(gray)
+            vein_score = self._detect_vein_patterns(context)
             
             # Detect clustered organic structures
-            cluster_score = self._detect_organic_clusters(gray)
+            cluster_score = self._detect_organic_clusters(context)
             
             total_structure_score = (linear_score + leaf_score + vein_score + cluster_score) / 4
             
@@ -566,89 +606,89 @@ class CropDiseaseDetector:
                 details.append("❌ No clear plant structures identified")
             elif total_structure_score < 0.3:
                 details.append("⚠️ Weak plant structural indicators")
-                
-            return total_structure_score * 3, details  # Scale up for scoring
             
+            return total_structure_score * 3, details  # Scale up for scoring
+        
         except Exception:
             return 0.0, ["❌ Plant structure analysis failed"]
     
-    def _detect_artificial_patterns(self, img_array):
+    def _detect_artificial_patterns(self, context):
         """Detect artificial patterns that indicate non-plant images."""
         try:
             artificial_indicators = 0
             details = []
             
             # 1. Check for solid color blocks (logos/icons)
-            solid_blocks = self._detect_solid_blocks(img_array)
+            solid_blocks = self._detect_solid_blocks(context.rgb)
             if solid_blocks > 0.3:
                 artificial_indicators += 2
                 details.append("❌ Solid color blocks detected (logo/icon pattern)")
             
             # 2. Check for perfect geometric shapes
-            geometric_shapes = self._detect_geometric_shapes(img_array)
+            geometric_shapes = self._detect_geometric_shapes(context)
             if geometric_shapes > 0.4:
                 artificial_indicators += 2
                 details.append("❌ Perfect geometric shapes detected")
             
             # 3. Check for limited color palette (graphics)
-            color_palette_size = self._estimate_color_palette(img_array)
+            color_palette_size = self._estimate_color_palette(context.rgb)
             if color_palette_size < 50:  # Very limited colors
                 artificial_indicators += 1
                 details.append("❌ Very limited color palette (graphic/icon)")
             
             # 4. Check for artificial edges (perfect lines)
-            artificial_edges = self._detect_artificial_edges(img_array)
+            artificial_edges = self._detect_artificial_edges(context)
             if artificial_edges > 0.5:
                 artificial_indicators += 1
                 details.append("❌ Artificial/perfect edge patterns")
             
             # 5. Check for text/symbols
-            text_patterns = self._detect_text_patterns(img_array)
+            text_patterns = self._detect_text_patterns(context)
             if text_patterns > 0.3:
                 artificial_indicators += 2
                 details.append("❌ Text or symbol patterns detected")
             
             # Return negative score for artificial patterns (penalty)
             return -artificial_indicators, details
-            
+        
         except Exception:
             return 0, ["⚠️ Artificial pattern analysis failed"]
     
     def _detect_solid_blocks(self, img_array):
         """Detect large solid color areas typical of logos/icons."""
-        # Calculate local color variance
+        # Calculate local color variance over non-overlapping blocks
         height, width = img_array.shape[:2]
         block_size = min(20, height//10, width//10)
         
         if block_size < 5:
             return 0
         
-        solid_area = 0
-        total_area = 0
+        # Same block grid as stepping by block_size while a full block fits before the edge
+        rows = len(range(0, height - block_size, block_size))
+        cols = len(range(0, width - block_size, block_size))
+        if rows == 0 or cols == 0:
+            return 0
         
-        for i in range(0, height - block_size, block_size):
-            for j in range(0, width - block_size, block_size):
-                block = img_array[i:i+block_size, j:j+block_size]
-                variance = np.var(block)
-                
-                if variance < 50:  # Very low variance = solid color
-                    solid_area += block_size * block_size
-                total_area += block_size * block_size
+        # View the image as (rows, block, cols, block, channel) and reduce each block
+        blocks = img_array[:rows * block_size, :cols * block_size].reshape(
+            rows, block_size, cols, block_size, -1
+        )
+        n = block_size * block_size * blocks.shape[-1]
+        sums = blocks.sum(axis=(1, 3, 4), dtype=np.int64)
+        sq_sums = np.square(blocks, dtype=np.uint32).sum(axis=(1, 3, 4), dtype=np.int64)
+        variance = (sq_sums - sums.astype(np.float64) ** 2 / n) / n
         
-        return solid_area / max(total_area, 1)
+        # Very low variance = solid color
+        return float(np.mean(variance < 50))
     
-    def _detect_geometric_shapes(self, img_array):
+    def _detect_geometric_shapes(self, context):
         """Detect perfect circles, rectangles, triangles."""
         # Simplified geometric shape detection
-        gray = np.mean(img_array, axis=2).astype(np.uint8)
-        
-        # Edge detection (simplified)
-        edges_x = np.abs(np.diff(gray, axis=1))
-        edges_y = np.abs(np.diff(gray, axis=0))
+        gray, edges_x, edges_y = context.gray, context.edges_x, context.edges_y
         
         # Count perfect horizontal/vertical lines
-        horizontal_lines = np.sum(np.max(edges_x, axis=1) > 50)
-        vertical_lines = np.sum(np.max(edges_y, axis=0) > 50)
+        horizontal_lines = np.count_nonzero(edges_x.max(axis=1) > 50)
+        vertical_lines = np.count_nonzero(edges_y.max(axis=0) > 50)
         
         total_lines = horizontal_lines + vertical_lines
         image_perimeter = 2 * (gray.shape[0] + gray.shape[1])
@@ -657,72 +697,67 @@ class CropDiseaseDetector:
     
     def _estimate_color_palette(self, img_array):
         """Estimate the number of distinct colors in the image."""
-        # Reduce precision to count meaningful color differences
-        reduced = img_array // 8  # Reduce to 32 levels per channel
-        reshaped = reduced.reshape(-1, 3)
+        # Reduce precision to count meaningful color differences (32 levels per channel)
+        # and pack each color into one 15-bit code instead of sorting RGB rows
+        codes = (img_array[:, :, 0] >> 3).astype(np.uint16)
+        codes <<= 5
+        codes |= img_array[:, :, 1] >> 3
+        codes <<= 5
+        codes |= img_array[:, :, 2] >> 3
         
         # Count unique colors
-        unique_colors = np.unique(reshaped, axis=0)
-        return len(unique_colors)
+        return int(np.count_nonzero(np.bincount(codes.ravel(), minlength=1 << 15)))
     
-    def _detect_artificial_edges(self, img_array):
+    def _detect_artificial_edges(self, context):
         """Detect perfectly straight edges typical of graphics."""
-        gray = np.mean(img_array, axis=2).astype(np.uint8)
-        
-        # Simple edge detection
-        edges_x = np.abs(np.diff(gray, axis=1))
-        edges_y = np.abs(np.diff(gray, axis=0))
+        edges_x, edges_y = context.edges_x, context.edges_y
         
         # Count very strong edges (artificial)
-        strong_edges = np.sum(edges_x > 100) + np.sum(edges_y > 100)
-        total_pixels = gray.size
+        strong_edges = np.count_nonzero(edges_x > 100) + np.count_nonzero(edges_y > 100)
+        total_pixels = context.gray.size
         
         return min(1.0, strong_edges / (total_pixels * 0.05))
     
-    def _detect_text_patterns(self, img_array):
+    def _detect_text_patterns(self, context):
         """Detect text-like patterns in the image."""
         # Simplified text detection based on edge patterns
-        gray = np.mean(img_array, axis=2).astype(np.uint8)
-        
         # Text typically has high horizontal edge density
-        edges_x = np.abs(np.diff(gray, axis=1))
+        edges_x = context.edges_x
         
         # Look for rows with many edge transitions (text lines)
-        row_edges = np.sum(edges_x > 30, axis=1)
-        text_like_rows = np.sum(row_edges > len(edges_x[0]) * 0.2)
+        row_edges = np.count_nonzero(edges_x > 30, axis=1)
+        text_like_rows = np.count_nonzero(row_edges > edges_x.shape[1] * 0.2)
         
-        return min(1.0, text_like_rows / max(gray.shape[0] * 0.3, 1))
+        return min(1.0, text_like_rows / max(context.gray.shape[0] * 0.3, 1))
     
-    def _detect_linear_structures(self, gray):
+    def _detect_linear_structures(self, context):
         """Detect linear structures like plant stems."""
-        edges = np.abs(np.diff(gray, axis=0)) + np.abs(np.diff(gray.T, axis=0)).T
-        linear_strength = np.mean(edges > 20)
+        linear_strength = np.count_nonzero(context.edges > 20) / max(context.edges.size, 1)
         return min(1.0, linear_strength * 2)
     
-    def _detect_leaf_shapes(self, gray):
+    def _detect_leaf_shapes(self, context):
         """Detect oval/leaf-like shapes."""
         # Simplified leaf detection based on edge curvature
-        edges_x = np.abs(np.diff(gray, axis=1))
-        edges_y = np.abs(np.diff(gray, axis=0))
+        edges_x, edges_y = context.edges_x, context.edges_y
         
-        curved_edges = np.sum((edges_x > 15) & (edges_x < 80)) + np.sum((edges_y > 15) & (edges_y < 80))
-        total_edges = np.sum(edges_x > 10) + np.sum(edges_y > 10)
+        curved_edges = np.count_nonzero((edges_x > 15) & (edges_x < 80)) + np.count_nonzero((edges_y > 15) & (edges_y < 80))
+        total_edges = np.count_nonzero(edges_x > 10) + np.count_nonzero(edges_y > 10)
         
         if total_edges == 0:
             return 0
         return min(1.0, curved_edges / total_edges)
     
-    def _detect_vein_patterns(self, gray):
+    def _detect_vein_patterns(self, context):
         """Detect vein-like patterns in leaves."""
         # Look for thin linear structures
-        fine_edges = np.abs(np.diff(gray, axis=1))
-        vein_like = np.sum((fine_edges > 10) & (fine_edges < 40))
-        return min(1.0, vein_like / (gray.size * 0.1))
+        fine_edges = context.edges_x
+        vein_like = np.count_nonzero((fine_edges > 10) & (fine_edges < 40))
+        return min(1.0, vein_like / (context.gray.size * 0.1))
     
-    def _detect_organic_clusters(self, gray):
+    def _detect_organic_clusters(self, context):
         """Detect organic clustering patterns."""
-        # Simple clustering based on local variance
-        local_variance = np.var(gray)
+        # Simple clustering based on intensity variance (from the shared histogram)
+        local_variance = self._histogram_variance(context.gray_hist)
         normalized_variance = min(1.0, local_variance / 1000)
         return normalized_variance
     
@@ -732,7 +767,7 @@ class CropDiseaseDetector:
             # Sample border pixels to analyze background
             border_pixels = np.concatenate([
                 img_array[0, :].flatten(),    # top
-                img_array[-1, :].flatten(),   # bottom  
+                img_array[-1, :].flatten(),   # bottom
                 img_array[:, 0].flatten(),    # left
                 img_array[:, -1].flatten()    # right
             ])
@@ -770,21 +805,20 @@ class CropDiseaseDetector:
                 details.append("⚠️ Background analysis inconclusive")
             
             return score, details
-            
+        
         except Exception:
             return 0, ["⚠️ Background analysis failed"]
     
-    def _advanced_organic_analysis(self, img_array):
+    def _advanced_organic_analysis(self, context):
         """Advanced organic shape analysis with multiple methods."""
         try:
-            gray = np.mean(img_array, axis=2).astype(np.uint8)
             
             # Multiple organic indicators
             scores = []
             details = []
             
             # 1. Edge complexity (organic shapes have complex edges)
-            edge_complexity = self._calculate_edge_complexity(gray)
+            edge_complexity = self._calculate_edge_complexity(context)
             if edge_complexity > 0.6:
                 scores.append(1.0)
                 details.append("✅ Complex organic edge patterns")
@@ -796,7 +830,7 @@ class CropDiseaseDetector:
                 details.append("❌ Simple geometric edges")
             
             # 2. Shape irregularity
-            irregularity = self._calculate_shape_irregularity(gray)
+            irregularity = self._calculate_shape_irregularity(context)
             if irregularity > 0.5:
                 scores.append(1.0)
                 details.append("✅ High shape irregularity (organic)")
@@ -805,39 +839,36 @@ class CropDiseaseDetector:
                 details.append("❌ Regular geometric shapes")
             
             return np.mean(scores) * 2, details  # Scale for scoring system
-            
+        
         except Exception:
             return 0, ["❌ Organic analysis failed"]
     
-    def _calculate_edge_complexity(self, gray):
+    def _calculate_edge_complexity(self, context):
         """Calculate edge complexity for organic vs geometric distinction."""
-        edges = np.abs(np.diff(gray, axis=1)) + np.abs(np.diff(gray.T, axis=1)).T
-        strong_edges = edges > 30
+        strong_edges = context.edges > 30
         
-        if np.sum(strong_edges) == 0:
+        if not strong_edges.any():
             return 0
         
         # Measure edge direction changes (complexity)
-        edge_changes = np.sum(np.abs(np.diff(strong_edges.astype(int), axis=0))) + \
-                      np.sum(np.abs(np.diff(strong_edges.astype(int), axis=1)))
+        edge_changes = np.count_nonzero(strong_edges[1:, :] != strong_edges[:-1, :]) + \
+                      np.count_nonzero(strong_edges[:, 1:] != strong_edges[:, :-1])
         
-        return min(1.0, edge_changes / (gray.size * 0.1))
+        return min(1.0, edge_changes / (context.gray.size * 0.1))
     
-    def _calculate_shape_irregularity(self, gray):
+    def _calculate_shape_irregularity(self, context):
         """Calculate shape irregularity."""
-        # Simple approximation of shape irregularity
-        edges = np.abs(np.diff(gray, axis=1)) + np.abs(np.diff(gray.T, axis=1)).T
-        edge_variance = np.var(edges)
+        # Simple approximation of shape irregularity (gradient magnitudes are 0..510)
+        edge_variance = self._histogram_variance(context.edge_hist)
         return min(1.0, edge_variance / 2000)
     
-    def _advanced_texture_analysis(self, img_array):
+    def _advanced_texture_analysis(self, context):
         """Advanced texture analysis for natural vs artificial surfaces."""
         try:
-            gray = np.mean(img_array, axis=2).astype(np.uint8)
             
             # Calculate multiple texture measures
-            local_variance = self._calculate_local_variance(gray)
-            texture_uniformity = self._calculate_texture_uniformity(gray)
+            local_variance = self._calculate_local_variance(context.gray)
+            texture_uniformity = self._calculate_texture_uniformity(context)
             
             score = 0
             details = []
@@ -846,19 +877,24 @@ class CropDiseaseDetector:
                 score = 2.0
                 details.append("✅ Natural texture patterns detected")
             elif local_variance > 0.15:
-                score = 1.0  
+                score = 1.0
                 details.append("⚠️ Moderate texture variation")
             else:
                 score = 0.0
                 details.append("❌ Smooth/artificial texture")
             
             return score, details
-            
+        
         except Exception:
             return 0, ["❌ Texture analysis failed"]
     
     def _calculate_local_variance(self, gray):
-        """Calculate local variance for texture measurement."""
+        """
+        Calculate local variance for texture measurement.
+        
+        Mean variance of kernel_size x kernel_size patches sampled every
+        kernel_size//2 pixels, with patch sums read from summed-area tables.
+        """
         if gray.size < 100:
             return 0
         
@@ -866,30 +902,46 @@ class CropDiseaseDetector:
         if kernel_size < 3:
             return 0
         
-        variances = []
         step = max(1, kernel_size//2)
+        row_starts = np.arange(0, gray.shape[0] - kernel_size, step)
+        col_starts = np.arange(0, gray.shape[1] - kernel_size, step)
+        if len(row_starts) == 0 or len(col_starts) == 0:
+            return 0
         
-        for i in range(0, gray.shape[0] - kernel_size, step):
-            for j in range(0, gray.shape[1] - kernel_size, step):
-                patch = gray[i:i+kernel_size, j:j+kernel_size]
-                variances.append(np.var(patch))
-        
-        return np.mean(variances) / 255.0 if variances else 0
+        # Squared values reach 255**2 per pixel; int32 prefix sums hold ~33k rows of them
+        prefix_dtype = np.int32 if gray.shape[0] * 255 ** 2 < np.iinfo(np.int32).max else np.int64
+        
+        def patch_sums(values):
+            # Sum over each sampled patch: prefix sums down the rows, then across
+            # the columns of only the sampled row bands
+            column_prefix = np.zeros((values.shape[0] + 1, values.shape[1]), dtype=prefix_dtype)
+            np.cumsum(values, axis=0, dtype=prefix_dtype, out=column_prefix[1:])
+            bands = (column_prefix[row_starts + kernel_size] - column_prefix[row_starts]).astype(np.int64)
+            band_prefix = np.zeros((bands.shape[0], bands.shape[1] + 1), dtype=np.int64)
+            np.cumsum(bands, axis=1, dtype=np.int64, out=band_prefix[:, 1:])
+            return band_prefix[:, col_starts + kernel_size] - band_prefix[:, col_starts]
+        
+        n = kernel_size * kernel_size
+        sums = patch_sums(gray).astype(np.float64)
+        sq_sums = patch_sums(np.square(gray, dtype=np.uint32)).astype(np.float64)
+        variances = (sq_sums - sums ** 2 / n) / n
+        
+        return float(np.mean(variances)) / 255.0
     
-    def _calculate_texture_uniformity(self, gray):
+    def _calculate_texture_uniformity(self, context):
         """Calculate texture uniformity."""
-        hist = np.histogram(gray, bins=32)[0]
+        hist = self._binned_histogram(context.gray_hist, 32)
         hist = hist / np.sum(hist)
         entropy = -np.sum(hist * np.log2(hist + 1e-10))
         return entropy / 5.0  # Normalize
     
-    def _advanced_color_analysis(self, img_array):
+    def _advanced_color_analysis(self, context):
         """Advanced color analysis for natural vs artificial images."""
         try:
             # Analyze color distribution
             colors_per_channel = []
-            for channel in range(3):
-                hist = np.histogram(img_array[:,:,channel], bins=64)[0]
+            for counts in context.channel_hists:
+                hist = self._binned_histogram(counts, 64)
                 colors_per_channel.append(np.sum(hist > 0))
             
             avg_colors = np.mean(colors_per_channel)
@@ -908,30 +960,27 @@ class CropDiseaseDetector:
                 details.append("❌ Limited color palette")
             
             return score, details
-            
+        
         except Exception:
             return 0, ["❌ Color analysis failed"]
     
-    def _advanced_edge_analysis(self, img_array):
+    def _advanced_edge_analysis(self, context):
         """Advanced edge pattern analysis."""
         try:
-            gray = np.mean(img_array, axis=2).astype(np.uint8)
-            
-            edges_x = np.abs(np.diff(gray, axis=1))
-            edges_y = np.abs(np.diff(gray, axis=0))
+            edges_x, edges_y = context.edges_x, context.edges_y
             
             # Natural edges are typically moderate strength
-            natural_edges = np.sum((edges_x > 10) & (edges_x < 60)) + np.sum((edges_y > 10) & (edges_y < 60))
-            artificial_edges = np.sum(edges_x > 100) + np.sum(edges_y > 100)
+            natural_edges = np.count_nonzero((edges_x > 10) & (edges_x < 60)) + np.count_nonzero((edges_y > 10) & (edges_y < 60))
+            artificial_edges = np.count_nonzero(edges_x > 100) + np.count_nonzero(edges_y > 100)
             
             if natural_edges > artificial_edges * 2:
                 return 1.0, ["✅ Natural edge patterns"]
             else:
                 return 0.0, ["❌ Artificial/sharp edges"]
-                
+        
         except Exception:
             return 0, ["❌ Edge analysis failed"]
-    
+
     def _classify_non_crop_image_advanced(self, img_array, scores):
         """Advanced classification of non-crop image types."""
         
@@ -958,7 +1007,7 @@ class CropDiseaseDetector:
             return "an image that doesn't clearly show crop plants"
 
     def _assess_realistic_image_quality(self, image):
-        """Assess image quality based on actual image properties."""
+        """Assess image quality based on actual image properties (original, not working, resolution)."""
         width, height = image.size
         total_pixels = width * height
         
@@ -1526,4 +1575,34 @@ class CropDiseaseDetector:
             'recommended_expert_types': ['Plant Pathologist', 'Agricultural Extension Officer']
         }
         
-        return expert_request
\ No newline at end of file
+        return expert_request
+
+
+# Process pool shared by every detector (workers are slow to start, so keep them)
+_analysis_pool = None
+_analysis_pool_size = 0
+
+# Per-worker detector, created on first use in each worker process
+_worker_detector = None
+
+
+def _get_analysis_pool(max_workers):
+    """Get or create the photo analysis process pool"""
+    global _analysis_pool, _analysis_pool_size
+    if _analysis_pool is None or _analysis_pool_size < max_workers:
+        if _analysis_pool is not None:
+            _analysis_pool.shutdown(wait=False)
+        # spawn rather than fork: the Streamlit server is multi-threaded
+        _analysis_pool = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')
+        )
+        _analysis_pool_size = max_workers
+    return _analysis_pool
+
+
+def _analyze_in_worker(image_data, crop_type, location, max_analysis_pixels):
+    """Analyze one photo inside a pool worker"""
+    global _worker_detector
+    if _worker_detector is None or _worker_detector.max_analysis_pixels != max_analysis_pixels:
+        _worker_detector = CropDiseaseDetector(max_analysis_pixels=max_analysis_pixels)
+    return _worker_detector.analyze_image(image_data, crop_type, location)
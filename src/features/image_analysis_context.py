@@ -0,0 +1,141 @@
+"""
+Image Analysis Context
+
+Holds one uploaded photo at a bounded working resolution and lazily derives
+the maps the crop image validators need (grayscale, gradients, histograms).
+Each map is computed at most once per image and shared by every check.
+"""
+
+from functools import cached_property
+
+import numpy as np
+from PIL import Image
+import io
+
+
+class ImageAnalysisContext:
+    """Lazily computed feature maps for one image, downscaled to at most max_pixels."""
+
+    # ~1 MP keeps every check in the tens of milliseconds while leaving
+    # leaf texture, veins and lesions clearly resolved
+    DEFAULT_MAX_PIXELS = 1_000_000
+
+    # Bytes per pixel of the maps at full resolution: RGB (3) + gray (1) +
+    # two int16 gradients (4) + combined int16 gradient (2) + validator temporaries (~8)
+    _BYTES_PER_PIXEL = 18
+
+    def __init__(self, image, max_pixels=DEFAULT_MAX_PIXELS):
+        """
+        Args:
+            image: PIL image or (H, W, 3) uint8 array
+            max_pixels: Working resolution cap (None = analyze at full resolution)
+        """
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+
+        # Original size, mirroring PIL's (width, height)
+        self.size = image.size
+        self.max_pixels = max_pixels
+
+        image = image.convert('RGB') if image.mode != 'RGB' else image
+        working_size = self._working_size(image.size, max_pixels)
+        if working_size != image.size:
+            # Area averaging keeps colour statistics representative
+            image = image.resize(working_size, Image.BOX)
+        self._image = image
+
+    @classmethod
+    def from_bytes(cls, image_data, max_pixels=DEFAULT_MAX_PIXELS):
+        """Decode an upload, letting libjpeg downscale large JPEGs while decoding."""
+        image = Image.open(io.BytesIO(image_data))
+        original_size = image.size
+        if image.format == 'JPEG' and max_pixels:
+            image.draft('RGB', cls._working_size(image.size, max_pixels))
+        context = cls(image, max_pixels)
+        context.size = original_size
+        return context
+
+    @staticmethod
+    def _working_size(size, max_pixels):
+        width, height = size
+        if not max_pixels or width * height <= max_pixels:
+            return size
+        scale = (max_pixels / (width * height)) ** 0.5
+        return max(1, int(width * scale)), max(1, int(height * scale))
+
+    @property
+    def working_size(self):
+        """(width, height) the maps are computed at"""
+        return self._image.size
+
+    @property
+    def scale(self):
+        """Working / original linear scale (1.0 = full resolution)"""
+        return self.working_size[0] / self.size[0]
+
+    @cached_property
+    def rgb(self):
+        """(H, W, 3) uint8 pixels at working resolution"""
+        return np.asarray(self._image, dtype=np.uint8)
+
+    @cached_property
+    def gray(self):
+        """Integer channel mean (same values as np.mean(rgb, axis=2).astype(np.uint8))"""
+        gray = self.rgb[:, :, 0].astype(np.uint16)
+        gray += self.rgb[:, :, 1]
+        gray += self.rgb[:, :, 2]
+        gray //= 3
+        return gray.astype(np.uint8)
+
+    @cached_property
+    def edges_x(self):
+        """|horizontal intensity step|, (H, W-1) int16"""
+        # Signed differences so dark->light and light->dark steps count the same
+        return np.abs(np.diff(self.gray.astype(np.int16), axis=1))
+
+    @cached_property
+    def edges_y(self):
+        """|vertical intensity step|, (H-1, W) int16"""
+        return np.abs(np.diff(self.gray.astype(np.int16), axis=0))
+
+    @cached_property
+    def edges(self):
+        """Combined gradient on the common (H-1, W-1) grid"""
+        return self.edges_x[:-1, :] + self.edges_y[:, :-1]
+
+    @cached_property
+    def gray_hist(self):
+        """Counts of each gray level 0..255"""
+        # PIL's C histogram is several times faster than np.bincount
+        return np.array(Image.fromarray(self.gray).histogram(), dtype=np.int64)
+
+    @cached_property
+    def channel_hists(self):
+        """(3, 256) counts of each R, G, B level"""
+        return np.array(self._image.histogram(), dtype=np.int64).reshape(3, 256)
+
+    @cached_property
+    def edge_hist(self):
+        """Counts of each combined gradient value 0..510"""
+        return np.bincount(self.edges.ravel(), minlength=511)
+
+    @classmethod
+    def estimate_memory(cls, width, height):
+        """Approximate bytes needed to analyze a width x height image at full resolution"""
+        return width * height * cls._BYTES_PER_PIXEL
+
+    def memory_report(self):
+        """Memory held by the computed maps, and what full resolution would have needed"""
+        maps = {
+            name: value.nbytes
+            for name, value in self.__dict__.items()
+            if isinstance(value, np.ndarray)
+        }
+        return {
+            'original_size': f"{self.size[0]}x{self.size[1]}",
+            'working_size': f"{self.working_size[0]}x{self.working_size[1]}",
+            'scale': round(self.scale, 3),
+            'maps_bytes': maps,
+            'total_mb': round(sum(maps.values()) / 1e6, 2),
+            'full_resolution_estimate_mb': round(self.estimate_memory(*self.size) / 1e6, 1)
+        }
@@ -14,6 +14,8 @@ from sklearn.model_selection import train_test_split
 import warnings
 warnings.filterwarnings('ignore')
 
+from src.core.model_store import ModelArtifactStore, fingerprint_training_data
+
 class MultiScenarioPredictor:
     """Predicts outcomes for multiple farming scenarios."""
     
@@ -25,9 +27,7 @@ class MultiScenarioPredictor:
         self.is_trained = False
         
     def train_prediction_model(self):
-        """Train the ML model for yield prediction."""
-        print("Training multi-scenario prediction model...")
-        
+        """Load the saved yield model, training it only if the data or settings changed."""
         if self.data_loader.merged_data is None:
             self.data_loader.merge_datasets()
             
@@ -39,39 +39,63 @@ class MultiScenarioPredictor:
                             'total_rainfall_mm', 'avg_humidity_percent', 'N', 'P', 'K', 'pH']
         
         self.feature_columns = categorical_features + numerical_features
+        model_params = {
+            'n_estimators': 100,
+            'max_depth': 15,
+            'min_samples_split': 5,
+            'random_state': 42
+        }
+        
+        fingerprint = fingerprint_training_data(
+            data[self.feature_columns + ['yield']],
+            {'features': self.feature_columns, 'model': model_params, 'test_size': 0.2}
+        )
+        payload = ModelArtifactStore().load_or_train(
+            "multi_scenario_model",
+            fingerprint,
+            lambda: self._fit_model(data, categorical_features, model_params)
+        )
+        
+        self.model = payload['model']
+        self.label_encoders = payload['label_encoders']
+        self.is_trained = True
+        return payload['test_score']
+    
+    def _fit_model(self, data, categorical_features, model_params):
+        """Fit the random forest; returns (artifact payload, metrics)."""
+        print("Training multi-scenario prediction model...")
         
         # Prepare features
         X = data[self.feature_columns].copy()
         y = data['yield'].values
         
         # Encode categorical variables
+        label_encoders = {}
         for col in categorical_features:
             le = LabelEncoder()
             X[col] = le.fit_transform(X[col].astype(str))
-            self.label_encoders[col] = le
+            label_encoders[col] = le
             
         # Train model
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
         
-        self.model = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=15,
-            min_samples_split=5,
-            random_state=42
-        )
-        
-        self.model.fit(X_train, y_train)
+        model = RandomForestRegressor(**model_params)
+        model.fit(X_train, y_train)
         
         # Evaluate model
-        train_score = self.model.score(X_train, y_train)
-        test_score = self.model.score(X_test, y_test)
+        train_score = model.score(X_train, y_train)
+        test_score = model.score(X_test, y_test)
         
         print(f"✅ Model trained successfully!")
         print(f"   Training R²: {train_score:.3f}")
         print(f"   Testing R²: {test_score:.3f}")
         
-        self.is_trained = True
-        return test_score
+        payload = {
+            'model': model,
+            'label_encoders': label_encoders,
+            'test_score': test_score
+        }
+        return payload, {'train_r2': round(train_score, 4), 'test_r2': round(test_score, 4)}
     
     def create_scenarios(self, base_params: Dict) -> List[Dict]:
         """Create multiple scenarios based on different farming strategies."""
@@ -3,12 +3,29 @@ Weather Service Module
 
 Provides weather data fetching using free Open-Meteo API (no API key required).
 Supports current weather conditions and multi-day forecast.
+
+Responses are cached per ~5 km grid tile (see src.utils.tile_cache), so
+nearby locations looked up within the TTL reuse one API call.
 """
 
 import requests
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
+from src.utils.tile_cache import TileCache, tile_for, tile_center
+
+# Shared by all WeatherService instances (the Streamlit pages create one per rerun)
+_current_cache = TileCache('weather_current', ttl_seconds=10 * 60)
+_forecast_cache = TileCache('weather_forecast', ttl_seconds=3 * 60 * 60)
+
+
+class _APIStatusError(Exception):
+    """Non-200 response from Open-Meteo (not cached)."""
+
+    def __init__(self, status_code):
+        super().__init__(f"API error: {status_code}")
+        self.status_code = status_code
+
 
 class WeatherService:
     """Service for fetching weather data using Open-Meteo API (free, no API key needed)."""
@@ -18,6 +35,30 @@ class WeatherService:
         self.base_url = "https://api.open-meteo.com/v1/forecast"
         self.timeout = 15  # seconds
         
+    def _fetch_tile(self, cache, latitude, longitude, params, key_extra=()):
+        """API JSON for the tile containing the coordinate, cached per tile."""
+        tile = tile_for(latitude, longitude)
+        
+        def fetch():
+            tile_lat, tile_lon = tile_center(tile)
+            response = requests.get(
+                self.base_url,
+                params={'latitude': tile_lat, 'longitude': tile_lon, **params},
+                timeout=self.timeout
+            )
+            if response.status_code != 200:
+                raise _APIStatusError(response.status_code)
+            return response.json()
+        
+        return cache.get_or_fetch((tile, *key_extra), fetch)
+    
+    def cache_stats(self) -> Dict:
+        """Hit/miss statistics for the weather caches."""
+        return {
+            'current': _current_cache.stats(),
+            'forecast': _forecast_cache.stats()
+        }
+        
     def get_current_weather(self, latitude: float, longitude: float) -> Dict:
         """
         Get current weather conditions for a location.
@@ -39,8 +80,6 @@ class WeatherService:
         """
         try:
             params = {
-                'latitude': latitude,
-                'longitude': longitude,
                 'current': [
                     'temperature_2m',
                     'relative_humidity_2m',
@@ -51,18 +90,11 @@ class WeatherService:
                 'timezone': 'auto'
             }
             
-            response = requests.get(
-                self.base_url,
-                params=params,
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return self._parse_current_weather(data)
-            else:
-                return self._error_response(f"API error: {response.status_code}")
+            data = self._fetch_tile(_current_cache, latitude, longitude, params, key_extra=('current',))
+            return self._parse_current_weather(data)
                 
+        except _APIStatusError as e:
+            return self._error_response(str(e))
         except requests.Timeout:
             return self._error_response("Request timed out. Please try again.")
         except requests.ConnectionError:
@@ -86,8 +118,6 @@ class WeatherService:
         """
         try:
             params = {
-                'latitude': latitude,
-                'longitude': longitude,
                 'daily': [
                     'temperature_2m_max',
                     'temperature_2m_min',
@@ -99,18 +129,11 @@ class WeatherService:
                 'forecast_days': days
             }
             
-            response = requests.get(
-                self.base_url,
-                params=params,
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return self._parse_forecast(data)
-            else:
-                return self._error_response(f"API error: {response.status_code}")
+            data = self._fetch_tile(_forecast_cache, latitude, longitude, params, key_extra=('daily', days))
+            return self._parse_forecast(data)
                 
+        except _APIStatusError as e:
+            return self._error_response(str(e))
         except requests.Timeout:
             return self._error_response("Request timed out. Please try again.")
         except requests.ConnectionError:
@@ -132,8 +155,6 @@ class WeatherService:
         """
         try:
             params = {
-                'latitude': latitude,
-                'longitude': longitude,
                 'current': [
                     'temperature_2m',
                     'relative_humidity_2m',
@@ -152,25 +173,19 @@ class WeatherService:
                 'forecast_days': forecast_days
             }
             
-            response = requests.get(
-                self.base_url,
-                params=params,
-                timeout=self.timeout
-            )
+            # Includes current conditions, so it expires on the current-weather TTL
+            data = self._fetch_tile(_current_cache, latitude, longitude, params, key_extra=('complete', forecast_days))
+            current = self._parse_current_weather(data)
+            forecast = self._parse_forecast(data)
             
-            if response.status_code == 200:
-                data = response.json()
-                current = self._parse_current_weather(data)
-                forecast = self._parse_forecast(data)
-                
-                return {
-                    'current': current,
-                    'forecast': forecast['forecast'] if 'forecast' in forecast else [],
-                    'error': None
-                }
-            else:
-                return self._error_response(f"API error: {response.status_code}")
+            return {
+                'current': current,
+                'forecast': forecast['forecast'] if 'forecast' in forecast else [],
+                'error': None
+            }
                 
+        except _APIStatusError as e:
+            return self._error_response(str(e))
         except Exception as e:
             return self._error_response(f"Error fetching weather: {str(e)}")
     
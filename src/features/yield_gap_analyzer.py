@@ -16,38 +16,117 @@ class YieldGapAnalyzer:
     
     def __init__(self, data_loader):
         self.data_loader = data_loader
+        # (crop, state, season or None) -> {'stats', 'rows'}, built on first use
+        self._benchmark_cube = None
+        # (crop, state, season or None) -> full entry with correlations and chart data, built on request
+        self._details = {}
+        self._data = None
+    
+    def _get_benchmark_cube(self) -> Dict:
+        """
+        Summary statistics for every (crop, state, season) and (crop, state) combination.
+        
+        Only the cheap statistics are computed up front, in one vectorized
+        groupby over both levels. Correlations, high-performer profiles and
+        chart data are built the first time a combination is requested.
+        """
+        if self._benchmark_cube is not None:
+            return self._benchmark_cube
+        
+        print("Building yield benchmark cube...")
+        data = self.data_loader.filter_data()
+        season = data['season'].str.strip()
+        # Every row appears twice: once under its season, once under '' for all seasons
+        stacked = pd.DataFrame({
+            'crop': np.concatenate([data['crop'].values, data['crop'].values]),
+            'state': np.concatenate([data['state'].values, data['state'].values]),
+            'season': np.concatenate([season.values, np.full(len(data), '', dtype=object)]),
+            'yield': np.concatenate([data['yield'].values, data['yield'].values]),
+            'year': np.concatenate([data['year'].values, data['year'].values])
+        })
+        
+        groups = stacked.groupby(['crop', 'state', 'season'], sort=False)
+        stats = groups.agg(
+            total_records=('yield', 'size'),
+            year_min=('year', 'min'),
+            year_max=('year', 'max'),
+            average_yield=('yield', 'mean'),
+            median_yield=('yield', 'median'),
+            max_yield_achieved=('yield', 'max'),
+            min_yield_recorded=('yield', 'min')
+        )
+        # Population std, as np.std
+        stats['yield_std'] = groups['yield'].std(ddof=0)
+        # numpy scalars, so round() behaves as it does on np.mean/np.percentile results
+        columns = {col: stats[col].to_numpy() for col in stats.columns}
+        quantiles = groups['yield'].quantile([0.9, 0.75, 0.25]).unstack()
+        for q in quantiles.columns:
+            columns[q] = quantiles[q].reindex(stats.index).to_numpy()
+        
+        # Row positions per group, in data order (stable sort of the group numbers)
+        codes = groups.ngroup().values
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(stats) + 1))
+        
+        cube = {}
+        for i, (crop, state, season_key) in enumerate(stats.index):
+            cube[(crop, state, season_key or None)] = {
+                'stats': {
+                    'total_records': int(columns['total_records'][i]),
+                    'years_covered': f"{columns['year_min'][i]}-{columns['year_max'][i]}",
+                    'average_yield': round(columns['average_yield'][i], 2),
+                    'median_yield': round(columns['median_yield'][i], 2),
+                    'top_10_percent': round(columns[0.9][i], 2),
+                    'top_25_percent': round(columns[0.75][i], 2),
+                    'bottom_25_percent': round(columns[0.25][i], 2),
+                    'max_yield_achieved': round(columns['max_yield_achieved'][i], 2),
+                    'min_yield_recorded': round(columns['min_yield_recorded'][i], 2),
+                    'yield_std': round(columns['yield_std'][i], 2)
+                },
+                'rows': order[bounds[i]:bounds[i + 1]] % len(data)
+            }
+        
+        self._data = data
+        self._benchmark_cube = cube
+        print(f"✅ Benchmark cube ready: {len(cube)} combinations")
+        return cube
+    
+    def _get_cube_entry(self, crop: str, state: str, season: str = None):
+        """Full entry for a combination, or None if there is no data."""
+        key = (crop, state, season.strip() if season else None)
+        entry = self._details.get(key)
+        if entry is not None:
+            return entry
+        
+        summary = self._get_benchmark_cube().get(key)
+        if summary is None:
+            return None
+        
+        data = self._data.iloc[summary['rows']]
+        benchmarks = dict(summary['stats'])
+        benchmarks['consistent_high_performers'] = self._find_consistent_performers(data, percentile=80)
+        benchmarks['improvement_factors'] = self._analyze_improvement_factors(data)
+        entry = {
+            'benchmarks': benchmarks,
+            'sorted_yields': np.sort(data['yield'].values),
+            'yield_distribution': data['yield'].tolist(),
+            'yearly_trend': data.groupby('year')['yield'].mean().to_dict()
+        }
+        self._details[key] = entry
+        return entry
         
     def calculate_yield_benchmarks(self, crop: str, state: str, season: str = None) -> Dict:
         """Calculate yield benchmarks for a specific crop-state combination."""
         
-        # Filter data
-        data = self.data_loader.filter_data(crop=crop, state=state, season=season)
+        entry = self._get_cube_entry(crop, state, season)
         
-        if data.empty:
+        if entry is None:
             return {
                 'error': f'No data available for {crop} in {state}' + (f' during {season}' if season else ''),
                 'available_seasons': self.data_loader.filter_data(crop=crop, state=state)['season'].str.strip().unique().tolist()
             }
         
-        yields = data['yield'].values
-        
-        # Calculate benchmarks
-        benchmarks = {
-            'total_records': len(data),
-            'years_covered': f"{data['year'].min()}-{data['year'].max()}",
-            'average_yield': round(np.mean(yields), 2),
-            'median_yield': round(np.median(yields), 2),
-            'top_10_percent': round(np.percentile(yields, 90), 2),
-            'top_25_percent': round(np.percentile(yields, 75), 2),
-            'bottom_25_percent': round(np.percentile(yields, 25), 2),
-            'max_yield_achieved': round(np.max(yields), 2),
-            'min_yield_recorded': round(np.min(yields), 2),
-            'yield_std': round(np.std(yields), 2),
-            'consistent_high_performers': self._find_consistent_performers(data, percentile=80),
-            'improvement_factors': self._analyze_improvement_factors(data)
-        }
-        
-        return benchmarks
+        return dict(entry['benchmarks'])
     
     def analyze_user_gap(self, user_yield: float, crop: str, state: str, season: str = None) -> Dict:
         """Analyze the gap between user's yield and benchmarks."""
@@ -155,11 +234,13 @@ class YieldGapAnalyzer:
     def _calculate_percentile_rank(self, user_yield: float, crop: str, state: str, season: str = None) -> float:
         """Calculate where user's yield ranks among all records."""
         
-        data = self.data_loader.filter_data(crop=crop, state=state, season=season)
-        if data.empty:
+        entry = self._get_cube_entry(crop, state, season)
+        if entry is None:
             return 0.0
-            
-        rank = (data['yield'] < user_yield).mean() * 100
+        
+        # Binary search over the presorted yields
+        sorted_yields = entry['sorted_yields']
+        rank = np.searchsorted(sorted_yields, user_yield, side='left') / len(sorted_yields) * 100
         return round(rank, 1)
     
     def _calculate_improvement_potential(self, user_yield: float, benchmarks: Dict) -> Dict:
@@ -223,22 +304,22 @@ class YieldGapAnalyzer:
     def generate_visualization_data(self, user_yield: float, crop: str, state: str, season: str = None) -> Dict:
         """Generate data for creating yield comparison visualizations."""
         
-        data = self.data_loader.filter_data(crop=crop, state=state, season=season)
-        if data.empty:
+        entry = self._get_cube_entry(crop, state, season)
+        if entry is None:
             return {'error': 'No data available for visualization'}
         
-        benchmarks = self.calculate_yield_benchmarks(crop, state, season)
+        benchmarks = entry['benchmarks']
         
         viz_data = {
             'user_yield': user_yield,
-            'yield_distribution': data['yield'].tolist(),
+            'yield_distribution': list(entry['yield_distribution']),
             'benchmarks': {
                 'average': benchmarks['average_yield'],
                 'top_25': benchmarks['top_25_percent'],
                 'top_10': benchmarks['top_10_percent'],
                 'maximum': benchmarks['max_yield_achieved']
             },
-            'yearly_trend': data.groupby('year')['yield'].mean().to_dict(),
+            'yearly_trend': dict(entry['yearly_trend']),
             'percentile_rank': self._calculate_percentile_rank(user_yield, crop, state, season)
         }
         
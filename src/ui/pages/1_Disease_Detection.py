@@ -23,7 +23,7 @@ if str(project_root) not in sys.path:
 
 # Import required modules
 from src.core.data_loader import DataLoader
-from features.crop_disease_detector import CropDiseaseDetector
+from src.features.crop_disease_detector import CropDiseaseDetector
 from src.utils.language_service import get_language_service, get_text, get_current_language
 
 # Initialize language service
@@ -403,12 +403,24 @@ def analyze_enhanced_crop_disease(photos_data, crop_type, location, disease_dete
         all_analyses = []
         invalid_images = []
         
-        for source, photo in photos_data:
-            image_data = photo.read()
-            
-            analysis = disease_detector.analyze_image(image_data, crop_type, location)
+        # Read uploads up front, then analyze the photos in parallel worker processes
+        images = [photo.read() for _, photo in photos_data]
+
+        progress = st.progress(0.0, text=f"Analyzed 0 of {len(photos_data)} photo(s)")
+        results = [None] * len(photos_data)
+        for done, (index, analysis) in enumerate(
+            disease_detector.analyze_images(images, crop_type, location), start=1
+        ):
+            source = photos_data[index][0]
             analysis['source'] = source
-            
+            results[index] = analysis
+            status = "✅" if analysis.get('is_valid_crop_image', True) else "⚠️"
+            progress.progress(done / len(photos_data),
+                              text=f"Analyzed {done} of {len(photos_data)} photo(s) - {status} {source}")
+        progress.empty()
+
+        # Keep the original photo order
+        for (source, _), analysis in zip(photos_data, results):
             if not analysis.get('is_valid_crop_image', True):
                 invalid_images.append((source, analysis))
             else:
@@ -37,7 +37,7 @@ if str(project_root) not in sys.path:
 from src.core.data_loader import DataLoader
 from src.features.yield_gap_analyzer import YieldGapAnalyzer
 from src.features.multi_scenario_predictor import MultiScenarioPredictor
-from features.crop_disease_detector import CropDiseaseDetector
+from src.features.crop_disease_detector import CropDiseaseDetector
 from src.utils.translator import LanguageTranslator, WEATHER_TRANSLATIONS
 from src.utils.farmer_helper_bot import FarmerHelperBot, show_help_icon_with_chatbot, show_general_chatbot
 from src.features.weather_service import WeatherService
@@ -1112,14 +1112,26 @@ def analyze_enhanced_crop_disease(photos_data, crop_type, location, disease_dete
         all_analyses = []
         invalid_images = []
         
-        # Process images in parallel-like manner (streamlined)
-        for source, photo in photos_data:
-            image_data = photo.read()
-            
-            # Fast analysis with minimal overhead
-            analysis = disease_detector.analyze_image(image_data, crop_type, location)
+        # Read uploads up front, then analyze the photos in parallel worker processes
+        images = [photo.read() for _, photo in photos_data]
+        for _, photo in photos_data:
+            photo.seek(0)  # symptom highlighting re-reads the photo
+        
+        progress = st.progress(0.0, text=f"Analyzed 0 of {len(photos_data)} photo(s)")
+        results = [None] * len(photos_data)
+        for done, (index, analysis) in enumerate(
+            disease_detector.analyze_images(images, crop_type, location), start=1
+        ):
+            source = photos_data[index][0]
             analysis['source'] = source
-            
+            results[index] = analysis
+            status = "✅" if analysis.get('is_valid_crop_image', True) else "⚠️"
+            progress.progress(done / len(photos_data),
+                              text=f"Analyzed {done} of {len(photos_data)} photo(s) - {status} {source}")
+        progress.empty()
+        
+        # Keep the original photo order
+        for (source, _), analysis in zip(photos_data, results):
             # Quick validation check
             if not analysis.get('is_valid_crop_image', True):
                 invalid_images.append((source, analysis))
@@ -3,12 +3,28 @@ Location Service Module
 
 Provides reverse geocoding functionality to convert latitude/longitude coordinates
 into human-readable location names using free OpenStreetMap Nominatim API.
+
+Results are cached per ~5 km grid tile for 30 days (place names don't
+change), which also keeps us well inside Nominatim's fair-use rate limit.
 """
 
 import requests
 from typing import Dict, Optional
 import time
 
+from src.utils.tile_cache import TileCache, tile_for, tile_center
+
+# Shared by all LocationService instances
+_geocode_cache = TileCache('reverse_geocode', ttl_seconds=30 * 24 * 60 * 60)
+
+
+class _GeocodeStatusError(Exception):
+    """Non-200 response from Nominatim (not cached)."""
+
+    def __init__(self, status_code):
+        super().__init__(f"Geocoding service error: {status_code}")
+        self.status_code = status_code
+
 
 class LocationService:
     """Service for reverse geocoding using OpenStreetMap Nominatim (free, no API key)."""
@@ -47,34 +63,16 @@ class LocationService:
             return self._error_response("Invalid longitude. Must be between -180 and 180.")
         
         try:
-            # Build request parameters
-            params = {
-                'lat': latitude,
-                'lon': longitude,
-                'format': 'json',
-                'addressdetails': 1,
-                'zoom': 18  # Detailed level
-            }
-            
-            # Make request to Nominatim
-            response = requests.get(
-                self.base_url,
-                params=params,
-                headers=self.headers,
-                timeout=self.timeout
-            )
-            
-            # Check response
-            if response.status_code == 200:
-                data = response.json()
-                return self._parse_location_data(data)
-            elif response.status_code == 429:
+            tile = tile_for(latitude, longitude)
+            data = _geocode_cache.get_or_fetch(tile, lambda: self._fetch_location(tile))
+            return self._parse_location_data(data)
+        
+        except _GeocodeStatusError as e:
+            if e.status_code == 429:
                 # Rate limit exceeded
                 time.sleep(1)  # Wait before retry
                 return self._error_response("Rate limit exceeded. Please try again in a moment.")
-            else:
-                return self._error_response(f"Geocoding service error: {response.status_code}")
-                
+            return self._error_response(str(e))
         except requests.Timeout:
             return self._error_response("Request timed out. Please check your internet connection.")
         except requests.ConnectionError:
@@ -82,6 +80,35 @@ class LocationService:
         except Exception as e:
             return self._error_response(f"Unexpected error: {str(e)}")
     
+    def _fetch_location(self, tile) -> dict:
+        """Reverse geocode the centre of a grid tile."""
+        tile_lat, tile_lon = tile_center(tile)
+        
+        # Build request parameters
+        params = {
+            'lat': tile_lat,
+            'lon': tile_lon,
+            'format': 'json',
+            'addressdetails': 1,
+            'zoom': 18  # Detailed level
+        }
+        
+        # Make request to Nominatim
+        response = requests.get(
+            self.base_url,
+            params=params,
+            headers=self.headers,
+            timeout=self.timeout
+        )
+        
+        if response.status_code != 200:
+            raise _GeocodeStatusError(response.status_code)
+        return response.json()
+    
+    def cache_stats(self) -> Dict:
+        """Hit/miss statistics for the geocoding cache."""
+        return _geocode_cache.stats()
+    
     def _parse_location_data(self, data: dict) -> Dict[str, str]:
         """
         Parse location data from Nominatim response.
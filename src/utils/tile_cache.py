@@ -0,0 +1,110 @@
+"""
+Spatial Tile Cache
+
+TTL cache for location-based API calls (weather, reverse geocoding).
+Coordinates are snapped to a coarse lat/lon grid (0.05° ≈ 5 km by default),
+so nearby farms looked up within the TTL share one upstream response.
+
+Concurrent misses for the same tile are coalesced: one thread calls the
+API while the others wait for its result. Failed calls are not cached.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TILE_SIZE = 0.05
+
+
+def tile_for(latitude, longitude, tile_size=DEFAULT_TILE_SIZE):
+    """Grid cell containing a coordinate."""
+    return math.floor(latitude / tile_size), math.floor(longitude / tile_size)
+
+
+def tile_center(tile, tile_size=DEFAULT_TILE_SIZE):
+    """Centre coordinate of a grid cell."""
+    lat_idx, lon_idx = tile
+    return round((lat_idx + 0.5) * tile_size, 4), round((lon_idx + 0.5) * tile_size, 4)
+
+
+class _PendingCall:
+    """Result slot shared by threads waiting on the same upstream call."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TileCache:
+    """Thread-safe TTL + LRU cache with single-flight fetching per key."""
+
+    def __init__(self, name, ttl_seconds, max_entries=10000):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_fetch(self, key, fetch):
+        """Return the cached value for key, calling fetch() on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            pending = self._pending.get(key)
+            if pending is not None:
+                self.coalesced += 1
+                is_leader = False
+            else:
+                self.misses += 1
+                pending = self._pending[key] = _PendingCall()
+                is_leader = True
+
+        if not is_leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            value = fetch()
+            pending.value = value
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return value
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.done.set()
+
+    def stats(self):
+        """Hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'hit_rate': round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0
+            }
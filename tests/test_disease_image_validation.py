@@ -0,0 +1,155 @@
+"""
+Crop Disease Detector - Image Validation Test
+
+Checks the vectorized validation statistics against straightforward
+loop implementations, times validation of a 12 MP photo and checks
+that multi-photo analysis in worker processes matches sequential results.
+"""
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Add parent directory to path to import src modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.features.crop_disease_detector import CropDiseaseDetector
+from src.features.image_analysis_context import ImageAnalysisContext
+
+
+def reference_solid_blocks(img_array):
+    """Original block-by-block loop."""
+    height, width = img_array.shape[:2]
+    block_size = min(20, height//10, width//10)
+    if block_size < 5:
+        return 0
+    solid_area = total_area = 0
+    for i in range(0, height - block_size, block_size):
+        for j in range(0, width - block_size, block_size):
+            if np.var(img_array[i:i+block_size, j:j+block_size]) < 50:
+                solid_area += block_size * block_size
+            total_area += block_size * block_size
+    return solid_area / max(total_area, 1)
+
+
+def reference_local_variance(gray):
+    """Original patch-by-patch loop."""
+    kernel_size = min(9, gray.shape[0]//5, gray.shape[1]//5)
+    step = max(1, kernel_size//2)
+    variances = [
+        np.var(gray[i:i+kernel_size, j:j+kernel_size])
+        for i in range(0, gray.shape[0] - kernel_size, step)
+        for j in range(0, gray.shape[1] - kernel_size, step)
+    ]
+    return np.mean(variances) / 255.0
+
+
+def synthetic_leaf(width, height, seed=0):
+    """Green leaf with brown lesions on a soil background."""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width]
+    img = np.empty((height, width, 3), dtype=np.float32)
+    img[:] = (110, 80, 50)
+    leaf = ((xx - width / 2) / (width * 0.4)) ** 2 + ((yy - height / 2) / (height * 0.3)) ** 2 < 1
+    img[leaf] = (50, 150, 40)
+    for _ in range(12):
+        cx, cy, r = rng.integers(width // 4, 3 * width // 4), rng.integers(height // 3, 2 * height // 3), width // 40
+        img[(xx - cx) ** 2 + (yy - cy) ** 2 < r * r] = (120, 90, 30)
+    # Texture proportional to the photo size (~500 cells across), like real detail,
+    # plus a little sensor noise
+    cells = rng.normal(0, 25, (height * 500 // width, 500, 3)).astype(np.float32)
+    texture = np.stack([
+        np.asarray(Image.fromarray(cells[:, :, c]).resize((width, height), Image.BILINEAR))
+        for c in range(3)
+    ], axis=2)
+    img += texture + rng.normal(0, 4, img.shape)
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+def test_vectorized_statistics():
+    """Vectorized statistics match the loop versions"""
+    print("=" * 80)
+    print(" 🧪 TESTING VECTORIZED IMAGE STATISTICS")
+    print("=" * 80)
+
+    detector = CropDiseaseDetector()
+    rng = np.random.default_rng(42)
+    images = [
+        synthetic_leaf(333, 251),
+        rng.integers(0, 256, (123, 187, 3), dtype=np.uint8),
+        np.full((200, 300, 3), 255, dtype=np.uint8),
+    ]
+
+    for img in images:
+        gray = np.mean(img, axis=2).astype(np.uint8)
+        context = ImageAnalysisContext(img, max_pixels=None)
+
+        assert np.array_equal(context.gray, gray)
+        assert np.isclose(detector._detect_solid_blocks(img), reference_solid_blocks(img))
+        assert np.isclose(detector._calculate_local_variance(gray), reference_local_variance(gray))
+        assert detector._estimate_color_palette(img) == len(np.unique((img // 8).reshape(-1, 3), axis=0))
+        assert np.array_equal(
+            detector._binned_histogram(context.gray_hist, 32), np.histogram(gray, bins=32)[0]
+        )
+        print(f"✅ {img.shape[1]}x{img.shape[0]} matches loop implementation")
+
+
+def test_large_photo_speed():
+    """A 12 MP JPEG is decoded at working resolution and validated quickly"""
+    print("\n" + "=" * 80)
+    print(" ⏱️ TESTING 12 MP VALIDATION SPEED")
+    print("=" * 80)
+
+    detector = CropDiseaseDetector()
+    buffer = io.BytesIO()
+    Image.fromarray(synthetic_leaf(4000, 3000)).save(buffer, format='JPEG', quality=90)
+    image_data = buffer.getvalue()
+
+    start = time.perf_counter()
+    context = ImageAnalysisContext.from_bytes(image_data)
+    is_valid, result = detector._validate_crop_image(context)
+    elapsed = time.perf_counter() - start
+
+    memory = result['analysis_memory']
+    print(f"Valid: {is_valid}, score: {result['final_score']}, time: {elapsed*1000:.0f} ms")
+    print(f"Working size: {memory['working_size']} ({memory['total_mb']} MB, "
+          f"full resolution would need ~{memory['full_resolution_estimate_mb']} MB)")
+    assert is_valid
+    assert context.size == (4000, 3000)
+    assert context.working_size[0] * context.working_size[1] <= ImageAnalysisContext.DEFAULT_MAX_PIXELS
+    assert elapsed < 0.5
+    print("✅ PASSED")
+
+
+def test_parallel_photos():
+    """Photos analyzed in a process pool give the same validation as in-process"""
+    print("\n" + "=" * 80)
+    print(" 🧵 TESTING PARALLEL MULTI-PHOTO ANALYSIS")
+    print("=" * 80)
+
+    detector = CropDiseaseDetector()
+    images = []
+    for seed, size in enumerate([(800, 600), (640, 480), (1024, 768)]):
+        buffer = io.BytesIO()
+        Image.fromarray(synthetic_leaf(*size, seed=seed)).save(buffer, format='JPEG', quality=90)
+        images.append(buffer.getvalue())
+    images.append(b"not an image")
+
+    sequential = [detector.analyze_image(image_data, "Tomato") for image_data in images]
+    # Two workers even on a single-core machine, to exercise the pool
+    parallel = dict(detector.analyze_images(images, "Tomato", max_workers=2))
+
+    assert sorted(parallel) == list(range(len(images)))
+    for index, expected in enumerate(sequential):
+        assert parallel[index]['is_valid_crop_image'] == expected['is_valid_crop_image']
+        if expected['is_valid_crop_image']:
+            assert parallel[index]['image_validation']['final_score'] == expected['image_validation']['final_score']
+    print(f"✅ {len(images)} photos analyzed across worker processes")
+
+
+if __name__ == '__main__':
+    test_vectorized_statistics()
+    test_large_photo_speed()
+    test_parallel_photos()